@@ -0,0 +1,252 @@
+# agent_daemon.py
+
+"""
+Long-running mode: python run_agent.py --daemon
+
+Instead of a cold start per cron tick, one process stays up and runs
+scrape cycles (run_agent.run_cycle) on an internal schedule, keeping warm
+between cycles:
+  - the parsed config (a RuntimeConfig) and the discovered scrapers
+  - compiled keyword matchers and the relevance scorer
+  - the open history store and the near-duplicate index
+  - rendered digest lines (output/digest_builder.py LineCache)
+  - keep-alive HTTP sessions (scrapers/fetcher.py SessionPool)
+  - incremental scraping state (scrapers/incremental.py WarmStates)
+
+Each source runs on its own interval:
+
+    "daemon": {
+        "interval_minutes": 60,        # default for every source
+        "reload_check_seconds": 5      # how often config.json is checked
+    },
+    "scrapers": {"linkedin": {"interval_minutes": 30, ...}}
+
+Sources that come due together share one cycle (one digest, one history
+commit). The email is only sent when a cycle found new jobs; it goes
+through the outbox (emailer/outbox.py), whose worker runs for the life of
+the daemon.
+
+config/config.json is reloaded when it changes; an invalid edit is logged
+and the previous config kept, and only what depends on a changed section
+is rebuilt (compared by RuntimeConfig.section_hash), including logging.
+A cycle that fails leaves nothing behind: its uncommitted history changes
+and near-duplicate clusters are discarded. On SIGTERM or SIGINT
+the current cycle finishes, history is committed and the process exits;
+a second signal aborts the running cycle without committing it.
+"""
+
+from __future__ import annotations
+import logging
+import signal
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from emailer.outbox import flush_seconds, start_worker
+from output.digest_builder import LineCache
+from processor.near_dupes import index_from_config
+from run_agent import CONFIG_PATH, NEAR_DUPES_PATH, finish_run, load_config, run_cycle
+from scrapers.fetcher import SessionPool, keep_sessions_warm
+from scrapers.incremental import WarmStates, keep_states_warm
+from scrapers.registry import enabled_scrapers
+from storage.history import open_history
+from utils import metrics
+from utils.config_loader import RuntimeConfig
+from utils.logger import init_logger
+
+logger = logging.getLogger("jobsearch_agent")
+
+DEFAULT_INTERVAL_MINUTES = 60
+DEFAULT_RELOAD_CHECK_SECONDS = 5
+
+
+class AgentDaemon:
+    def __init__(self, config_path: Path = CONFIG_PATH):
+        self.config_path = Path(config_path)
+        self.config: RuntimeConfig = load_config(self.config_path)
+        self._mtime = self._config_mtime()
+
+        self.store = open_history(self.config)
+        self.near_dupes = index_from_config(self.config, NEAR_DUPES_PATH, self.store.jobs())
+        self.sessions = SessionPool()
+        self.states = WarmStates(self.store)
+        self.digest_cache = LineCache()
+        self.scrapers = enabled_scrapers(self.config)
+        self.outbox = start_worker(self.config)
+        self.next_due: Dict[str, float] = {name: 0.0 for name in self.scrapers}
+
+        # The last cycle's metrics, written once its email had time to go out
+        self._unwritten: Optional[metrics.RunMetrics] = None
+
+        self._stop = threading.Event()
+        self._in_cycle = False
+        self.cycles = 0
+
+    # ----- schedule -------------------------------------------------------
+
+    def interval(self, name: str) -> float:
+        default = self.config.get("daemon", {}).get("interval_minutes", DEFAULT_INTERVAL_MINUTES)
+        section = self.config.get("scrapers", {}).get(name, {})
+        return float(section.get("interval_minutes", default)) * 60
+
+    def _reload_check(self) -> float:
+        return float(self.config.get("daemon", {}).get("reload_check_seconds", DEFAULT_RELOAD_CHECK_SECONDS))
+
+    # ----- config reload --------------------------------------------------
+
+    def _config_mtime(self) -> Optional[float]:
+        try:
+            return self.config_path.stat().st_mtime
+        except OSError:
+            return None
+
+    def reload_if_changed(self) -> bool:
+        mtime = self._config_mtime()
+        if mtime is None or mtime == self._mtime:
+            return False
+        self._mtime = mtime
+
+        try:
+            config = load_config(self.config_path)
+        except RuntimeError as e:
+            logger.error(f"[Daemon] Config reload failed, keeping previous config: {e}")
+            return False
+
+        old = self.config
+        if config == old:
+            return False
+        self.config = config
+
+        if config.section_hash("logging") != old.section_hash("logging"):
+            init_logger(config.get("logging"))
+
+        if config.section_hash("history") != old.section_hash("history"):
+            logger.info("[Daemon] History settings changed — reopening history.")
+            self.store.commit()
+            self.store.close()
+            self.store = open_history(config)
+            self.near_dupes = index_from_config(config, NEAR_DUPES_PATH, self.store.jobs())
+            self.states = WarmStates(self.store)
+            keep_states_warm(self.states)
+        elif config.section_hash("dedupe") != old.section_hash("dedupe"):
+            if self.near_dupes is not None:
+                self.near_dupes.save(NEAR_DUPES_PATH)
+            self.near_dupes = index_from_config(config, NEAR_DUPES_PATH, self.store.jobs())
+
+        # Connection pool sizes and hosts may have changed
+        self.sessions.close()
+
+        if config.section_hash("email_notifications") != old.section_hash("email_notifications"):
+            if self.outbox is not None:
+                self.outbox.stop(0)
+            self.outbox = start_worker(config)
+
+        self.scrapers = enabled_scrapers(config)
+        self.next_due = {name: self.next_due.get(name, 0.0) for name in self.scrapers}
+        logger.info(f"[Daemon] Reloaded {self.config_path} — sources: {', '.join(self.scrapers) or 'none'}")
+        return True
+
+    # ----- main loop ------------------------------------------------------
+
+    def _handle_signal(self, signum: int, frame: Any) -> None:
+        if self._stop.is_set() and self._in_cycle:
+            raise KeyboardInterrupt
+        logger.info(f"[Daemon] {signal.Signals(signum).name} received — shutting down after the current cycle.")
+        self._stop.set()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _discard_cycle(self) -> None:
+        """
+        Forget a failed cycle's uncommitted history and near-dupe clusters,
+        so the next cycle neither commits them nor treats them as seen.
+        """
+        self.store.discard()
+        if self.near_dupes is not None:
+            self.near_dupes.discard()
+
+    def _write_metrics(self) -> None:
+        if self._unwritten is not None:
+            finish_run(self._unwritten, self.outbox)
+            self._unwritten = None
+
+    def run_once(self) -> None:
+        """
+        Run one cycle for every source that is due.
+        """
+        now = time.monotonic()
+        due = {name: s for name, s in self.scrapers.items() if self.next_due[name] <= now}
+        if not due:
+            return
+
+        self.cycles += 1
+        logger.info(f"[Daemon] Cycle {self.cycles}: {', '.join(due)}")
+        start = time.perf_counter()
+        self._write_metrics()
+        self._in_cycle = True
+        run = metrics.begin_run("cycle")
+        try:
+            run_cycle(
+                self.config,
+                self.store,
+                self.near_dupes,
+                due,
+                email_empty=False,
+                run=run,
+                outbox=self.outbox,
+                digest_cache=self.digest_cache,
+            )
+        except KeyboardInterrupt:
+            raise
+        except Exception:
+            logger.exception(f"[Daemon] Cycle {self.cycles} failed — its results were discarded")
+            self._discard_cycle()
+        else:
+            # The outbox worker delivers this cycle's digest in the
+            # background: keep the record open for it until the next cycle
+            run.stop()
+            self._unwritten = run
+        finally:
+            self._in_cycle = False
+
+        finished = time.monotonic()
+        for name in due:
+            self.next_due[name] = finished + self.interval(name)
+        logger.info(f"[Daemon] Cycle {self.cycles} took {time.perf_counter() - start:.1f}s")
+
+    def run_forever(self) -> None:
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, self._handle_signal)
+
+        keep_sessions_warm(self.sessions)
+        keep_states_warm(self.states)
+        logger.info(f"=== JobSearch AI Agent daemon started — sources: {', '.join(self.scrapers) or 'none'} ===")
+
+        committed = True
+        try:
+            while not self._stop.is_set():
+                self.reload_if_changed()
+                self.run_once()
+                if self._stop.is_set():
+                    break
+                now = time.monotonic()
+                next_run = min(self.next_due.values(), default=now + self._reload_check())
+                self._stop.wait(max(0.0, min(next_run - now, self._reload_check())))
+        except KeyboardInterrupt:
+            logger.warning("[Daemon] Cycle aborted — its results were not committed.")
+            committed = False
+        finally:
+            keep_sessions_warm(None)
+            keep_states_warm(None)
+            self.sessions.close()
+            if self.outbox is not None:
+                self.outbox.stop(flush_seconds(self.config))
+            self._write_metrics()
+            if committed:
+                self.store.commit()
+                if self.near_dupes is not None:
+                    self.near_dupes.save(NEAR_DUPES_PATH)
+            self.store.close()
+            logger.info("=== JobSearch AI Agent daemon stopped ===")
@@ -0,0 +1,132 @@
+# benchmarks/bench_card_parsing.py
+
+"""
+Card-parsing micro-benchmark over saved LinkedIn result pages.
+
+Parses every fixture in benchmarks/fixtures/linkedin_*.html with each
+installed HTML backend, reports cards/sec, and checks that every backend
+produces exactly the same job dicts as the original bs4 + html.parser
+find()-per-field extractor. Exits non-zero on any parity mismatch.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_card_parsing [--rounds 50]
+"""
+
+from __future__ import annotations
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from bs4 import BeautifulSoup
+
+from scrapers.linkedin_scraper import _job_id, _parse_cards, _parse_posted_age
+from utils.html_backend import available_backends, get_backend
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def _legacy_parse_cards(html: str) -> List[Dict[str, Any]]:
+    """
+    The pre-backend extractor: html.parser and one find() per field.
+    Kept here as the parity reference and the speed baseline.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    jobs = []
+
+    for card in soup.find_all("div", class_="base-card"):
+        title_tag = card.find("h3", class_="base-search-card__title")
+        company_tag = card.find("h4", class_="base-search-card__subtitle")
+        location_tag = card.find("span", class_="job-search-card__location")
+        link_tag = card.find("a", class_="base-card__full-link")
+        time_tag = card.find("time")
+        listdate_tag = card.find("span", class_="job-search-card__listdate")
+        listdate_new_tag = card.find("span", class_="job-search-card__listdate--new")
+
+        posted_raw = None
+        if time_tag and time_tag.get_text(strip=True):
+            posted_raw = time_tag.get_text(strip=True)
+        elif listdate_tag and listdate_tag.get_text(strip=True):
+            posted_raw = listdate_tag.get_text(strip=True)
+        elif listdate_new_tag and listdate_new_tag.get_text(strip=True):
+            posted_raw = listdate_new_tag.get_text(strip=True)
+
+        days_since = _parse_posted_age(posted_raw)
+
+        title = title_tag.get_text(strip=True) if title_tag else ""
+        company = company_tag.get_text(strip=True) if company_tag else ""
+        location = location_tag.get_text(strip=True) if location_tag else ""
+        url = link_tag.get("href", "") if link_tag else ""
+        if url:
+            url = url.split("?")[0]
+
+        if title and url:
+            job = {
+                "title": title,
+                "company": company,
+                "location": location,
+                "url": url,
+                "source": "linkedin",
+            }
+            job_id = _job_id(url)
+            if job_id:
+                job["job_id"] = job_id
+            if posted_raw:
+                job["posted_age_raw"] = posted_raw
+            if days_since is not None:
+                job["days_since_posted"] = days_since
+            jobs.append(job)
+
+    return jobs
+
+
+def _time_it(parse: Callable[[str], List[Dict[str, Any]]], pages: List[str], rounds: int) -> float:
+    """
+    Returns cards parsed per second.
+    """
+    cards = 0
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for html in pages:
+            cards += len(parse(html))
+    elapsed = time.perf_counter() - start
+    return cards / elapsed if elapsed else float("inf")
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rounds", type=int, default=50)
+    args = ap.parse_args(argv)
+
+    pages = [p.read_text(encoding="utf-8") for p in sorted(FIXTURES.glob("linkedin_*.html"))]
+    if not pages:
+        print(f"No fixtures found in {FIXTURES}")
+        return 1
+
+    reference = [_legacy_parse_cards(html) for html in pages]
+    n_cards = sum(len(r) for r in reference)
+
+    candidates: Dict[str, Callable[[str], List[Dict[str, Any]]]] = {
+        "legacy (bs4/html.parser, find per field)": _legacy_parse_cards,
+    }
+    for name in available_backends():
+        backend = get_backend(name)
+        label = f"{name} (bs4/{backend.features})" if name == "bs4" else name
+        candidates[label] = lambda html, backend=backend: _parse_cards(html, backend)
+
+    print(f"{len(pages)} page(s), {n_cards} cards, {args.rounds} rounds\n")
+    print(f"{'backend':<44} {'cards/sec':>12}  parity")
+
+    ok = True
+    for label, parse in candidates.items():
+        same = [parse(html) for html in pages] == reference
+        ok = ok and same
+        rate = _time_it(parse, pages, args.rounds)
+        print(f"{label:<44} {rate:>12,.0f}  {'ok' if same else 'MISMATCH'}")
+
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+# benchmarks/bench_history_store.py
+
+"""
+Per-run history save/load time vs. history size.
+
+For each size, writes a history of synthetic jobs, then times one agent
+run against it: open (load), dedupe a scrape of --run jobs (half already
+tracked, half new) and commit (save). Compared backends:
+  - json:     whole-file history/job_history.json (load_json_history/save_json_history)
+  - journal:  storage.journal_store (snapshot + append-only journal)
+  - sqlite:   storage.sqlite_store
+The journal's load and save should stay flat as history grows; the JSON
+file's grow linearly.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_history_store [--sizes 1000 10000 100000 1000000] [--run 200]
+"""
+
+from __future__ import annotations
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from processor.dedupe import index_history, iter_dedupe_jobs
+from storage.history import load_json_history, save_json_history
+from storage.journal_store import JournalHistoryStore, write_snapshot
+from storage.sqlite_store import SqliteJobStore
+
+
+def make_job(i: int) -> Dict[str, Any]:
+    return {
+        "title": f"Software Engineer {i}",
+        "company": f"Company {i % 5000}",
+        "location": "Remote",
+        "url": f"https://www.linkedin.com/jobs/view/{1_000_000 + i}",
+        "days_since_posted": i % 30,
+    }
+
+
+def make_run(size: int, n: int) -> List[Dict[str, Any]]:
+    known = [make_job(i * (size // max(1, n // 2))) for i in range(n // 2)]
+    return known + [make_job(size + i) for i in range(n - n // 2)]
+
+
+def _timed(fn: Callable[[], Any]) -> Tuple[float, Any]:
+    start = time.perf_counter()
+    out = fn()
+    return time.perf_counter() - start, out
+
+
+def bench_json(tmp: Path, history: List[Dict[str, Any]], run: List[Dict[str, Any]]) -> Tuple[float, float]:
+    path = tmp / "job_history.json"
+    save_json_history(path, history)
+
+    load_s, index = _timed(lambda: index_history(load_json_history(path)))
+    list(iter_dedupe_jobs(run, index))
+    save_s, _ = _timed(lambda: save_json_history(path, list(index.values())))
+    return load_s, save_s
+
+
+def bench_journal(tmp: Path, history: List[Dict[str, Any]], run: List[Dict[str, Any]]) -> Tuple[float, float]:
+    directory = tmp / "journal"
+    directory.mkdir()
+    write_snapshot(directory / "snapshot-000000000000.bin", history, 0)
+
+    load_s, store = _timed(lambda: JournalHistoryStore(directory))
+    list(iter_dedupe_jobs(run, store.index))
+    save_s, _ = _timed(lambda: store.commit(compact=False))
+    store.close()
+    return load_s, save_s
+
+
+def bench_sqlite(tmp: Path, history: List[Dict[str, Any]], run: List[Dict[str, Any]]) -> Tuple[float, float]:
+    path = tmp / "jobs.db"
+    seed = SqliteJobStore(path)
+    seed.import_jobs(history)
+    seed.close()
+
+    load_s, store = _timed(lambda: SqliteJobStore(path))
+    list(iter_dedupe_jobs(run, store.index))
+    save_s, _ = _timed(store.commit)
+    store.close()
+    return load_s, save_s
+
+
+BACKENDS = {"json": bench_json, "journal": bench_journal, "sqlite": bench_sqlite}
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    ap.add_argument("--run", type=int, default=200, help="jobs scraped per simulated run")
+    ap.add_argument("--backends", nargs="+", choices=sorted(BACKENDS), default=list(BACKENDS))
+    args = ap.parse_args(argv)
+
+    print(f"{'history':>10} {'backend':<8} {'load (ms)':>10} {'save (ms)':>10}")
+    for size in args.sizes:
+        history = [make_job(i) for i in range(size)]
+        run = make_run(size, args.run)
+        for name in args.backends:
+            tmp = Path(tempfile.mkdtemp(prefix="bench_history_"))
+            try:
+                load_s, save_s = BACKENDS[name](tmp, history, [dict(j) for j in run])
+            finally:
+                shutil.rmtree(tmp, ignore_errors=True)
+            print(f"{size:>10,} {name:<8} {load_s * 1000:>10.1f} {save_s * 1000:>10.1f}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+# benchmarks/bench_job_record.py
+
+"""
+Job record benchmark: processor.job.Job vs. plain dicts.
+
+Builds an in-memory history (default 500k jobs) in both representations
+and reports:
+  - memory:  bytes per job for the records plus the dedupe index
+             (tracemalloc; interned strings shared across jobs count once)
+  - build:   time to construct the records from JSON-like dicts
+  - index:   index_history() over the whole history
+  - dedupe:  iter_dedupe_jobs() over a scrape of --run jobs (half known)
+and checks both representations dedupe to the same jobs.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_job_record [--history 500000] [--run 100000]
+"""
+
+from __future__ import annotations
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+from processor.dedupe import index_history, iter_dedupe_jobs
+from processor.job import Job
+
+LOCATIONS = ["Remote", "San Francisco, CA", "New York, NY", "Austin, TX", "Seattle, WA"]
+
+
+def make_rows(n: int, offset: int = 0) -> List[Dict[str, Any]]:
+    """
+    Job dicts as they come back from json.loads (no shared strings).
+    """
+    rows = []
+    for i in range(offset, offset + n):
+        rows.append({
+            "source": "linkedin",
+            "job_id": str(3_800_000_000 + i),
+            "title": f"Senior Software Engineer {i % 9973}",
+            "company": f"Company {i % 4000}",
+            "location": LOCATIONS[i % len(LOCATIONS)],
+            "url": f"https://www.linkedin.com/jobs/view/senior-software-engineer-{3_800_000_000 + i}",
+            "posted_age_raw": f"{i % 30} days ago",
+            "days_since_posted": i % 30,
+            "role_type": "other",
+            "relevance": 0.0,
+        })
+    return json.loads(json.dumps(rows))
+
+
+def _timed(fn: Callable[[], Any]) -> Tuple[float, Any]:
+    gc.collect()
+    start = time.perf_counter()
+    out = fn()
+    return time.perf_counter() - start, out
+
+
+def _measure(build: Callable[[], Any]) -> Tuple[int, Any]:
+    gc.collect()
+    tracemalloc.start()
+    out = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, out
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--history", type=int, default=500_000)
+    ap.add_argument("--run", type=int, default=100_000)
+    args = ap.parse_args(argv)
+
+    half = args.run // 2
+    convert = {"dict": lambda rows: rows, "Job": lambda rows: [Job.from_dict(r) for r in rows]}
+
+    print(f"{args.history:,} jobs in history, {args.run:,} scraped ({half:,} already tracked)\n")
+    print(f"{'record':<6} {'bytes/job':>10} {'build (s)':>10} {'index (s)':>10} {'dedupe (s)':>11} {'new':>8}")
+
+    results = {}
+    for name, to_records in convert.items():
+        # Memory: records + index, built from fresh JSON rows
+        bytes_used, _ = _measure(lambda: index_history(to_records(make_rows(args.history))))
+        gc.collect()
+
+        rows = make_rows(args.history)
+        build_s, history = _timed(lambda: to_records(rows))
+        rows = None  # free the raw rows before indexing
+        index_s, index = _timed(lambda: index_history(history))
+
+        scraped = to_records(make_rows(half, offset=0) + make_rows(args.run - half, offset=args.history))
+        dedupe_s, new = _timed(lambda: list(iter_dedupe_jobs(scraped, index)))
+
+        results[name] = [j["url"] for j in new]
+        print(
+            f"{name:<6} {bytes_used / args.history:>10,.0f} {build_s:>10.2f} {index_s:>10.2f} "
+            f"{dedupe_s:>11.3f} {len(new):>8,}"
+        )
+        history = index = scraped = new = None
+        gc.collect()
+
+    same = results["dict"] == results["Job"]
+    print(f"\nparity: {'ok' if same else 'MISMATCH'}")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+# benchmarks/bench_keyword_matching.py
+
+"""
+Keyword-matching benchmark: compiled matcher vs. the per-keyword loops.
+
+Generates a synthetic corpus (default 10k jobs × 500 keywords) and times:
+  - "any" matching, as used by filter_jobs:  any(kw in text for kw in kws)
+  - "all" matching, as needed for tags:      [kw for kw in kws if kw in text]
+against processor.tags.KeywordMatcher.search / find_all over title and
+description. Results are checked for equality. Exits non-zero on mismatch.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_keyword_matching [--jobs 10000] [--keywords 500]
+"""
+
+from __future__ import annotations
+import argparse
+import random
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+from processor.tags import KeywordMatcher
+
+VOCAB = (
+    "software engineer data analyst scientist machine learning research intern "
+    "senior staff principal manufacturing test quality process automation robotics "
+    "backend frontend platform infrastructure cloud security embedded firmware "
+    "hardware systems reliability site python java rust golang kubernetes "
+    "computer vision nlp deep reinforcement controls mechanical electrical "
+    "production supply chain operations product manager lead director"
+).split()
+
+FILLER = (
+    "we are looking for a team member to join our growing group and help build "
+    "great products with a focus on impact ownership and collaboration across "
+    "functions while delivering results in a fast paced environment"
+).split()
+
+
+def make_corpus(n_jobs: int, n_keywords: int, seed: int = 42) -> Tuple[List[str], List[Dict[str, str]]]:
+    rng = random.Random(seed)
+
+    keywords = set()
+    while len(keywords) < n_keywords:
+        keywords.add(" ".join(rng.sample(VOCAB, rng.choice((1, 2, 2, 3)))))
+    keywords = sorted(keywords)
+
+    jobs = []
+    for _ in range(n_jobs):
+        title = " ".join(rng.sample(VOCAB, 4)).title()
+        desc = " ".join(rng.choice(FILLER if rng.random() < 0.8 else VOCAB) for _ in range(80))
+        jobs.append({"title": title, "description": desc})
+    return keywords, jobs
+
+
+def _time(fn: Callable[[], object]) -> Tuple[float, object]:
+    start = time.perf_counter()
+    out = fn()
+    return time.perf_counter() - start, out
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--jobs", type=int, default=10_000)
+    ap.add_argument("--keywords", type=int, default=500)
+    args = ap.parse_args(argv)
+
+    keywords, jobs = make_corpus(args.jobs, args.keywords)
+    lowered = [kw.lower() for kw in keywords]
+    fields = [(j["title"], j["description"]) for j in jobs]
+
+    def loop_any():
+        return [
+            any(kw in t.lower() for kw in lowered) or any(kw in d.lower() for kw in lowered)
+            for t, d in fields
+        ]
+
+    def loop_all():
+        return [
+            {kw for kw in lowered if kw in t.lower()} | {kw for kw in lowered if kw in d.lower()}
+            for t, d in fields
+        ]
+
+    compile_s, matcher = _time(lambda: KeywordMatcher(keywords))
+
+    def matcher_any():
+        return [matcher.search(t) or matcher.search(d) for t, d in fields]
+
+    def matcher_all():
+        return [matcher.find_all(t) | matcher.find_all(d) for t, d in fields]
+
+    print(f"{args.jobs:,} jobs × {len(keywords)} keywords (title + description)")
+    print(f"matcher compile: {compile_s * 1000:.1f} ms\n")
+    print(f"{'mode':<6} {'loops (s)':>10} {'matcher (s)':>12} {'speedup':>8}  parity")
+
+    ok = True
+    for mode, loop_fn, matcher_fn in (("any", loop_any, matcher_any), ("all", loop_all, matcher_all)):
+        loop_s, expected = _time(loop_fn)
+        match_s, got = _time(matcher_fn)
+        same = got == expected
+        ok = ok and same
+        print(
+            f"{mode:<6} {loop_s:>10.3f} {match_s:>12.3f} {loop_s / match_s:>7.1f}x  "
+            f"{'ok' if same else 'MISMATCH'}"
+        )
+
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+# benchmarks/bench_near_dupes.py
+
+"""
+Near-duplicate lookup latency vs. history size.
+
+For each history size, builds a NearDupIndex from synthetic postings,
+then looks up a fixed set of probe jobs (half reposts with reworded
+titles, half unseen) and reports per-lookup latency. With LSH the
+lookup cost should stay roughly flat as history grows.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_near_dupes [--sizes 1000 10000 100000] [--probes 1000]
+"""
+
+from __future__ import annotations
+import argparse
+import random
+import re
+import statistics
+import sys
+import time
+from typing import Dict, List
+
+from processor.near_dupes import NearDupIndex
+
+LEVELS = ["", "Senior ", "Sr. ", "Staff ", "Principal ", "Junior "]
+ROLES = [
+    "Software Engineer", "Data Analyst", "Data Scientist", "Machine Learning Engineer",
+    "Manufacturing Engineer", "Test Engineer", "Product Manager", "Backend Developer",
+    "Site Reliability Engineer", "Research Scientist", "Firmware Engineer", "Quality Engineer",
+]
+SUFFIXES = ["", " I", " II", " III", ", Platform", ", Infrastructure", " - Remote", " (Python)"]
+LOCATIONS = ["San Francisco, CA", "Remote", "New York, NY", "Austin, TX", "Seattle, WA", "Boston, MA"]
+REWORD = [
+    (re.compile(r"\bSenior\b"), "Sr."),
+    (re.compile(r"\bSr\."), "Senior"),
+    (re.compile(r"\bIII$"), "3"),
+    (re.compile(r"\bII$"), "2"),
+    (re.compile(r"\bI$"), "1"),
+]
+
+
+def make_job(rng: random.Random, n_companies: int) -> Dict[str, str]:
+    return {
+        "title": rng.choice(LEVELS) + rng.choice(ROLES) + rng.choice(SUFFIXES),
+        "company": f"Company {rng.randrange(n_companies)}, Inc.",
+        "location": rng.choice(LOCATIONS),
+    }
+
+
+def reword(job: Dict[str, str]) -> Dict[str, str]:
+    title = job["title"]
+    for pattern, new in REWORD:
+        title = pattern.sub(new, title)
+    return {**job, "title": title, "company": job["company"].replace(", Inc.", "")}
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    ap.add_argument("--probes", type=int, default=1_000)
+    args = ap.parse_args(argv)
+
+    print(f"{'history':>10} {'build (s)':>10} {'clusters':>9} {'sig (µs)':>9} {'lookup p50 (µs)':>16} {'p95 (µs)':>9} {'reposts found':>14}")
+
+    for size in args.sizes:
+        rng = random.Random(size)
+        n_companies = max(50, size // 20)
+        history = [make_job(rng, n_companies) for _ in range(size)]
+
+        start = time.perf_counter()
+        index = NearDupIndex()
+        for job in history:
+            index.assign(job)
+        build_s = time.perf_counter() - start
+
+        half = args.probes // 2
+        probes = [reword(rng.choice(history)) for _ in range(half)]
+        probes += [make_job(rng, n_companies * 10) for _ in range(args.probes - half)]
+        sigs = [index.signature(p) for p in probes]
+
+        start = time.perf_counter()
+        for p in probes:
+            index.signature(p)
+        sig_us = (time.perf_counter() - start) / len(probes) * 1e6
+
+        latencies = []
+        found = 0
+        for p, sig in zip(probes[:half], sigs[:half]):
+            t0 = time.perf_counter()
+            if index.query(p, sig) is not None:
+                found += 1
+            latencies.append(time.perf_counter() - t0)
+        for p, sig in zip(probes[half:], sigs[half:]):
+            t0 = time.perf_counter()
+            index.query(p, sig)
+            latencies.append(time.perf_counter() - t0)
+
+        latencies.sort()
+        p50 = statistics.median(latencies) * 1e6
+        p95 = latencies[int(len(latencies) * 0.95)] * 1e6
+        print(
+            f"{size:>10,} {build_s:>10.2f} {len(index):>9,} {sig_us:>9.1f} {p50:>16.1f} {p95:>9.1f} "
+            f"{found:>7}/{half:<6}"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
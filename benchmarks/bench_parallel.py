@@ -0,0 +1,65 @@
+# benchmarks/bench_parallel.py
+
+"""
+Batch-mode scaling: processor.parallel.BatchProcessor at 1/2/4/8 workers.
+
+Times BatchProcessor.filter_classify() over --jobs generated jobs
+(benchmarks.suite corpus and keyword sets) for each worker count.
+1 worker is the in-process path. Pool start-up is included, as it is in a
+real run. Every worker count must produce the same jobs in the same order
+as the in-process run; the script exits non-zero otherwise.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_parallel [--jobs 100000] [--workers 1 2 4 8]
+"""
+
+from __future__ import annotations
+import argparse
+import os
+import sys
+import time
+from typing import Any, Callable, List, Tuple
+
+from benchmarks.suite import CONFIG, make_jobs
+from processor.parallel import BatchProcessor
+
+
+def _timed(fn: Callable[[], Any]) -> Tuple[float, Any]:
+    start = time.perf_counter()
+    out = fn()
+    return time.perf_counter() - start, out
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--jobs", type=int, default=100_000)
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    ap.add_argument("--chunk-size", type=int, default=2000)
+    args = ap.parse_args(argv)
+
+    jobs = make_jobs(args.jobs)
+
+    print(f"{args.jobs:,} jobs, {os.cpu_count()} CPUs\n")
+    print(f"{'workers':>7} {'filter+classify (s)':>20} {'speedup':>8}")
+
+    reference = None
+    base = None
+    ok = True
+    for workers in args.workers:
+        with BatchProcessor(CONFIG, workers=workers, chunk_size=args.chunk_size, min_jobs=0) as batch:
+            fc_s, relevant = _timed(lambda: batch.filter_classify(jobs))
+
+        result = [(j.url, j.relevance, j.role_type) for j in relevant]
+        if reference is None:
+            reference, base = result, fc_s
+        elif result != reference:
+            ok = False
+
+        print(f"{workers:>7} {fc_s:>20.2f} {base / fc_s:>7.2f}x")
+
+    print(f"\nparity: {'ok' if ok else 'MISMATCH'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+# benchmarks/bench_scoring.py
+
+"""
+Relevance-scoring benchmark: re-ranking a large history.
+
+Builds a synthetic history (default 50k jobs) and a search_filters config
+with a few categories, then times:
+  - match:   scanning title/company/description into the job×keyword matrix
+  - rerank:  scoring that matrix against the weights (NumPy, if installed)
+  - python:  the same scoring without NumPy
+and checks both scoring paths agree. Re-ranking with new weights only
+repeats the rerank step.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_scoring [--jobs 50000] [--keywords 200]
+"""
+
+from __future__ import annotations
+import argparse
+import sys
+import time
+from typing import List
+
+from benchmarks.bench_keyword_matching import make_corpus
+from processor import scoring
+from processor.scoring import RelevanceScorer
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--jobs", type=int, default=50_000)
+    ap.add_argument("--keywords", type=int, default=200)
+    args = ap.parse_args(argv)
+
+    keywords, jobs = make_corpus(args.jobs, args.keywords)
+    for i, job in enumerate(jobs):
+        job["company"] = f"Company {i % 997}"
+
+    categories = ("ai_research", "manufacturing_engineering", "platform", "data")
+    config = {
+        "search_filters": {
+            name: {"keywords": {kw: 1.0 + (j % 3) for j, kw in enumerate(keywords[i::len(categories)])}}
+            for i, name in enumerate(categories)
+        }
+    }
+    scorer = RelevanceScorer(config)
+
+    start = time.perf_counter()
+    mm = scorer.match_matrix(jobs)
+    match_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fast = scorer.score_matrix(mm)
+    rerank_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    slow = scorer._score_python(mm)
+    python_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scorer.score_jobs(jobs, mm)
+    attach_s = time.perf_counter() - start
+
+    print(f"{args.jobs:,} jobs, {len(scorer.vocab)} keywords, {len(categories)} categories, {len(mm.rows):,} matches")
+    print(f"numpy: {'yes' if scoring._numpy() is not None else 'no (pure-Python fallback)'}\n")
+    print(f"match (scan text → matrix)     {match_s:8.3f} s")
+    print(f"rerank (matrix @ weights)      {rerank_s:8.3f} s")
+    print(f"rerank, pure Python            {python_s:8.3f} s")
+    print(f"rerank + attach to job dicts   {attach_s:8.3f} s")
+
+    same = fast == slow
+    print(f"\nparity: {'ok' if same else 'MISMATCH'}")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
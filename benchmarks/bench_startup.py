@@ -0,0 +1,135 @@
+# benchmarks/bench_startup.py
+
+"""
+Cold-start cost of the run_agent command line.
+
+Runs each lightweight command in a fresh interpreter under
+`python -X importtime`, in a scratch directory holding a copy of
+config/config.example.json (email off) and a small processed.json, and
+reports for each:
+  - wall         median wall time of the whole process
+  - imports      median import time spent beyond a bare interpreter
+                 (`python -c pass`), from the -X importtime log
+  - heaviest     the top-level imports that cost the most
+  - heavy mods   any of HEAVY_MODULES that got imported (there should be
+                 none: those belong to scrape/process/send)
+
+The script exits non-zero when a command's import time is over
+--target-ms or it imports a heavy module.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_startup [--repeat 5] [--target-ms 40]
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Modules only the scrape/process/send paths should pay for
+HEAVY_MODULES = ("requests", "bs4", "lxml", "numpy", "smtplib", "concurrent.futures.process")
+
+COMMANDS = [
+    ["--help"],
+    ["history", "stats"],
+    ["digest"],
+]
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def _parse_importtime(stderr: str) -> Tuple[Dict[str, int], List[str]]:
+    """
+    ({top-level module: cumulative µs}, every module imported).
+    """
+    top: Dict[str, int] = {}
+    modules: List[str] = []
+    for line in stderr.splitlines():
+        m = _LINE.match(line)
+        if not m:
+            continue
+        _, cumulative, indent, name = m.groups()
+        modules.append(name)
+        if len(indent) <= 1:
+            top[name] = top.get(name, 0) + int(cumulative)
+    return top, modules
+
+
+def _run(args: List[str], cwd: Path) -> Tuple[float, Dict[str, int], List[str]]:
+    env = {**os.environ, "PYTHONPATH": str(ROOT), "PYTHONDONTWRITEBYTECODE": "1"}
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args], cwd=cwd, env=env, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise SystemExit(f"{' '.join(args)} failed:\n{proc.stderr[-2000:]}")
+    top, modules = _parse_importtime(proc.stderr)
+    return wall, top, modules
+
+
+def _scratch_dir() -> Path:
+    work = Path(tempfile.mkdtemp(prefix="bench_startup_"))
+    config = json.loads((ROOT / "config" / "config.example.json").read_text(encoding="utf-8"))
+    config.setdefault("email_notifications", {})["enabled"] = False
+    config["digest"] = {"extra_outputs": []}
+    (work / "config").mkdir()
+    (work / "config" / "config.json").write_text(json.dumps(config), encoding="utf-8")
+    (work / "outputs").mkdir()
+    job = {"title": "Software Engineer", "company": "Acme", "location": "Remote", "url": "https://example.com/1"}
+    (work / "outputs" / "processed.json").write_text(
+        json.dumps({"total_in_history": 1, "new": [job], "relevant": [job]}), encoding="utf-8"
+    )
+    return work
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--target-ms", type=float, default=40.0, help="max import time per command, beyond the interpreter")
+    args = ap.parse_args(argv)
+
+    work = _scratch_dir()
+    try:
+        base = [_run(["-c", "pass"], work) for _ in range(args.repeat)]
+        base_wall = statistics.median(w for w, _, _ in base)
+        base_imports = statistics.median(sum(t.values()) for _, t, _ in base)
+        print(f"bare interpreter: {base_wall * 1000:.0f} ms wall, {base_imports / 1000:.0f} ms imports\n")
+        print(f"{'command':<16} {'wall (ms)':>9} {'imports (ms)':>12}  heaviest imports")
+
+        ok = True
+        for command in COMMANDS:
+            runs = [_run([str(ROOT / "run_agent.py"), *command], work) for _ in range(args.repeat)]
+            wall = statistics.median(w for w, _, _ in runs)
+            imports = (statistics.median(sum(t.values()) for _, t, _ in runs) - base_imports) / 1000
+            top = runs[-1][1]
+            own = sorted(((n, us) for n, us in top.items() if n not in base[-1][1]), key=lambda kv: -kv[1])
+            heaviest = ", ".join(f"{name} {us / 1000:.0f}" for name, us in own[:4])
+            heavy = [m for m in HEAVY_MODULES if m in runs[-1][2]]
+
+            label = " ".join(command)
+            print(f"{label:<16} {wall * 1000:>9.0f} {imports:>12.1f}  {heaviest}")
+            if heavy:
+                print(f"{'':<16} imports heavy modules: {', '.join(heavy)}")
+            if heavy or imports > args.target_ms:
+                ok = False
+
+        print(f"\ntarget: imports ≤ {args.target_ms:.0f} ms, no heavy modules — {'ok' if ok else 'MISSED'}")
+        return 0 if ok else 1
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
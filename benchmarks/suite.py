@@ -0,0 +1,344 @@
+# benchmarks/suite.py
+
+"""
+Stage-by-stage benchmark suite with JSON baselines.
+
+Each pipeline stage is timed in isolation:
+  - posted_age        _parse_posted_age() over 10k realistic "posted" strings
+  - scrape_linkedin   scrape_linkedin() end to end against a local HTTP
+                      stand-in serving the recorded result page in
+                      benchmarks/fixtures/ (job ids rewritten per page)
+  - filter_<n>        filter_jobs() on n generated jobs
+  - classify_<n>      classify_jobs() on n generated jobs
+  - dedupe_<n>        dedupe_jobs() of a 1k-job scrape (half already known)
+                      against an n-job history
+  - digest_<n>        build_digest() rendering n classified jobs
+for n in --sizes (default 1k, 10k, 100k). The job corpus is generated with a
+fixed seed, with keyword sets modelled on config/config.example.json.
+
+Every case runs --repeat times; the fastest run is the headline number.
+
+    python -m benchmarks.suite                       # run and print
+    python -m benchmarks.suite --save                # ... and store benchmarks/baselines/<host>.json
+    python -m benchmarks.suite --compare benchmarks/baselines/<host>.json [--threshold 0.2]
+
+--compare prints each case's change against the baseline and exits
+non-zero when any case is slower by more than --threshold (a fraction).
+Baselines are machine-specific; compare runs from the same machine.
+"""
+
+from __future__ import annotations
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from output.digest_builder import build_digest
+from processor.dedupe import dedupe_jobs
+from processor.filters import filter_jobs
+from processor.job import Job
+from processor.relevance_classifier import classify_jobs
+from scrapers.linkedin_scraper import _parse_posted_age, scrape_linkedin
+from utils.html_backend import get_backend
+
+FIXTURES = Path(__file__).parent / "fixtures"
+BASELINES = Path(__file__).parent / "baselines"
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+
+# ----- synthetic corpus ---------------------------------------------------
+
+SENIORITY = ["", "Junior ", "Senior ", "Staff ", "Principal ", "Lead "]
+ROLES = [
+    "Software Engineer", "Data Analyst", "Machine Learning Engineer", "Research Scientist",
+    "Manufacturing Engineer", "Test Engineer", "Process Engineer", "Backend Developer",
+    "Frontend Developer", "Product Manager", "Data Engineer", "Software Engineer Intern",
+    "AI Research Intern", "Quality Engineer", "Site Reliability Engineer", "Sales Associate",
+]
+LOCATIONS = [
+    "Remote", "New York, NY", "San Francisco, CA", "Austin, TX", "Seattle, WA",
+    "Boston, MA", "Chicago, IL", "USA", "London, UK", "Berlin, Germany",
+]
+DESCRIPTION_WORDS = (
+    "we are looking for a motivated engineer to join our team and build reliable systems "
+    "you will work with python sql cloud infrastructure and modern tooling across the stack "
+    "experience with machine learning research manufacturing process test automation data "
+    "pipelines distributed systems ai models is a plus collaborate with cross functional partners"
+).split()
+POSTED = [
+    "Just posted", "1 hour ago", "20 hours ago", "Today", "1 day ago", "3 days ago",
+    "1 week ago", "2 weeks ago", "1 month ago", "30+ days ago", "5 minutes ago", "",
+]
+
+CONFIG: Dict[str, Any] = {
+    "scrapers": {
+        "linkedin": {
+            "keywords": ["Software Engineer", "Data Analyst", "Intern", "Machine Learning", "Test Engineer"],
+            "location_keywords": ["Remote", "New York", "USA", "San Francisco"],
+        }
+    },
+    "filters": {"max_post_age_days": 30},
+    "search_filters": {
+        "ai_research": {"keywords": ["Machine Learning", "Research", "AI", "Deep Learning", "NLP"]},
+        "manufacturing_engineering": {
+            "keywords": {"Manufacturing": 2.0, "Process": 1.0, "Test": 0.5, "Quality": 1.0}
+        },
+        "software": {"keywords": ["Software", "Backend", "Frontend", "Python", "Distributed Systems"]},
+        "data": {"keywords": {"Data": 1.5, "SQL": 1.0, "Analytics": 1.0, "Pipelines": 0.5}},
+    },
+    "ranking": {"top_n": 3},
+}
+
+
+def make_jobs(n: int, seed: int = 7, offset: int = 0) -> List[Job]:
+    rng = random.Random(seed + offset)
+    jobs = []
+    for i in range(offset, offset + n):
+        title = rng.choice(SENIORITY) + rng.choice(ROLES)
+        job_id = str(3_800_000_000 + i)
+        jobs.append(Job(
+            title,
+            f"Company {rng.randrange(2000)}",
+            rng.choice(LOCATIONS),
+            f"https://www.linkedin.com/jobs/view/{title.lower().replace(' ', '-')}-{job_id}",
+            source="linkedin",
+            job_id=job_id,
+            days_since_posted=rng.randrange(45),
+            description=" ".join(rng.choice(DESCRIPTION_WORDS) for _ in range(60)),
+        ))
+    return jobs
+
+
+# ----- local LinkedIn stand-in --------------------------------------------
+
+_ID_RE = re.compile(r"-(\d{10})\?")
+
+
+class _SearchHandler(BaseHTTPRequestHandler):
+    page_html = ""
+    pages = 8
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        start = int(parse_qs(urlsplit(self.path).query).get("start", ["0"])[0])
+        page = start // 25
+        if page < self.pages:
+            body = _ID_RE.sub(lambda m: f"-{int(m.group(1)) + page * 1_000_000}?", self.page_html)
+        else:
+            body = "<html><body></body></html>"
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+@contextlib.contextmanager
+def search_server(pages: int) -> Any:
+    handler = type("Handler", (_SearchHandler,), {
+        "page_html": next(FIXTURES.glob("linkedin_*.html")).read_text(encoding="utf-8"),
+        "pages": pages,
+    })
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=srv.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True).start()
+    try:
+        yield f"http://127.0.0.1:{srv.server_address[1]}/jobs/search/"
+    finally:
+        srv.shutdown()
+        srv.server_close()
+
+
+# ----- cases --------------------------------------------------------------
+
+Case = Tuple[str, Callable[[], Any], int]  # name, run(), items per run
+
+
+def cases_posted_age(args: argparse.Namespace) -> List[Case]:
+    rng = random.Random(1)
+    raw = [rng.choice(POSTED) for _ in range(10_000)]
+    return [("posted_age", lambda: [_parse_posted_age(s) for s in raw], len(raw))]
+
+
+def cases_scrape(args: argparse.Namespace) -> List[Case]:
+    pages = 8
+
+    def run() -> int:
+        with search_server(pages) as url:
+            config = {
+                "scrapers": {"linkedin": {
+                    "keywords": ["Software Engineer"], "location_keywords": ["Remote"],
+                    "base_url": url, "max_pages": pages + 1, "min_request_interval": 0,
+                    "request_jitter": 0, "max_in_flight": 4,
+                }},
+                "http_cache": {"enabled": False},
+            }
+            jobs = scrape_linkedin(config)
+        assert len(jobs) == pages * 25, len(jobs)
+        return len(jobs)
+
+    return [("scrape_linkedin", run, pages * 25)]
+
+
+def cases_filter_classify(args: argparse.Namespace) -> List[Case]:
+    out = []
+    for n in args.sizes:
+        jobs = make_jobs(n)
+        out.append((f"filter_{n}", lambda jobs=jobs: filter_jobs(jobs, CONFIG), n))
+        out.append((f"classify_{n}", lambda jobs=jobs: classify_jobs(jobs, CONFIG), n))
+    return out
+
+
+def cases_dedupe(args: argparse.Namespace) -> List[Case]:
+    out = []
+    run_size = 1_000
+    for n in args.sizes:
+        history = make_jobs(n)
+        known = history[:: max(1, n // (run_size // 2))][: run_size // 2]
+
+        def run(history=history, known=known, n=n) -> int:
+            scraped = [Job.from_dict(j.to_dict()) for j in known] + make_jobs(run_size - len(known), offset=n)
+            new, _ = dedupe_jobs(scraped, history)
+            return len(new)
+
+        out.append((f"dedupe_{n}", run, run_size))
+    return out
+
+
+def cases_digest(args: argparse.Namespace) -> List[Case]:
+    out = []
+    tmp = Path(tempfile.mkdtemp(prefix="bench_digest_"))
+    for n in args.sizes:
+        jobs = classify_jobs(make_jobs(n), CONFIG)
+        path = tmp / f"digest_{n}.md"
+        out.append((
+            f"digest_{n}",
+            lambda jobs=jobs, path=path: build_digest(jobs, jobs, len(jobs), path),
+            n,
+        ))
+    return out
+
+
+GROUPS: Dict[str, Callable[[argparse.Namespace], List[Case]]] = {
+    "posted_age": cases_posted_age,
+    "scrape": cases_scrape,
+    "filter_classify": cases_filter_classify,
+    "dedupe": cases_dedupe,
+    "digest": cases_digest,
+}
+
+
+# ----- harness ------------------------------------------------------------
+
+
+def measure(fn: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    times = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+    return {"min_s": min(times), "median_s": statistics.median(times)}
+
+
+def _meta() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "host": socket.gethostname(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "html_backend": type(get_backend()).__name__,
+        "commit": commit,
+        "ts": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> int:
+    """
+    Print per-case change vs. `baseline`; return the number of regressions.
+    """
+    regressions = 0
+    print(f"\n{'case':<20} {'baseline (ms)':>14} {'now (ms)':>10} {'change':>8}")
+    for name, now in results.items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            print(f"{name:<20} {'—':>14} {now['min_s'] * 1000:>10.2f} {'new':>8}")
+            continue
+        ratio = now["min_s"] / base["min_s"] if base["min_s"] else 1.0
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        elif ratio < 1 - threshold:
+            flag = "  improved"
+        print(
+            f"{name:<20} {base['min_s'] * 1000:>14.2f} {now['min_s'] * 1000:>10.2f} "
+            f"{(ratio - 1) * 100:>+7.1f}%{flag}"
+        )
+    return regressions
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--only", nargs="+", choices=sorted(GROUPS), help="run only these groups")
+    ap.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--save", nargs="?", type=Path, const=BASELINES / f"{socket.gethostname()}.json",
+                    help="write results as a baseline (default benchmarks/baselines/<host>.json)")
+    ap.add_argument("--compare", type=Path, help="baseline JSON to compare against")
+    ap.add_argument("--threshold", type=float, default=0.2, help="slowdown fraction counted as a regression")
+    args = ap.parse_args(argv)
+
+    results: Dict[str, Any] = {}
+    print(f"{'case':<20} {'min (ms)':>10} {'median (ms)':>12} {'items':>8} {'µs/item':>9}")
+    for group in args.only or GROUPS:
+        for name, fn, items in GROUPS[group](args):
+            r = measure(fn, args.repeat)
+            r["items"] = items
+            results[name] = r
+            print(
+                f"{name:<20} {r['min_s'] * 1000:>10.2f} {r['median_s'] * 1000:>12.2f} "
+                f"{items:>8,} {r['min_s'] / items * 1e6:>9.2f}"
+            )
+
+    record = {"meta": _meta(), "repeat": args.repeat, "results": results}
+
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        args.save.write_text(json.dumps(record, indent=2), encoding="utf-8")
+        print(f"\nBaseline saved → {args.save}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{regressions} regression(s) beyond {args.threshold:.0%}")
+            return 1
+        print(f"\nNo regressions beyond {args.threshold:.0%}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
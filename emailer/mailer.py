@@ -1,66 +1,384 @@
 # emailer/mailer.py
 
+"""
+Digest email delivery: the one place the agent talks SMTP.
+
+  - SMTPPool keeps up to `pool_size` authenticated connections and hands
+    one out per message, so a batch pays for connect + STARTTLS + login
+    once per connection rather than once per message.
+  - Transient failures (4xx replies) are retried on the same connection
+    after an RSET, with exponential backoff. A dropped connection is
+    reopened on its own; the rest of the pool is left alone.
+  - A recipient may carry a profile (their own title/location keywords)
+    and is then sent a digest of only the jobs matching it. Digests are
+    rendered on their own thread while earlier messages are being sent.
+
+    "email_notifications": {
+        "enabled": true,
+        "sender": "you@example.com",
+        "recipients": [
+            "you@example.com",
+            {"address": "friend@example.com",
+             "keywords": ["Data Engineer"], "location_keywords": ["Remote"]}
+        ],
+        "smtp_host": "smtp.gmail.com",
+        "smtp_port": 587,
+        "use_tls": true,
+        "auth": true,                 # false for a local relay / test server
+        "pool_size": 2,
+        "max_retries": 3,
+        "retry_backoff_seconds": 2,
+        "timeout_seconds": 30
+    }
+
+The password is read from the EMAIL_PASSWORD environment variable.
+"""
+
 from __future__ import annotations
+import logging
+import os
+import queue
 import smtplib
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from email.message import EmailMessage
 from pathlib import Path
-import os
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from processor.tags import compile_matcher
+from utils import metrics
 
+logger = logging.getLogger("jobsearch_agent")
 
-def send_digest(digest_path: Path, config: dict):
+DEFAULT_SUBJECT = "JobSearch Digest — {{date}}"
+DEFAULT_POOL_SIZE = 2
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_RETRY_BACKOFF_SECONDS = 2.0
+DEFAULT_TIMEOUT_SECONDS = 30.0
+# A pooled connection idle for longer than this is checked with NOOP first
+NOOP_AFTER_SECONDS = 30.0
+
+
+class MailError(RuntimeError):
+    pass
+
+
+class Recipient:
     """
-    Sends the digest markdown file to the configured email recipients.
-    Uses Gmail SMTP with app-password authentication.
+    One address, optionally with a keyword profile of its own.
     """
 
-    email_cfg = config.get("email_notifications", {})
-    sender = email_cfg.get("sender")
-    recipients = email_cfg.get("recipients", [])
-    subject_template = email_cfg.get("subject_template", "JobSearch Digest — {{date}}")
+    def __init__(
+        self,
+        address: str,
+        keywords: Sequence[str] = (),
+        location_keywords: Sequence[str] = (),
+    ):
+        self.address = address
+        self.keywords = list(keywords)
+        self.location_keywords = list(location_keywords)
 
-    if not sender or not recipients:
-        raise RuntimeError(
-            "Missing sender or recipients in email_notifications config."
-        )
+    @property
+    def personalized(self) -> bool:
+        return bool(self.keywords or self.location_keywords)
+
+    def select(self, jobs: Sequence[Dict[str, Any]], word_boundaries: bool = False) -> List[Dict[str, Any]]:
+        """
+        The jobs matching this recipient's profile (title keywords and
+        location keywords, as in processor/filters.py).
+        """
+        title = compile_matcher(self.keywords, word_boundaries)
+        location = compile_matcher(self.location_keywords, word_boundaries)
+        return [
+            job
+            for job in jobs
+            if (not title or title.search(job.get("title") or ""))
+            and (not location or location.search(job.get("location") or ""))
+        ]
 
-    # Replace {{date}} in subject
-    from datetime import datetime
 
-    subject = subject_template.replace(
-        "{{date}}", datetime.now().strftime("%Y-%m-%d %H:%M")
-    )
+def parse_recipients(entries: Sequence[Any]) -> List[Recipient]:
+    recipients = []
+    for entry in entries:
+        if isinstance(entry, str):
+            recipients.append(Recipient(entry))
+        elif isinstance(entry, dict) and entry.get("address"):
+            recipients.append(
+                Recipient(entry["address"], entry.get("keywords", ()), entry.get("location_keywords", ()))
+            )
+        else:
+            raise MailError(f"Invalid recipient entry: {entry!r} (use an address or {{\"address\": ...}})")
+    return recipients
 
-    # Read the digest content
-    digest_content = digest_path.read_text()
 
-    # Email setup
-    msg = MIMEMultipart()
-    msg["From"] = sender
-    msg["To"] = ", ".join(recipients)
-    msg["Subject"] = subject
+class MailSettings:
+    """
+    A validated `email_notifications` config section.
+    """
 
-    msg.attach(MIMEText(digest_content, "plain"))
+    def __init__(self, email_cfg: Dict[str, Any], password: Optional[str] = None):
+        self.sender = email_cfg.get("sender")
+        self.recipients = parse_recipients(email_cfg.get("recipients", []))
+        if not self.sender or not self.recipients:
+            raise MailError("Missing sender or recipients in email_notifications config.")
 
-    # Environment variable for Gmail app password
-    password = os.environ.get("EMAIL_PASSWORD")
-    if not password:
-        raise RuntimeError(
-            "EMAIL_PASSWORD not set. Export it via: "
-            "export EMAIL_PASSWORD='your-16-char-app-password'"
-        )
+        self.subject_template = email_cfg.get("subject_template", DEFAULT_SUBJECT)
+        self.smtp_host = email_cfg.get("smtp_host", "smtp.gmail.com")
+        self.smtp_port = int(email_cfg.get("smtp_port", 587))
+        self.use_tls = email_cfg.get("use_tls", True)
+        self.auth = email_cfg.get("auth", True)
+        self.username = email_cfg.get("username", self.sender)
+        self.pool_size = max(1, int(email_cfg.get("pool_size", DEFAULT_POOL_SIZE)))
+        self.max_retries = max(0, int(email_cfg.get("max_retries", DEFAULT_MAX_RETRIES)))
+        self.retry_backoff = float(email_cfg.get("retry_backoff_seconds", DEFAULT_RETRY_BACKOFF_SECONDS))
+        self.timeout = float(email_cfg.get("timeout_seconds", DEFAULT_TIMEOUT_SECONDS))
+
+        self.password = password if password is not None else os.environ.get("EMAIL_PASSWORD")
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "MailSettings":
+        return cls(config.get("email_notifications", {}))
+
+    def subject(self) -> str:
+        return self.subject_template.replace("{{date}}", datetime.now().strftime("%Y-%m-%d %H:%M"))
+
+    def message(self, to: Sequence[str], body: str) -> EmailMessage:
+        msg = EmailMessage()
+        msg["From"] = self.sender
+        msg["To"] = ", ".join(to)
+        msg["Subject"] = self.subject()
+        msg.set_content(body)
+        return msg
 
-    smtp_host = email_cfg.get("smtp_host", "smtp.gmail.com")
-    smtp_port = email_cfg.get("smtp_port", 587)
-    use_tls = email_cfg.get("use_tls", True)
 
-    # Send email via Gmail SMTP
-    server = smtplib.SMTP(smtp_host, smtp_port)
-    if use_tls:
-        server.starttls()
+class _Slot:
+    def __init__(self) -> None:
+        self.conn: Optional[smtplib.SMTP] = None
+        self.last_used = 0.0
 
-    server.login(sender, password)
-    server.sendmail(sender, recipients, msg.as_string())
-    server.quit()
 
-    print("[Email] Digest sent successfully.")
+def _is_transient(exc: smtplib.SMTPException) -> bool:
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in exc.recipients.values())
+    return isinstance(exc, smtplib.SMTPResponseException) and 400 <= exc.smtp_code < 500
+
+
+class SMTPPool:
+    """
+    Up to `settings.pool_size` SMTP connections, opened on first use and
+    kept across messages. Thread-safe; close() when done.
+
+    `smtp_factory(host, port, timeout=...)` defaults to smtplib.SMTP and
+    can be swapped for a stand-in.
+    """
+
+    def __init__(self, settings: MailSettings, smtp_factory: Callable[..., smtplib.SMTP] = smtplib.SMTP):
+        if settings.auth and not settings.password:
+            raise MailError(
+                "EMAIL_PASSWORD not set. Export it via: "
+                "export EMAIL_PASSWORD='your-16-char-app-password'"
+            )
+        self.settings = settings
+        self.smtp_factory = smtp_factory
+        self._slots: "queue.Queue[_Slot]" = queue.Queue()
+        for _ in range(settings.pool_size):
+            self._slots.put(_Slot())
+
+    def __enter__(self) -> "SMTPPool":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def _connect(self) -> smtplib.SMTP:
+        s = self.settings
+        conn = self.smtp_factory(s.smtp_host, s.smtp_port, timeout=s.timeout)
+        try:
+            if s.use_tls:
+                conn.starttls()
+            if s.auth:
+                conn.login(s.username, s.password)
+        except BaseException:
+            conn.close()
+            raise
+        metrics.current().incr("smtp_connects")
+        return conn
+
+    @staticmethod
+    def _drop(slot: _Slot) -> None:
+        if slot.conn is not None:
+            try:
+                slot.conn.close()
+            except OSError:
+                pass
+        slot.conn = None
+
+    @contextmanager
+    def connection(self) -> Iterator[_Slot]:
+        """
+        Check out a slot whose connection is open (or None, to be opened).
+        A connection idle for a while is checked with NOOP and dropped if
+        the server has since closed it.
+        """
+        slot = self._slots.get()
+        try:
+            if slot.conn is not None and time.monotonic() - slot.last_used > NOOP_AFTER_SECONDS:
+                try:
+                    if slot.conn.noop()[0] != 250:
+                        self._drop(slot)
+                except (smtplib.SMTPException, OSError):
+                    self._drop(slot)
+            yield slot
+        finally:
+            slot.last_used = time.monotonic()
+            self._slots.put(slot)
+
+    def send(self, msg: EmailMessage) -> None:
+        """
+        Send one message. 4xx replies are retried on the same connection
+        (after RSET), or a new one if connecting or logging in failed; a
+        dropped connection is reopened. Up to max_retries
+        retries, with exponential backoff.
+        """
+        s = self.settings
+        run = metrics.current()
+        attempt = 0
+        with self.connection() as slot:
+            while True:
+                try:
+                    if slot.conn is None:
+                        slot.conn = self._connect()
+                    start = time.perf_counter()
+                    slot.conn.send_message(msg)
+                    run.observe("smtp_send_ms", (time.perf_counter() - start) * 1000)
+                    run.incr("emails_sent")
+                    return
+                except smtplib.SMTPServerDisconnected as e:
+                    error: Exception = e
+                    self._drop(slot)
+                except smtplib.SMTPException as e:
+                    if not _is_transient(e):
+                        raise
+                    error = e
+                    # A failed connect/login leaves no connection: the next
+                    # attempt opens a fresh one
+                    if slot.conn is not None:
+                        try:
+                            slot.conn.rset()
+                        except (smtplib.SMTPException, OSError):
+                            self._drop(slot)
+                except OSError as e:
+                    error = e
+                    self._drop(slot)
+
+                attempt += 1
+                if attempt > s.max_retries:
+                    raise MailError(f"Giving up on {msg['To']} after {attempt} attempts: {error}") from error
+                run.incr("smtp_retries")
+                delay = s.retry_backoff * 2 ** (attempt - 1)
+                logger.warning(f"[Email] Send to {msg['To']} failed ({error}); retry {attempt} in {delay:.0f}s")
+                time.sleep(delay)
+
+    def close(self) -> None:
+        for _ in range(self.settings.pool_size):
+            slot = self._slots.get()
+            if slot.conn is not None:
+                try:
+                    slot.conn.quit()
+                except (smtplib.SMTPException, OSError):
+                    pass
+                slot.conn = None
+            self._slots.put(slot)
+
+
+def deliver(
+    builders: Sequence[Callable[[], EmailMessage]],
+    settings: MailSettings,
+    pool: Optional[SMTPPool] = None,
+) -> int:
+    """
+    Build and send a batch of messages. Messages are built one after the
+    other on a render thread and sent over the pool as each is ready, so
+    rendering overlaps with sending. Every message is attempted; if any
+    failed, MailError is raised afterwards. Returns the number sent.
+    """
+    own_pool = pool is None
+    pool = pool or SMTPPool(settings)
+    errors: List[Exception] = []
+    try:
+        with ThreadPoolExecutor(1, thread_name_prefix="mail-render") as render, ThreadPoolExecutor(
+            settings.pool_size, thread_name_prefix="mail-send"
+        ) as send:
+            rendered = [render.submit(build) for build in builders]
+            sends = [send.submit(lambda f: pool.send(f.result()), f) for f in rendered]
+            for future in sends:
+                try:
+                    future.result()
+                except Exception as e:
+                    errors.append(e)
+    finally:
+        if own_pool:
+            pool.close()
+
+    if errors:
+        raise MailError(f"{len(errors)} of {len(builders)} messages failed; first error: {errors[0]}")
+    return len(builders)
+
+
+def digest_messages(
+    digest_path: Path,
+    config: Dict[str, Any],
+    new_jobs: Optional[Sequence[Dict[str, Any]]] = None,
+    all_jobs: Optional[Sequence[Dict[str, Any]]] = None,
+    total_in_history: int = 0,
+) -> Tuple[MailSettings, List[Callable[[], EmailMessage]]]:
+    """
+    The settings, and one message builder per digest email to send.
+
+    Recipients without a profile share one message: the digest file as
+    written. When the run's jobs are passed (`new_jobs`, `all_jobs`),
+    each recipient with a profile gets their own digest of just the jobs
+    matching it; otherwise they get the shared one too.
+    """
+    from output.digest_builder import render_markdown
+
+    settings = MailSettings.from_config(config)
+    word_boundaries = config.get("filters", {}).get("word_boundaries", False)
+    personal = [r for r in settings.recipients if r.personalized and new_jobs is not None]
+    shared = [r.address for r in settings.recipients if r not in personal]
+
+    builders: List[Callable[[], EmailMessage]] = []
+    if shared:
+        builders.append(lambda: settings.message(shared, Path(digest_path).read_text(encoding="utf-8")))
+    for r in personal:
+        builders.append(
+            lambda r=r: settings.message(
+                [r.address],
+                render_markdown(
+                    r.select(new_jobs, word_boundaries),
+                    r.select(all_jobs or [], word_boundaries),
+                    total_in_history,
+                ),
+            )
+        )
+    return settings, builders
+
+
+def send_digest(
+    digest_path: Path,
+    config: Dict[str, Any],
+    new_jobs: Optional[Sequence[Dict[str, Any]]] = None,
+    all_jobs: Optional[Sequence[Dict[str, Any]]] = None,
+    total_in_history: int = 0,
+    pool: Optional[SMTPPool] = None,
+) -> int:
+    """
+    Send the digest to the configured recipients now (see
+    digest_messages()); returns the number of messages sent.
+    """
+    settings, builders = digest_messages(digest_path, config, new_jobs, all_jobs, total_in_history)
+    sent = deliver(builders, settings, pool)
+    logger.info(f"[Email] Digest sent: {sent} message(s) to {len(settings.recipients)} recipient(s).")
+    return sent
@@ -0,0 +1,298 @@
+# emailer/outbox.py
+
+"""
+Durable email outbox: digests are queued on disk and delivered in the
+background, so a slow or unreachable mail server never holds up a run.
+
+Each queued message is one JSON file in the outbox directory (the full
+RFC 822 message plus its delivery state), written atomically. An
+OutboxWorker thread drains it over a pooled SMTP connection
+(emailer/mailer.py). A message that fails is kept and retried with
+exponential backoff (retry_base_seconds, doubling up to
+retry_max_seconds); messages still queued when the process exits are
+picked up by the next run. A message is only deleted once the server
+has accepted it.
+
+    "email_notifications": {
+        ...,
+        "outbox": {
+            "enabled": true,
+            "path": "outbox",
+            "retry_base_seconds": 60,
+            "retry_max_seconds": 3600,
+            "flush_seconds": 15      # how long a run waits on exit for delivery
+        }
+    }
+
+Metrics (current run): outbox_depth, outbox_enqueued, emails_sent,
+outbox_failures, and the email_delivery_ms histogram (queued → accepted).
+"""
+
+from __future__ import annotations
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+from email import message_from_string, policy
+from email.message import EmailMessage
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from utils import metrics
+from .mailer import MailSettings, SMTPPool
+
+logger = logging.getLogger("jobsearch_agent")
+
+DEFAULT_OUTBOX_DIR = Path("outbox")
+DEFAULT_RETRY_BASE_SECONDS = 60.0
+DEFAULT_RETRY_MAX_SECONDS = 3600.0
+DEFAULT_FLUSH_SECONDS = 15.0
+DEFAULT_POLL_SECONDS = 30.0
+# A claimed message older than this belongs to a process that died mid-send
+STALE_CLAIM_SECONDS = 600.0
+
+_CLAIM_SUFFIX = ".sending"
+
+
+class Outbox:
+    """
+    The on-disk queue. Safe to share between processes: a message is
+    claimed (renamed) before it is sent, so two workers never send the
+    same one.
+    """
+
+    def __init__(
+        self,
+        directory: Path = DEFAULT_OUTBOX_DIR,
+        retry_base: float = DEFAULT_RETRY_BASE_SECONDS,
+        retry_max: float = DEFAULT_RETRY_MAX_SECONDS,
+    ):
+        self.directory = Path(directory)
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._release_stale_claims()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "Outbox":
+        cfg = config.get("email_notifications", {}).get("outbox", {})
+        return cls(
+            Path(cfg.get("path", DEFAULT_OUTBOX_DIR)),
+            float(cfg.get("retry_base_seconds", DEFAULT_RETRY_BASE_SECONDS)),
+            float(cfg.get("retry_max_seconds", DEFAULT_RETRY_MAX_SECONDS)),
+        )
+
+    # ----- storage --------------------------------------------------------
+
+    def _write(self, path: Path, item: Dict[str, Any]) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(item, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+    def _release_stale_claims(self) -> None:
+        now = time.time()
+        for claimed in self.directory.glob(f"*.json{_CLAIM_SUFFIX}"):
+            try:
+                if now - claimed.stat().st_mtime > STALE_CLAIM_SECONDS:
+                    os.replace(claimed, claimed.with_suffix(""))
+            except OSError:
+                pass
+
+    def _claim(self, path: Path) -> Optional[Path]:
+        claimed = path.with_name(path.name + _CLAIM_SUFFIX)
+        try:
+            os.rename(path, claimed)
+        except FileNotFoundError:
+            return None
+        # Mark the claim's age (see _release_stale_claims)
+        os.utime(claimed)
+        return claimed
+
+    def paths(self) -> List[Path]:
+        return sorted(self.directory.glob("*.json"))
+
+    def depth(self) -> int:
+        return len(self.paths()) + len(list(self.directory.glob(f"*.json{_CLAIM_SUFFIX}")))
+
+    # ----- queue ----------------------------------------------------------
+
+    def enqueue(self, msg: EmailMessage) -> Path:
+        now = time.time()
+        path = self.directory / f"{time.time_ns()}_{uuid.uuid4().hex[:8]}.json"
+        self._write(
+            path,
+            {
+                "queued_at": now,
+                "attempts": 0,
+                "next_attempt": now,
+                "last_error": None,
+                "message": msg.as_string(),
+            },
+        )
+        metrics.current().incr("outbox_enqueued")
+        return path
+
+    def due(self, now: Optional[float] = None) -> List[Path]:
+        now = time.time() if now is None else now
+        out = []
+        for path in self.paths():
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    if json.load(f)["next_attempt"] <= now:
+                        out.append(path)
+            except FileNotFoundError:
+                continue
+            except (OSError, ValueError, KeyError) as e:
+                logger.error(f"[Outbox] Unreadable message {path.name} left in place: {e}")
+        return out
+
+    def drain(self, config: Dict[str, Any], stop: Optional[threading.Event] = None) -> int:
+        """
+        Send every message that is due; returns the number delivered.
+        Failures are rescheduled, never dropped.
+        """
+        due = self.due()
+        if not due:
+            return 0
+
+        sent = 0
+        try:
+            pool = SMTPPool(MailSettings.from_config(config))
+        except Exception as e:
+            logger.error(f"[Outbox] Cannot deliver {len(due)} queued message(s): {e}")
+            for path in due:
+                claimed = self._claim(path)
+                if claimed is not None:
+                    self._reschedule(path, claimed, e)
+            return 0
+
+        with pool:
+            for path in due:
+                if stop is not None and stop.is_set():
+                    break
+                claimed = self._claim(path)
+                if claimed is None:
+                    continue
+                with open(claimed, "r", encoding="utf-8") as f:
+                    item = json.load(f)
+                try:
+                    pool.send(message_from_string(item["message"], policy=policy.default))
+                except Exception as e:
+                    self._reschedule(path, claimed, e, item)
+                    continue
+                os.unlink(claimed)
+                sent += 1
+                # Looked up per message: a long drain can outlive the run
+                metrics.current().observe("email_delivery_ms", (time.time() - item["queued_at"]) * 1000)
+
+        if sent:
+            logger.info(f"[Outbox] Delivered {sent} message(s); {self.depth()} still queued.")
+        return sent
+
+    def _reschedule(
+        self, path: Path, claimed: Path, error: Exception, item: Optional[Dict[str, Any]] = None
+    ) -> None:
+        if item is None:
+            with open(claimed, "r", encoding="utf-8") as f:
+                item = json.load(f)
+        item["attempts"] += 1
+        delay = min(self.retry_base * 2 ** (item["attempts"] - 1), self.retry_max)
+        item["next_attempt"] = time.time() + delay
+        item["last_error"] = str(error)
+        self._write(path, item)
+        os.unlink(claimed)
+        metrics.current().incr("outbox_failures")
+        logger.warning(
+            f"[Outbox] {path.name} failed (attempt {item['attempts']}): {error}; next try in {delay:.0f}s"
+        )
+
+
+class OutboxWorker:
+    """
+    Background thread draining an Outbox: whenever woken (a digest was
+    queued) and every `poll_seconds` (backoff timers expiring).
+    """
+
+    def __init__(self, outbox: Outbox, config: Dict[str, Any], poll_seconds: float = DEFAULT_POLL_SECONDS):
+        self.outbox = outbox
+        self.config = config
+        self.poll_seconds = poll_seconds
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="outbox", daemon=True)
+
+    def start(self) -> "OutboxWorker":
+        self._thread.start()
+        return self
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            self._wake.clear()
+            try:
+                self.outbox.drain(self.config, self._stop)
+            except Exception:
+                logger.exception("[Outbox] Drain failed")
+            self._wake.wait(self.poll_seconds)
+
+    def stop(self, flush_seconds: float = DEFAULT_FLUSH_SECONDS) -> None:
+        """
+        Give queued messages up to `flush_seconds` to go out, then stop.
+        Whatever is left stays queued for the next run.
+        """
+        deadline = time.monotonic() + flush_seconds
+        while self._thread.is_alive() and time.monotonic() < deadline and self.outbox.due():
+            self.wake()
+            time.sleep(0.05)
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(max(0.0, deadline - time.monotonic()))
+        depth = self.outbox.depth()
+        if depth:
+            logger.info(f"[Outbox] {depth} message(s) left queued for the next run.")
+
+
+def start_worker(config: Dict[str, Any]) -> Optional[OutboxWorker]:
+    """
+    An OutboxWorker for the configured outbox, already started (it first
+    delivers anything left by earlier runs), or None when email or the
+    outbox is disabled.
+    """
+    email_cfg = config.get("email_notifications", {})
+    if not email_cfg.get("enabled", False) or not email_cfg.get("outbox", {}).get("enabled", True):
+        return None
+    return OutboxWorker(Outbox.from_config(config), config).start()
+
+
+def flush_seconds(config: Dict[str, Any]) -> float:
+    cfg = config.get("email_notifications", {}).get("outbox", {})
+    return float(cfg.get("flush_seconds", DEFAULT_FLUSH_SECONDS))
+
+
+def queue_digest(worker: OutboxWorker, digest_path: Path, config: Dict[str, Any], **jobs: Any) -> int:
+    """
+    Render the digest emails (see mailer.digest_messages()) into the
+    outbox and wake the worker; returns the number queued.
+    """
+    from .mailer import digest_messages
+
+    _, builders = digest_messages(digest_path, config, **jobs)
+    for build in builders:
+        worker.outbox.enqueue(build())
+    worker.wake()
+    return len(builders)
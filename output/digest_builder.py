@@ -1,9 +1,224 @@
 # output/digest_builder.py
 
 from __future__ import annotations
+import logging
+import os
+import tempfile
+from itertools import repeat
 from pathlib import Path
-from typing import List, Dict, Any
-from .formatter import format_job_line
+from typing import Any, Callable, Dict, IO, List, Mapping, Optional, Tuple
+from .formatter import format_job_feed_item, format_job_html, format_job_line
+from processor.job import Job
+from processor.scoring import rank_jobs
+
+logger = logging.getLogger("jobsearch_agent")
+
+# Job fields any formatter reads; a change to one of them re-renders the job
+RENDER_FIELDS = (
+    "title",
+    "company",
+    "location",
+    "url",
+    "job_id",
+    "days_since_posted",
+    "posted_age_raw",
+    "tags",
+    "relevance",
+    "role_type",
+)
+
+_N_FIELDS = len(RENDER_FIELDS)
+_JOB_ID = RENDER_FIELDS.index("job_id")
+_URL = RENDER_FIELDS.index("url")
+
+FORMATTERS: Dict[str, Callable[[Dict[str, Any]], str]] = {
+    "md": format_job_line,
+    "html": format_job_html,
+    "json": format_job_feed_item,
+}
+
+# Formats whose lines are worth caching. A markdown line is one f-string:
+# rendering it again costs less than checking a cached copy is still valid.
+CACHED_FORMATS = frozenset({"html", "json"})
+
+
+class LineCache:
+    """
+    Rendered job lines, keyed by job id (or URL) and validated by the
+    values of RENDER_FIELDS, so a job is only re-rendered when something
+    it shows has changed. Only CACHED_FORMATS go through the cache.
+
+    The cache lives in memory, so only a long-running process gains from
+    it: the daemon (agent_daemon.py) keeps one across cycles, while a
+    one-shot run renders every line once and builds without a cache.
+    Entries not used for `max_idle` builds are dropped, and all of them
+    when a build starts under a different config version.
+    """
+
+    def __init__(self, max_idle: int = 10):
+        self.max_idle = max_idle
+        # key -> [fields, {format: text}, last build used]
+        self._entries: Dict[str, list] = {}
+        self._build = 0
+        self._version: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def begin(self, version: Optional[str] = None) -> None:
+        if version != self._version:
+            self._entries.clear()
+            self._version = version
+        self._build += 1
+        self.hits = self.misses = 0
+
+    def render(self, job: Mapping[str, Any], formats: List[str]) -> List[str]:
+        """
+        `job` rendered in each of `formats`, from the cache where still valid.
+        """
+        if CACHED_FORMATS.isdisjoint(formats):
+            return [FORMATTERS[fmt](job) for fmt in formats]
+        if isinstance(job, Job):
+            # All RENDER_FIELDS are Job slots: read them without per-field calls
+            fields = tuple(map(getattr, repeat(job, _N_FIELDS), RENDER_FIELDS, repeat(None, _N_FIELDS)))
+        else:
+            fields = tuple(map(job.get, RENDER_FIELDS))
+        key = fields[_JOB_ID] or fields[_URL]
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != fields:
+            entry = self._entries[key] = [fields, {}, self._build]
+        else:
+            entry[2] = self._build
+        texts = entry[1]
+        out = []
+        for fmt in formats:
+            if fmt not in CACHED_FORMATS:
+                out.append(FORMATTERS[fmt](job))
+                continue
+            text = texts.get(fmt)
+            if text is None:
+                text = texts[fmt] = FORMATTERS[fmt](job)
+                self.misses += 1
+            else:
+                self.hits += 1
+            out.append(text)
+        return out
+
+    def prune(self) -> None:
+        oldest = self._build - self.max_idle
+        self._entries = {k: v for k, v in self._entries.items() if v[2] > oldest}
+
+
+def _render(job: Mapping[str, Any], formats: List[str]) -> List[str]:
+    return [FORMATTERS[fmt](job) for fmt in formats]
+
+
+# ----- output writers -----------------------------------------------------
+
+
+class _Markdown:
+    def __init__(self, f: IO[str], header: List[str], title: str):
+        f.write("\n".join(header))
+
+    def items(self, f: IO[str], texts: List[str]) -> None:
+        if texts:
+            f.write("\n" + "\n".join(texts))
+
+    def close(self, f: IO[str]) -> None:
+        pass
+
+
+class _Html:
+    def __init__(self, f: IO[str], header: List[str], title: str):
+        from html import escape
+
+        f.write(f'<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>{escape(title)}</title></head><body>\n')
+        for line in header:
+            line = line.strip()
+            if line.startswith("# "):
+                f.write(f"<h1>{escape(line[2:])}</h1>\n")
+            elif line.startswith("### "):
+                f.write(f"<h3>{escape(line[4:])}</h3>\n")
+            elif line == "---":
+                f.write("<hr>\n")
+            elif line.startswith("**"):
+                label, _, value = line.strip("*").partition(":**")
+                f.write(f"<p><strong>{escape(label)}:</strong>{escape(value)}</p>\n")
+        f.write("<ul>")
+
+    def items(self, f: IO[str], texts: List[str]) -> None:
+        if texts:
+            f.write("\n" + "\n".join(texts))
+
+    def close(self, f: IO[str]) -> None:
+        f.write("\n</ul>\n</body></html>\n")
+
+
+class _JsonFeed:
+    def __init__(self, f: IO[str], header: List[str], title: str):
+        import json
+
+        f.write(
+            '{"version": "https://jsonfeed.org/version/1.1", '
+            f'"title": {json.dumps(title, ensure_ascii=False)}, "items": ['
+        )
+
+    def items(self, f: IO[str], texts: List[str]) -> None:
+        if texts:
+            f.write("\n" + ",\n".join(texts))
+
+    def close(self, f: IO[str]) -> None:
+        f.write("\n]}\n")
+
+
+WRITERS = {"md": _Markdown, "html": _Html, "json": _JsonFeed}
+
+
+def _format_of(path: Path) -> str:
+    suffix = path.suffix.lower().lstrip(".")
+    return {"markdown": "md", "htm": "html"}.get(suffix, suffix)
+
+
+DIGEST_TITLE = "JobSearch AI Agent 2.0 — Digest"
+
+
+def _digest_header(
+    new_jobs: List[Dict[str, Any]],
+    all_filtered_jobs: List[Dict[str, Any]],
+    total_in_history: int,
+) -> Tuple[List[str], List[Dict[str, Any]]]:
+    """
+    The digest's header lines, and the jobs it lists.
+    """
+    header = [
+        f"# {DIGEST_TITLE}\n",
+        f"**New relevant jobs this run:** {len(new_jobs)}",
+        f"**Total tracked jobs:** {total_in_history}\n",
+        "---\n",
+    ]
+
+    # If nothing is new, we show the full list instead of an empty digest
+    if len(new_jobs) == 0:
+        header.append("### No new jobs this run.\n")
+        header.append("### Here's the full list of currently relevant jobs:\n")
+        return header, all_filtered_jobs
+    header.append("### New relevant jobs discovered:\n")
+    return header, new_jobs
+
+
+def render_markdown(
+    new_jobs: List[Dict[str, Any]],
+    all_filtered_jobs: List[Dict[str, Any]],
+    total_in_history: int,
+) -> str:
+    """
+    The markdown digest as a string, exactly as build_digest() writes it
+    (used for per-recipient email digests, see emailer/mailer.py).
+    """
+    header, jobs = _digest_header(new_jobs, all_filtered_jobs, total_in_history)
+    return "\n".join(header + [format_job_line(job) for job in rank_jobs(jobs)])
 
 
 def build_digest(
@@ -11,34 +226,76 @@ def build_digest(
     all_filtered_jobs: List[Dict[str, Any]],
     total_in_history: int,
     output_path: Path,
+    extra_outputs: Optional[List[Path]] = None,
+    cache: Optional[LineCache] = None,
+    config_version: Optional[str] = None,
 ) -> None:
     """
     Build the digest markdown file.
     If no new jobs this run:
        → Show the full filtered job list so the digest is still useful.
+    Jobs are listed by relevance score, highest first.
+
+    `extra_outputs` are further files written from the same pass, in the
+    format their suffix names: .md, .html or .json (a JSON Feed). Every
+    file is written to a temp file and renamed into place, so readers
+    never see a partial digest. With a `cache` (a LineCache kept across
+    builds), job lines are only re-rendered when the job changed or
+    `config_version` (the hash of the sections rendering depends on)
+    differs from the previous build's.
     """
+    paths = [Path(output_path)] + [Path(p) for p in extra_outputs or []]
+    formats = [_format_of(p) for p in paths]
+    for path, fmt in zip(paths, formats):
+        if fmt not in WRITERS:
+            raise ValueError(f"Unsupported digest format for {path} (use .md, .html or .json)")
 
-    lines = []
+    header, jobs = _digest_header(new_jobs, all_filtered_jobs, total_in_history)
+    files: List[Tuple[Path, str, IO[str]]] = []
+    try:
+        for path in paths:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+            os.chmod(tmp, 0o644)
+            files.append((path, tmp, os.fdopen(fd, "w", encoding="utf-8")))
+        writers = [WRITERS[fmt](f, header, DIGEST_TITLE) for fmt, (_, _, f) in zip(formats, files)]
 
-    # Header
-    lines.append("# JobSearch AI Agent 2.0 — Digest\n")
-    lines.append(f"**New relevant jobs this run:** {len(new_jobs)}")
-    lines.append(f"**Total tracked jobs:** {total_in_history}\n")
-    lines.append("---\n")
+        # One pass over the ranked jobs feeds every output
+        if cache is not None:
+            cache.begin(config_version)
+            render = cache.render
+        else:
+            render = _render
+        if len(formats) == 1:
+            columns = [[render(job, formats)[0] for job in rank_jobs(jobs)]]
+        else:
+            columns = [list(col) for col in zip(*(render(job, formats) for job in rank_jobs(jobs)))] or [
+                [] for _ in formats
+            ]
 
-    # If nothing is new, we show the full list instead of an empty digest
-    if len(new_jobs) == 0:
-        lines.append("### No new jobs this run.\n")
-        lines.append("### Here's the full list of currently relevant jobs:\n")
-
-        for job in all_filtered_jobs:
-            lines.append(format_job_line(job))
+        for writer, (_, _, f), texts in zip(writers, files, columns):
+            writer.items(f, texts)
+            writer.close(f)
+            f.close()
+        for path, tmp, _ in files:
+            os.replace(tmp, path)
+    except BaseException:
+        for _, tmp, f in files:
+            f.close()
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+        raise
 
+    if cache is not None:
+        cache.prune()
+        rendered, reused = cache.misses, cache.hits
     else:
-        lines.append("### New relevant jobs discovered:\n")
-        for job in new_jobs:
-            lines.append(format_job_line(job))
-
-    # Write out the digest
-    output_path.write_text("\n".join(lines), encoding="utf-8")
-    print(f"[Digest] Built → {output_path}")
+        # Counted like LineCache.misses: lines of the cacheable formats
+        rendered, reused = len(jobs) * len(CACHED_FORMATS.intersection(formats)), 0
+    logger.info(
+        f"[Digest] Built → {', '.join(str(p) for p in paths)} "
+        f"({rendered} lines rendered, {reused} reused)",
+        extra={"stage": "digest", "jobs": len(jobs), "rendered": rendered, "reused": reused},
+    )
@@ -1,6 +1,8 @@
 # output/formatter.py
 
 from __future__ import annotations
+import json
+from html import escape
 from typing import Dict, Any
 
 
@@ -43,3 +45,39 @@ def format_job_line(job: Dict[str, Any]) -> str:
     posted = _format_posted_suffix(job)
 
     return f"- [{title}]({url}) — {company} — {location}{posted}"
+
+
+def format_job_html(job: Dict[str, Any]) -> str:
+    """
+    The format_job_line() content as an HTML list item.
+    """
+    title = escape(job.get("title", "").strip())
+    company = escape(job.get("company", "").strip())
+    location = escape(job.get("location", "").strip())
+    url = escape(job.get("url", "").strip(), quote=True)
+
+    posted = escape(_format_posted_suffix(job))
+
+    return f'<li><a href="{url}">{title}</a> — {company} — {location}{posted}</li>'
+
+
+def format_job_feed_item(job: Dict[str, Any]) -> str:
+    """
+    One JSON Feed (https://jsonfeed.org/version/1.1) item, serialized.
+    """
+    url = job.get("url", "").strip()
+    item = {
+        "id": str(job.get("job_id") or url),
+        "url": url,
+        "title": job.get("title", "").strip(),
+        "content_text": format_job_line(job)[2:],
+        "tags": list(job.get("tags") or []),
+        "_job": {
+            "company": job.get("company", "").strip(),
+            "location": job.get("location", "").strip(),
+            "days_since_posted": job.get("days_since_posted"),
+            "relevance": job.get("relevance"),
+            "role_type": job.get("role_type"),
+        },
+    }
+    return json.dumps(item, ensure_ascii=False)
@@ -1,7 +1,58 @@
 # processor/deduper.py
 
 from __future__ import annotations
-from typing import List, Dict, Any, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from .job import DedupeKey, Job
+
+
+def dedupe_key(job: Dict[str, Any]) -> DedupeKey:
+    """
+    Jobs are the same posting when (title, company, location) match,
+    ignoring case and surrounding whitespace. Job records carry the key
+    precomputed.
+    """
+    if isinstance(job, Job):
+        return job.key
+    return (
+        job.get("title", "").strip().lower(),
+        job.get("company", "").strip().lower(),
+        job.get("location", "").strip().lower(),
+    )
+
+
+def index_history(history: Iterable[Dict[str, Any]]) -> Dict[DedupeKey, Dict[str, Any]]:
+    """
+    Convert history to dict for fast lookup.
+    """
+    return {dedupe_key(j): j for j in history}
+
+
+def iter_dedupe_jobs(
+    new_jobs: Iterable[Dict[str, Any]], history_index: Dict[DedupeKey, Dict[str, Any]]
+) -> Iterator[Dict[str, Any]]:
+    """
+    Streaming dedupe stage: yields jobs that are new or updated relative to
+    `history_index` (see index_history), updating the index as it goes.
+    A job is "new or updated" if it doesn't exactly match existing history.
+    New keys flagged near_duplicate are recorded but not yielded.
+    """
+    for job in new_jobs:
+        k = dedupe_key(job)
+
+        old = history_index.get(k)
+        if old is None:
+            # Completely new job — unless it's a repost of a tracked one
+            # (tagged by processor.near_dupes.iter_tag_clusters)
+            history_index[k] = job
+            if not job.get("near_duplicate"):
+                yield job
+        elif job.get("url") != old.get("url") or job.get(
+            "days_since_posted"
+        ) != old.get("days_since_posted"):
+            # Existing job — significant fields changed
+            history_index[k] = job
+            yield job
 
 
 def dedupe_jobs(
@@ -10,34 +61,11 @@ def dedupe_jobs(
     """
     Deduplicate jobs based on (title, company, location).
     A job is "new or updated" if it doesn't exactly match existing history.
+    List-returning wrapper around iter_dedupe_jobs().
     """
+    history_dict = index_history(history)
 
-    key = lambda j: (
-        j.get("title", "").strip().lower(),
-        j.get("company", "").strip().lower(),
-        j.get("location", "").strip().lower(),
-    )
-
-    # Convert history to dict for fast lookup
-    history_dict = {key(j): j for j in history}
-
-    new_or_updated = []
-
-    for job in new_jobs:
-        k = key(job)
-
-        if k not in history_dict:
-            # Completely new job
-            new_or_updated.append(job)
-            history_dict[k] = job
-        else:
-            # Existing job — check if significant fields changed
-            old = history_dict[k]
-            if job.get("url") != old.get("url") or job.get(
-                "days_since_posted"
-            ) != old.get("days_since_posted"):
-                new_or_updated.append(job)
-                history_dict[k] = job
+    new_or_updated = list(iter_dedupe_jobs(new_jobs, history_dict))
 
     # Rebuild history as a list
     updated_history = list(history_dict.values())
@@ -1,48 +1,58 @@
 # processor/filters.py
 
 from __future__ import annotations
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, Iterator, List
 
+from utils.config_loader import RuntimeConfig
 
-def filter_jobs(
-    jobs: List[Dict[str, Any]], config: Dict[str, Any]
-) -> List[Dict[str, Any]]:
+
+def iter_filter_jobs(
+    jobs: Iterable[Dict[str, Any]], config: Dict[str, Any]
+) -> Iterator[Dict[str, Any]]:
     """
-    Public-safe generic filtering logic.
+    Public-safe generic filtering logic, as a streaming stage.
 
     The filtering rules are:
     - Title contains ANY keyword from config (case-insensitive)
     - Location contains ANY location keyword from config (case-insensitive)
     - Posting age <= filters.max_post_age_days
-    """
 
-    # Pull config fields
-    title_keywords = [kw.lower() for kw in config["scrapers"]["linkedin"]["keywords"]]
-    location_keywords = [
-        kw.lower() for kw in config["scrapers"]["linkedin"]["location_keywords"]
-    ]
-    max_age = config["filters"]["max_post_age_days"]
+    Set filters.word_boundaries to true to require whole-word keyword
+    matches ("Intern" then no longer matches "Internal").
+
+    The keywords come from scrapers.linkedin; an empty list (or a missing
+    max_post_age_days) disables that rule.
+    """
 
-    filtered = []
+    # Matchers and limits are precompiled on the RuntimeConfig
+    rc = RuntimeConfig.of(config)
+    title_matcher = rc.title_matcher
+    location_matcher = rc.location_matcher
+    max_age = rc.max_post_age_days
 
     for job in jobs:
-        title = job.get("title", "").lower()
-        location = job.get("location", "").lower()
         age = job.get("days_since_posted")
 
         # Title keyword filter
-        if title_keywords and not any(kw in title for kw in title_keywords):
+        if title_matcher and not title_matcher.search(job.get("title", "")):
             continue
 
         # Location keyword filter (optional)
-        if location_keywords:
-            if not any(loc_kw in location for loc_kw in location_keywords):
+        if location_matcher:
+            if not location_matcher.search(job.get("location", "")):
                 continue
 
         # Age filter
-        if age is not None and age > max_age:
+        if age is not None and max_age is not None and age > max_age:
             continue
 
-        filtered.append(job)
+        yield job
 
-    return filtered
+
+def filter_jobs(
+    jobs: List[Dict[str, Any]], config: Dict[str, Any]
+) -> List[Dict[str, Any]]:
+    """
+    List-returning wrapper around iter_filter_jobs().
+    """
+    return list(iter_filter_jobs(jobs, config))
@@ -0,0 +1,170 @@
+# processor/job.py
+
+"""
+Compact job record shared by every stage.
+
+Job keeps the known fields in __slots__ (no per-object dict), interns the
+strings that repeat across postings (source, company, location), and
+computes the normalized dedupe key once when it is built instead of on
+every comparison. The canonical URL is derived on first use and cached.
+
+It also answers the dict calls the stages and templates already use:
+job.get("title"), job["scores"] = ..., "days_since_posted" in job. So
+scrapers may keep yielding plain dicts, and as_job()/as_dict() convert
+at the edges (JSON history, the journal, SQLite rows). Keys outside the
+known fields go into job.extra.
+
+title, company and location are fixed once the job is built. Change them
+through job[...] = ... (never plain attribute assignment) so the key
+follows.
+"""
+
+from __future__ import annotations
+import sys
+from typing import Any, Dict, Iterator, Mapping, Optional, Tuple, Union
+
+DedupeKey = Tuple[str, str, str]
+
+FIELDS = (
+    "source",
+    "job_id",
+    "title",
+    "company",
+    "location",
+    "url",
+    "posted_age_raw",
+    "days_since_posted",
+    "description",
+    "scores",
+    "ranking",
+    "relevance",
+    "role_type",
+    "tags",
+    "cluster_id",
+    "near_duplicate",
+)
+_FIELD_SET = frozenset(FIELDS)
+_KEY_FIELDS = frozenset(("title", "company", "location"))
+_INTERNED = frozenset(("source", "company", "location", "role_type"))
+_MISSING = object()
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if type(value) is str else value
+
+
+def canonical_url(url: str) -> str:
+    """
+    URL without query/fragment or trailing slash, lowercased.
+    """
+    return (url or "").split("#")[0].split("?")[0].rstrip("/").lower()
+
+
+class Job:
+    __slots__ = FIELDS + ("extra", "key", "_canonical_url")
+
+    def __init__(self, title: str = "", company: str = "", location: str = "", url: str = "", **fields: Any):
+        self.title = title
+        self.company = _intern(company)
+        self.location = _intern(location)
+        self.url = url
+        self.extra: Optional[Dict[str, Any]] = None
+        self._canonical_url: Optional[str] = None
+        for name, value in fields.items():
+            if name not in _FIELD_SET:
+                self[name] = value
+            elif name in _INTERNED and type(value) is str:
+                setattr(self, name, sys.intern(value))
+            else:
+                setattr(self, name, value)
+        self._rekey()
+
+    def _rekey(self) -> None:
+        self.key: DedupeKey = (
+            self.title.strip().lower(),
+            sys.intern(self.company.strip().lower()),
+            sys.intern(self.location.strip().lower()),
+        )
+
+    @property
+    def canonical_url(self) -> str:
+        if self._canonical_url is None:
+            self._canonical_url = canonical_url(self.url)
+        return self._canonical_url
+
+    # ----- dict compatibility ---------------------------------------------
+
+    def get(self, name: str, default: Any = None) -> Any:
+        if name in _FIELD_SET:
+            return getattr(self, name, default)
+        if self.extra is None:
+            return default
+        return self.extra.get(name, default)
+
+    def __getitem__(self, name: str) -> Any:
+        value = self.get(name, _MISSING)
+        if value is _MISSING:
+            raise KeyError(name)
+        return value
+
+    def __setitem__(self, name: str, value: Any) -> None:
+        if name in _FIELD_SET:
+            setattr(self, name, _intern(value) if name in _INTERNED else value)
+            if name in _KEY_FIELDS and hasattr(self, "key"):
+                self._rekey()
+            elif name == "url":
+                self._canonical_url = None
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[name] = value
+
+    def __contains__(self, name: object) -> bool:
+        return self.get(name, _MISSING) is not _MISSING  # type: ignore[arg-type]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.to_dict())
+
+    def keys(self):
+        return self.to_dict().keys()
+
+    def items(self):
+        return self.to_dict().items()
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Job):
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, Mapping):
+            return self.to_dict() == dict(other)
+        return NotImplemented
+
+    __hash__ = None  # mutable, like the dicts it replaces
+
+    def __repr__(self) -> str:
+        return f"Job({self.title!r}, {self.company!r}, {self.location!r})"
+
+    # ----- conversion -----------------------------------------------------
+
+    def to_dict(self) -> Dict[str, Any]:
+        out = {}
+        for name in FIELDS:
+            value = getattr(self, name, _MISSING)
+            if value is not _MISSING:
+                out[name] = value
+        if self.extra:
+            out.update(self.extra)
+        return out
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "Job":
+        return cls(**data)
+
+
+def as_job(job: Union[Job, Mapping[str, Any]]) -> Job:
+    return job if isinstance(job, Job) else Job.from_dict(job)
+
+
+def as_dict(job: Union[Job, Mapping[str, Any]]) -> Dict[str, Any]:
+    if isinstance(job, Job):
+        return job.to_dict()
+    return job if isinstance(job, dict) else dict(job)
@@ -0,0 +1,340 @@
+# processor/near_dupes.py
+
+"""
+Near-duplicate (repost) detection with MinHash + LSH.
+
+Exact dedupe (processor/dedupe.py) misses reposts such as
+"Sr. Software Engineer II" vs "Senior Software Engineer 2". Here titles
+and company names are normalized first, then each job's title tokens are
+reduced to a small MinHash signature. Signatures are bucketed by LSH
+bands, so finding candidates is a handful of dict lookups however large
+history grows. Candidates are confirmed by estimated Jaccard similarity.
+
+Buckets are scoped to the job's company, its seniority/level tokens
+(senior, staff, intern, 2, ...) and its normalized location. Those must
+match exactly: "Senior Software Engineer" is a different posting from
+"Software Engineer" at the same office, however similar the titles are,
+and a shared location can't make two different titles look alike.
+
+Every job is tagged with job["cluster_id"]. Jobs that land in an existing
+cluster also get job["near_duplicate"] = True, which dedupe treats as
+"already tracked".
+
+The index is persisted next to history (history/near_dupes.jsonl): a
+header line, then one line per cluster. save() only appends the clusters
+added since the last save (or discard()), so a run's write cost doesn't
+grow with history.
+"""
+
+from __future__ import annotations
+import base64
+import hashlib
+import json
+import os
+import random
+import re
+import tempfile
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+_MERSENNE = (1 << 61) - 1
+_MASK32 = 0xFFFFFFFF
+
+_TITLE_ALIASES = {
+    "sr": "senior",
+    "snr": "senior",
+    "jr": "junior",
+    "jnr": "junior",
+    "mgr": "manager",
+    "eng": "engineer",
+    "engr": "engineer",
+    "dev": "developer",
+    "swe": "software engineer",
+    "ml": "machine learning",
+    "i": "1",
+    "ii": "2",
+    "iii": "3",
+    "iv": "4",
+    "v": "5",
+}
+_COMPANY_SUFFIXES = {
+    "inc", "incorporated", "llc", "ltd", "limited", "corp", "corporation",
+    "co", "company", "plc", "gmbh", "ag", "sa", "bv", "pty", "lp", "llp",
+}
+_STOPWORDS = {"the", "a", "an", "and", "of", "for", "to", "at", "in"}
+_TOKEN_RE = re.compile(r"[a-z0-9+#]+")
+
+# Normalized title tokens that make a posting a different job, not a repost
+LEVEL_TOKENS = {
+    "senior", "junior", "staff", "principal", "lead", "intern", "internship",
+    "associate", "entry", "graduate", "manager", "director", "head", "vp",
+    "chief", "1", "2", "3", "4", "5",
+}
+
+# Saved-index format; an index in another format is rebuilt from history
+_FORMAT = 2
+
+
+def normalize_title(title: str) -> str:
+    """
+    'Sr. Software Engineer II' -> 'senior software engineer 2'
+    """
+    words = []
+    for tok in _TOKEN_RE.findall((title or "").lower()):
+        tok = _TITLE_ALIASES.get(tok, tok)
+        if tok not in _STOPWORDS:
+            words.append(tok)
+    return " ".join(words)
+
+
+def normalize_company(company: str) -> str:
+    """
+    'Acme, Inc.' -> 'acme'
+    """
+    words = _TOKEN_RE.findall((company or "").lower())
+    return " ".join(t for t in words if t not in _COMPANY_SUFFIXES)
+
+
+def _title_parts(job: Dict[str, Any]) -> Tuple[List[str], str]:
+    """
+    (role tokens, sorted level tokens joined) of the normalized title.
+    """
+    role, levels = [], set()
+    for tok in normalize_title(job.get("title", "")).split():
+        if tok in LEVEL_TOKENS:
+            levels.add("intern" if tok == "internship" else tok)
+        else:
+            role.append(tok)
+    return role, " ".join(sorted(levels))
+
+
+def _scope(job: Dict[str, Any], levels: str) -> str:
+    """
+    Bucket scope: company, level tokens and location must all match.
+    """
+    loc = " ".join(sorted(set(_TOKEN_RE.findall((job.get("location") or "").lower()))))
+    return f"{normalize_company(job.get('company', ''))}|{levels}|{loc}"
+
+
+def _shingles(role: List[str]) -> List[str]:
+    # Word unigrams + bigrams of the title keep word order somewhat relevant
+    out = set(role)
+    out.update(f"{a}_{b}" for a, b in zip(role, role[1:]))
+    return sorted(out)
+
+
+def _token_hash(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class NearDupIndex:
+    """
+    LSH index of MinHash signatures, one per cluster of near-identical jobs.
+
+    num_perm must equal bands × rows; threshold is the estimated Jaccard
+    similarity above which a candidate counts as the same posting.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, threshold: float = 0.75):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+
+        rng = random.Random(0x5EED)
+        self._perms = [
+            (rng.randrange(1, _MERSENNE), rng.randrange(0, _MERSENNE)) for _ in range(num_perm)
+        ]
+
+        # cluster_id -> (scope, signature)
+        self.clusters: Dict[str, Tuple[str, array]] = {}
+        # band key -> cluster ids
+        self._buckets: Dict[Tuple[str, int, bytes], List[str]] = {}
+        # clusters added since the last save, and whether the file on disk
+        # must be rewritten (built from history rather than loaded)
+        self._pending: List[str] = []
+        self._rewrite = True
+
+    def __len__(self) -> int:
+        return len(self.clusters)
+
+    # ----- signatures -----------------------------------------------------
+
+    def signature(self, job: Dict[str, Any]) -> array:
+        hashes = [_token_hash(t) for t in _shingles(_title_parts(job)[0])] or [0]
+        sig = array("I")
+        for a, b in self._perms:
+            sig.append(min(((a * h + b) % _MERSENNE) & _MASK32 for h in hashes))
+        return sig
+
+    def _band_keys(self, scope: str, sig: array) -> Iterator[Tuple[str, int, bytes]]:
+        r = self.rows
+        for band in range(self.bands):
+            yield scope, band, sig[band * r : (band + 1) * r].tobytes()
+
+    @staticmethod
+    def _similarity(a: array, b: array) -> float:
+        return sum(1 for x, y in zip(a, b) if x == y) / len(a)
+
+    # ----- lookup / insert ------------------------------------------------
+
+    def query(self, job: Dict[str, Any], sig: Optional[array] = None) -> Optional[str]:
+        """
+        Cluster id of the most similar tracked posting, or None.
+        """
+        scope = _scope(job, _title_parts(job)[1])
+        sig = sig if sig is not None else self.signature(job)
+
+        seen = set()
+        best, best_sim = None, self.threshold
+        for key in self._band_keys(scope, sig):
+            for cid in self._buckets.get(key, ()):
+                if cid in seen:
+                    continue
+                seen.add(cid)
+                sim = self._similarity(sig, self.clusters[cid][1])
+                if sim >= best_sim:
+                    best, best_sim = cid, sim
+        return best
+
+    def add(self, cluster_id: str, scope: str, sig: array) -> None:
+        self.clusters[cluster_id] = (scope, sig)
+        for key in self._band_keys(scope, sig):
+            self._buckets.setdefault(key, []).append(cluster_id)
+
+    def assign(self, job: Dict[str, Any]) -> Tuple[str, bool]:
+        """
+        Tag `job` with its cluster. Returns (cluster_id, matched_existing).
+        """
+        sig = self.signature(job)
+        cid = self.query(job, sig)
+        if cid is not None:
+            return cid, True
+
+        company = normalize_company(job.get("company", ""))
+        key = f"{company}|{normalize_title(job.get('title', ''))}|{job.get('location', '')}"
+        cid = "c" + hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+        self.add(cid, _scope(job, _title_parts(job)[1]), sig)
+        self._pending.append(cid)
+        return cid, False
+
+    def discard(self) -> None:
+        """
+        Forget the clusters added since the last save (or load), e.g. after
+        a failed cycle whose jobs were never committed to history.
+        """
+        for cid in self._pending:
+            scope, sig = self.clusters.pop(cid)
+            for key in self._band_keys(scope, sig):
+                bucket = self._buckets[key]
+                bucket.remove(cid)
+                if not bucket:
+                    del self._buckets[key]
+        self._pending.clear()
+
+    # ----- persistence ----------------------------------------------------
+
+    @staticmethod
+    def _line(cid: str, scope: str, sig: array) -> str:
+        return json.dumps([cid, scope, base64.b64encode(sig.tobytes()).decode("ascii")]) + "\n"
+
+    def save(self, path: Path) -> None:
+        """
+        Append the clusters added since the last save. The whole file is
+        (atomically) rewritten only when the index was built from history.
+        """
+        if not self._rewrite and path.exists():
+            if self._pending:
+                lines = "".join(self._line(cid, *self.clusters[cid]) for cid in self._pending)
+                with path.open("ab+") as f:
+                    # Start on a fresh line after a torn (interrupted) last line
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        lines = "\n" + lines
+                    f.write(lines.encode("utf-8"))
+            self._pending.clear()
+            return
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        header = {"format": _FORMAT, "num_perm": self.num_perm, "bands": self.bands}
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(json.dumps(header) + "\n")
+            for cid, (scope, sig) in self.clusters.items():
+                f.write(self._line(cid, scope, sig))
+        os.replace(tmp, path)
+        self._pending.clear()
+        self._rewrite = False
+
+    @classmethod
+    def load(
+        cls,
+        path: Path,
+        history: Iterable[Dict[str, Any]] = (),
+        num_perm: int = 64,
+        bands: int = 16,
+        threshold: float = 0.75,
+    ) -> "NearDupIndex":
+        """
+        Load a saved index. If there is none (or its format or parameters
+        changed), build one from `history` instead.
+        """
+        index = cls(num_perm, bands, threshold)
+        try:
+            with path.open("r", encoding="utf-8") as f:
+                header = json.loads(f.readline())
+                if (header.get("format"), header.get("num_perm"), header.get("bands")) == (_FORMAT, num_perm, bands):
+                    for line in f:
+                        try:
+                            cid, scope, packed = json.loads(line)
+                        except ValueError:  # a torn last line from an interrupted append
+                            continue
+                        sig = array("I")
+                        sig.frombytes(base64.b64decode(packed))
+                        index.add(cid, scope, sig)
+                    index._rewrite = False
+                    return index
+        except (OSError, ValueError, AttributeError):
+            pass
+
+        for job in history:
+            index.assign(job)
+        return index
+
+
+def index_from_config(
+    config: Dict[str, Any], path: Path, history: Iterable[Dict[str, Any]]
+) -> Optional[NearDupIndex]:
+    """
+    Load the near-duplicate index per config["dedupe"]["near_duplicates"]
+    (enabled by default), or None when disabled.
+    """
+    cfg = config.get("dedupe", {}).get("near_duplicates", {})
+    if not cfg.get("enabled", True):
+        return None
+    return NearDupIndex.load(
+        path,
+        history,
+        num_perm=int(cfg.get("num_perm", 64)),
+        bands=int(cfg.get("bands", 16)),
+        threshold=float(cfg.get("threshold", 0.75)),
+    )
+
+
+def iter_tag_clusters(
+    jobs: Iterable[Dict[str, Any]], index: Optional[NearDupIndex]
+) -> Iterator[Dict[str, Any]]:
+    """
+    Streaming stage: set job["cluster_id"], and job["near_duplicate"] when
+    the job falls into a cluster that was already tracked.
+    """
+    for job in jobs:
+        if index is not None:
+            cid, existing = index.assign(job)
+            job["cluster_id"] = cid
+            if existing:
+                job["near_duplicate"] = True
+        yield job
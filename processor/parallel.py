@@ -0,0 +1,192 @@
+# processor/parallel.py
+
+"""
+Batch mode: run the CPU-bound stages over large job lists on several cores.
+
+BatchProcessor shards a job list into chunks and runs filtering and
+classification in a ProcessPoolExecutor. The config is sent to each
+worker once, by the pool initializer, which also compiles it there
+(keyword matchers, the relevance scorer). Jobs stay in the parent: a chunk carries only the fields its
+stage reads, and only indices (filter) or classification fields
+(classify) come back, merged in the original order.
+
+Batches smaller than `min_jobs` (or with workers=1) run in-process, where
+the result is identical and there is no pickling or process start-up to
+pay for.
+
+    with BatchProcessor(config) as batch:
+        relevant = batch.classify(batch.filter(jobs))
+
+Settings come from config["batch"]:
+
+    "batch": {
+        "enabled": false,      # run_agent uses batch mode when true
+        "workers": 0,          # 0 = one per CPU
+        "chunk_size": 2000,    # jobs per task
+        "min_jobs": 5000       # smaller batches run in-process
+    }
+"""
+
+from __future__ import annotations
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, TypeVar
+
+from utils.config_loader import RuntimeConfig
+
+from .filters import filter_jobs
+from .job import Job, as_job
+from .scoring import scorer_for
+
+T = TypeVar("T")
+
+DEFAULT_CHUNK_SIZE = 2000
+DEFAULT_MIN_JOBS = 5000
+
+
+# Fields each stage reads; only these are sent to worker processes
+FILTER_FIELDS = ("title", "location", "days_since_posted")
+# Fields classification writes; only these come back
+CLASSIFY_OUTPUT = ("scores", "ranking", "relevance", "role_type", "tags")
+
+
+class _Compiled:
+    """
+    Per-process compiled form of a config: what each chunk task needs.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        # A RuntimeConfig arrives as its raw dict and is rebuilt (matchers
+        # compiled) here, once per worker
+        self.config = RuntimeConfig.of(config)
+        self.scorer = scorer_for(self.config)
+        self.classify_fields = tuple(f for f, w in self.scorer.field_weights.items() if w)
+
+    def keep(self, rows: List[Dict[str, Any]]) -> List[int]:
+        """
+        Indices of the rows that pass filter_jobs().
+        """
+        kept = {id(r) for r in filter_jobs(rows, self.config)}
+        return [i for i, r in enumerate(rows) if id(r) in kept]
+
+    def scores(self, rows: List[Dict[str, Any]]) -> List[tuple]:
+        """
+        CLASSIFY_OUTPUT values for each row.
+        """
+        return [tuple(job[f] for f in CLASSIFY_OUTPUT) for job in self.scorer.score_jobs(rows)]
+
+
+_worker: Optional[_Compiled] = None
+
+
+def _init_worker(config: Dict[str, Any]) -> None:
+    global _worker
+    _worker = _Compiled(config)
+
+
+def _keep_chunk(rows: List[Dict[str, Any]]) -> List[int]:
+    return _worker.keep(rows)
+
+
+def _scores_chunk(rows: List[Dict[str, Any]]) -> List[tuple]:
+    return _worker.scores(rows)
+
+
+def _chunks(items: Sequence[T], size: int) -> List[List[T]]:
+    return [list(items[i:i + size]) for i in range(0, len(items), size)]
+
+
+def _project(jobs: Sequence[Job], fields: Sequence[str]) -> List[Dict[str, Any]]:
+    return [{f: job.get(f) for f in fields} for job in jobs]
+
+
+class BatchProcessor:
+    """
+    Process pool (started on first use) plus the in-process fallback.
+    Use as a context manager, or call close().
+    """
+
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        workers: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+        min_jobs: Optional[int] = None,
+    ):
+        cfg = config.get("batch", {})
+        self.config = config
+        self.workers = workers or int(cfg.get("workers", 0)) or os.cpu_count() or 1
+        self.chunk_size = max(1, chunk_size or int(cfg.get("chunk_size", DEFAULT_CHUNK_SIZE)))
+        self.min_jobs = min_jobs if min_jobs is not None else int(cfg.get("min_jobs", DEFAULT_MIN_JOBS))
+        self._local: Optional[_Compiled] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self) -> "BatchProcessor":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _compiled(self) -> _Compiled:
+        if self._local is None:
+            self._local = _Compiled(self.config)
+        return self._local
+
+    def _parallel(self, n: int, min_items: int) -> bool:
+        return self.workers > 1 and n >= min_items
+
+    def _map(self, task: Callable[[List[Any]], List[Any]], items: Sequence[Any], chunk_size: int) -> List[List[Any]]:
+        """
+        task() over chunks of `items` in the pool, results in chunk order.
+        """
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_worker, initargs=(self.config,)
+            )
+        return list(self._pool.map(task, _chunks(items, chunk_size)))
+
+    def filter(self, jobs: Sequence[Any]) -> List[Job]:
+        """
+        filter_jobs(), in original order. Workers only see the filtered
+        fields and send back the indices that pass.
+        """
+        jobs = [as_job(j) for j in jobs]
+        if not self._parallel(len(jobs), self.min_jobs):
+            return filter_jobs(jobs, self.config)
+        out: List[Job] = []
+        kept_by_chunk = self._map(_keep_chunk, _project(jobs, FILTER_FIELDS), self.chunk_size)
+        for chunk, kept in zip(_chunks(jobs, self.chunk_size), kept_by_chunk):
+            out.extend(chunk[i] for i in kept)
+        return out
+
+    def classify(self, jobs: Sequence[Any]) -> List[Job]:
+        """
+        Score jobs in place (see processor/relevance_classifier.py) and
+        return them. Workers only see the scored fields and send back the
+        classification fields.
+        """
+        jobs = [as_job(j) for j in jobs]
+        compiled = self._compiled()
+        if not self._parallel(len(jobs), self.min_jobs):
+            return compiled.scorer.score_jobs(jobs)
+        results = self._map(_scores_chunk, _project(jobs, compiled.classify_fields), self.chunk_size)
+        for job, values in zip(jobs, (v for part in results for v in part)):
+            for field, value in zip(CLASSIFY_OUTPUT, values):
+                job[field] = value
+        return jobs
+
+    def filter_classify(self, jobs: Sequence[Any]) -> List[Job]:
+        return self.classify(self.filter(jobs))
+
+
+def process_batch(jobs: Sequence[Any], config: Dict[str, Any], **kwargs: Any) -> List[Job]:
+    """
+    One-shot filter + classify of `jobs` (see BatchProcessor).
+    """
+    with BatchProcessor(config, **kwargs) as batch:
+        return batch.filter_classify(jobs)
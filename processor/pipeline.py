@@ -0,0 +1,47 @@
+# processor/pipeline.py
+
+"""
+Small helpers for wiring the streaming stages (iter_filter_jobs,
+iter_classify_jobs, iter_dedupe_jobs) together without materializing
+intermediate lists.
+"""
+
+from __future__ import annotations
+from typing import Any, Dict, Iterable, Iterator, List, MutableMapping, Tuple
+
+from .job import Job, as_job
+
+
+def flatten_batches(
+    batches: Iterable[Tuple[str, List[Dict[str, Any]]]]
+) -> Iterator[Job]:
+    """
+    Turn run_scrapers()'s (source, batch) stream into a stream of Job
+    records (scrapers may return plain dicts).
+    """
+    for _, batch in batches:
+        for job in batch:
+            yield as_job(job)
+
+
+def tally(
+    jobs: Iterable[Dict[str, Any]], counts: MutableMapping[str, int], key: str
+) -> Iterator[Dict[str, Any]]:
+    """
+    Pass jobs through unchanged, counting them under counts[key].
+    """
+    counts.setdefault(key, 0)
+    for job in jobs:
+        counts[key] += 1
+        yield job
+
+
+def collect(
+    jobs: Iterable[Dict[str, Any]], into: List[Dict[str, Any]]
+) -> Iterator[Dict[str, Any]]:
+    """
+    Pass jobs through unchanged, also appending each one to `into`.
+    """
+    for job in jobs:
+        into.append(job)
+        yield job
@@ -1,43 +1,39 @@
 # processor/relevance_classifier.py
 
 from __future__ import annotations
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, Iterator, List
 
+from .scoring import scorer_for
 
-def classify_jobs(
-    jobs: List[Dict[str, Any]], config: Dict[str, Any]
-) -> List[Dict[str, Any]]:
+
+def iter_classify_jobs(
+    jobs: Iterable[Dict[str, Any]], config: Dict[str, Any]
+) -> Iterator[Dict[str, Any]]:
     """
-    Rule-based classification into:
-    - manufacturing
-    - ai_research
-    - other
+    Weighted multi-label classification over the categories in
+    config["search_filters"] (see processor/scoring.py), as a streaming stage.
+
+    Sets, in place:
+    - scores      {category name: weighted keyword score}
+    - ranking     labels of the top-N categories by score
+    - relevance   the top score (used to sort the digest)
+    - role_type   the top category, e.g. manufacturing / ai_research / other
+    - tags        the sorted keywords that matched
+
+    The compiled scorer is shared by every call with the same scoring
+    sections (see scoring.scorer_for).
     """
-    filters = config.get("search_filters", {})
-
-    mf_cfg = filters.get("manufacturing_engineering", {})
-    ai_cfg = filters.get("ai_research", {})
-
-    mf_keywords = [k.lower() for k in mf_cfg.get("keywords", [])]
-    ai_keywords = [k.lower() for k in ai_cfg.get("keywords", [])]
-
-    classified = []
+    scorer = scorer_for(config)
 
     for job in jobs:
-        title = job.get("title", "").lower()
-        desc = job.get("description", "").lower()
-
-        role_type = "other"
+        yield scorer.score_job(job)
 
-        # Manufacturing logic
-        if any(k in title for k in mf_keywords) or any(k in desc for k in mf_keywords):
-            role_type = "manufacturing"
 
-        # AI research logic
-        if any(k in title for k in ai_keywords) or any(k in desc for k in ai_keywords):
-            role_type = "ai_research"
-
-        job["role_type"] = role_type
-        classified.append(job)
-
-    return classified
+def classify_jobs(
+    jobs: List[Dict[str, Any]], config: Dict[str, Any]
+) -> List[Dict[str, Any]]:
+    """
+    Batch version of iter_classify_jobs(): scores the whole list in one
+    vectorized pass.
+    """
+    return scorer_for(config).score_jobs(jobs)
@@ -0,0 +1,247 @@
+# processor/scoring.py
+
+"""
+Weighted, multi-label relevance scoring.
+
+Every category under config["search_filters"] gets a score per job:
+
+    score(job, category) = Σ  field_weight[field] × keyword_weight[category][kw]
+                         over every keyword kw matched in title / description / company
+
+Config:
+
+    "search_filters": {
+        "ai_research": {
+            "keywords": ["machine learning", "research"],   # weight 1.0 each
+            "weight": 1.5                                   # optional category multiplier
+        },
+        "manufacturing_engineering": {
+            "keywords": {"manufacturing": 2.0, "test": 0.5} # per-keyword weights
+        }
+    },
+    "ranking": {
+        "field_weights": {"title": 3.0, "company": 2.0, "description": 1.0},
+        "top_n": 3
+    }
+
+Matches are held as a sparse job×keyword matrix (COO triplets). Scores
+are that matrix times a keyword×category weight matrix, computed with
+NumPy when it is installed and in pure Python otherwise, so re-ranking a
+large history with new weights doesn't re-scan any text.
+"""
+
+from __future__ import annotations
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from utils.config_loader import RuntimeConfig
+
+from .tags import compile_matcher
+
+_np: Any = False  # numpy module once looked up (None when not installed)
+
+
+def _numpy() -> Any:
+    """
+    numpy, imported on first use so that importing this module (e.g. for
+    rank_jobs in the digest command) stays cheap.
+    """
+    global _np
+    if _np is False:
+        try:
+            import numpy
+        except ImportError:  # optional: pure-Python scoring is used instead
+            numpy = None
+        _np = numpy
+    return _np
+
+DEFAULT_FIELD_WEIGHTS = {"title": 3.0, "company": 2.0, "description": 1.0}
+
+# Config sections a scorer is compiled from (plus filters.word_boundaries)
+SCORING_SECTIONS = ("search_filters", "ranking")
+
+# Category names whose role_type label predates the scoring engine
+_ROLE_LABELS = {"manufacturing_engineering": "manufacturing"}
+
+
+class MatchMatrix:
+    """
+    Sparse job×keyword match matrix in COO form: entry i says job rows[i]
+    matched keyword cols[i] in a field weighted vals[i].
+    """
+
+    def __init__(self, n_jobs: int, rows: List[int], cols: List[int], vals: List[float]):
+        self.n_jobs = n_jobs
+        self.rows = rows
+        self.cols = cols
+        self.vals = vals
+
+    def __len__(self) -> int:
+        return self.n_jobs
+
+
+class RelevanceScorer:
+    """
+    Compiled scoring model for one search_filters/ranking configuration.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        rc = RuntimeConfig.of(config)
+
+        self.field_weights = dict(DEFAULT_FIELD_WEIGHTS)
+        self.field_weights.update(rc.get("ranking", {}).get("field_weights", {}))
+        self.top_n = rc.top_n
+
+        self.categories: List[str] = []
+        self.labels: List[str] = []
+        weights: Dict[Tuple[str, int], float] = {}
+        vocab: Dict[str, int] = {}
+
+        # Keywords arrive normalized and weighted (RuntimeConfig.categories)
+        for cat, category in enumerate(rc.categories):
+            self.categories.append(category.name)
+            label = category.label
+            self.labels.append(label if label is not None else _ROLE_LABELS.get(category.name, category.name))
+            for kw, w in category.weights:
+                vocab.setdefault(kw, len(vocab))
+                weights[(kw, cat)] = w
+
+        self.vocab = vocab
+        self.matcher = compile_matcher(vocab, rc.word_boundaries)
+
+        # Dense keyword×category weights (tiny: vocab × a handful of categories)
+        self.weights: List[List[float]] = [[0.0] * len(self.categories) for _ in vocab]
+        for (kw, cat), w in weights.items():
+            self.weights[vocab[kw]][cat] = w
+        self._np_weights = None
+        np = _numpy()
+        if np is not None:
+            self._np_weights = np.array(self.weights, dtype=float).reshape(
+                len(vocab), len(self.categories)
+            )
+        self._keywords = list(vocab)
+
+    # ----- matching -------------------------------------------------------
+
+    def _job_matches(self, job: Dict[str, Any]) -> List[Tuple[int, float]]:
+        out = []
+        for field, fw in self.field_weights.items():
+            if not fw:
+                continue
+            for kw in self.matcher.find_all(job.get(field) or ""):
+                out.append((self.vocab[kw], fw))
+        return out
+
+    def match_matrix(self, jobs: Sequence[Dict[str, Any]]) -> MatchMatrix:
+        rows: List[int] = []
+        cols: List[int] = []
+        vals: List[float] = []
+        for i, job in enumerate(jobs):
+            for col, fw in self._job_matches(job):
+                rows.append(i)
+                cols.append(col)
+                vals.append(fw)
+        return MatchMatrix(len(jobs), rows, cols, vals)
+
+    # ----- scoring --------------------------------------------------------
+
+    def score_matrix(self, mm: MatchMatrix) -> List[List[float]]:
+        """
+        n_jobs × n_categories scores (matches @ weights), vectorized with
+        NumPy when available.
+        """
+        if self._np_weights is not None and mm.rows:
+            return self._score_numpy(mm)
+        return self._score_python(mm)
+
+    def _score_numpy(self, mm: MatchMatrix) -> List[List[float]]:
+        np = _numpy()
+        rows = np.asarray(mm.rows, dtype=np.int64)
+        cols = np.asarray(mm.cols, dtype=np.int64)
+        contrib = np.asarray(mm.vals, dtype=float)[:, None] * self._np_weights[cols]
+        out = np.empty((mm.n_jobs, len(self.categories)))
+        for c in range(len(self.categories)):
+            out[:, c] = np.bincount(rows, weights=contrib[:, c], minlength=mm.n_jobs)
+        return out.round(4).tolist()
+
+    def _score_python(self, mm: MatchMatrix) -> List[List[float]]:
+        scores = [[0.0] * len(self.categories) for _ in range(mm.n_jobs)]
+        for r, c, v in zip(mm.rows, mm.cols, mm.vals):
+            row = scores[r]
+            for cat, w in enumerate(self.weights[c]):
+                if w:
+                    row[cat] += v * w
+        return [[round(s, 4) for s in row] for row in scores]
+
+    def _attach(
+        self, job: Dict[str, Any], row: Sequence[float], cols: Iterable[int]
+    ) -> Dict[str, Any]:
+        """
+        Write scores (by category name), top-N ranking, relevance (top
+        score), role_type (top category, or "other") and tags (matched
+        keywords) onto the job. Only ranking and role_type use the display
+        labels, which several categories may share.
+        """
+        scores = {name: s for name, s in zip(self.categories, row)}
+        ranked = sorted(
+            (i for i, s in enumerate(row) if s > 0),
+            key=lambda i: -row[i],
+        )
+        job["scores"] = scores
+        # dict.fromkeys: a label shared by two categories is listed once
+        job["ranking"] = list(dict.fromkeys(self.labels[i] for i in ranked))[: self.top_n]
+        job["relevance"] = row[ranked[0]] if ranked else 0.0
+        job["role_type"] = job["ranking"][0] if ranked else "other"
+        job["tags"] = sorted({self._keywords[c] for c in cols})
+        return job
+
+    def score_job(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Score a single job in place (streaming path; too small to vectorize).
+        """
+        mm = self.match_matrix([job])
+        return self._attach(job, self._score_python(mm)[0], mm.cols)
+
+    def score_jobs(
+        self, jobs: Sequence[Dict[str, Any]], mm: Optional[MatchMatrix] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Score a batch in place (vectorized path). Pass a previously built
+        match_matrix(jobs) to re-rank without re-scanning text.
+        """
+        if mm is None:
+            mm = self.match_matrix(jobs)
+
+        cols_by_job: List[List[int]] = [[] for _ in range(mm.n_jobs)]
+        for r, c in zip(mm.rows, mm.cols):
+            cols_by_job[r].append(c)
+
+        return [
+            self._attach(job, row, cols)
+            for job, row, cols in zip(jobs, self.score_matrix(mm), cols_by_job)
+        ]
+
+
+_scorers: Dict[Tuple[str, bool], RelevanceScorer] = {}
+
+
+def scorer_for(config: Dict[str, Any]) -> RelevanceScorer:
+    """
+    The RelevanceScorer for `config`, compiled once per version of its
+    SCORING_SECTIONS: a config reload that leaves them alone keeps the
+    compiled scorer.
+    """
+    rc = RuntimeConfig.of(config)
+    key = (rc.section_hash(*SCORING_SECTIONS), rc.word_boundaries)
+    scorer = _scorers.get(key)
+    if scorer is None:
+        if len(_scorers) >= 8:
+            _scorers.clear()
+        scorer = _scorers[key] = RelevanceScorer(rc)
+    return scorer
+
+
+def rank_jobs(jobs: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Jobs sorted by relevance, highest first (stable for ties and unscored jobs).
+    """
+    return sorted(jobs, key=lambda j: -(j.get("relevance") or 0.0))
@@ -0,0 +1,172 @@
+# processor/tags.py
+
+"""
+Compiled multi-keyword matching shared by the filters and the classifier.
+
+All keywords of a set are packed into ONE regex built from a trie of the
+keywords (e.g. "data", "data analyst", "data scientist" becomes
+data(?: (?:analyst|scientist))?), so a single left-to-right scan of a
+field finds every keyword it contains, instead of one `kw in text` per
+keyword.
+
+Matching is case-insensitive. With word_boundaries=True a keyword only
+matches as a whole word/phrase ("intern" no longer matches "internal").
+"""
+
+from __future__ import annotations
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+
+def normalize_keywords(keywords: Iterable[str]) -> Tuple[str, ...]:
+    """
+    Lowercase, strip, drop empties and duplicates (keeping first-seen order).
+    """
+    seen = {}
+    for kw in keywords or ():
+        kw = (kw or "").strip().lower()
+        if kw:
+            seen.setdefault(kw, None)
+    return tuple(seen)
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """
+    Regex source matching any of `words`, built from their trie so the
+    regex engine never re-tries a shared prefix. Alternatives are greedy,
+    so the longest keyword at a position is tried first.
+    """
+    trie: Dict[str, Any] = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node: Dict[str, Any]) -> str:
+        is_end = "" in node
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if is_end:
+            return f"(?:{body})?" if len(branches) > 1 or len(body) > 1 else f"{body}?"
+        return body
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """
+    A set of keywords compiled into one scanning regex.
+
+        m = KeywordMatcher(["Software Engineer", "Engineer", "Intern"])
+        m.search("Senior Software Engineer")   -> True
+        m.find_all("Senior Software Engineer") -> {"software engineer", "engineer"}
+
+    Overlapping and nested matches are all reported.
+    """
+
+    def __init__(self, keywords: Iterable[str], word_boundaries: bool = False):
+        self.keywords = normalize_keywords(keywords)
+        self.word_boundaries = word_boundaries
+        self._scan: Optional[re.Pattern] = None
+
+        if self.keywords:
+            body = _trie_pattern(self.keywords)
+            if word_boundaries:
+                pattern = rf"(?<!\w)(?=({body})(?!\w))"
+            else:
+                pattern = rf"(?=({body}))"
+            self._scan = re.compile(pattern)
+
+        # The scan reports only the longest keyword starting at each
+        # position. Shorter keywords that are prefixes of it (and would
+        # also satisfy the boundary rule there) are matched implicitly.
+        self._implied: Dict[str, Tuple[str, ...]] = {}
+        kwset = set(self.keywords)
+        for kw in self.keywords:
+            implied = [kw]
+            for i in range(1, len(kw)):
+                prefix = kw[:i]
+                if prefix in kwset and (not word_boundaries or not _is_word_char(kw[i])):
+                    implied.append(prefix)
+            self._implied[kw] = tuple(implied)
+
+    def __bool__(self) -> bool:
+        return self._scan is not None
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    def search(self, text: str) -> bool:
+        """
+        True if `text` contains ANY keyword.
+        """
+        if self._scan is None or not text:
+            return False
+        return self._scan.search(text.lower()) is not None
+
+    def find_all(self, text: str) -> Set[str]:
+        """
+        Every (normalized) keyword contained in `text`.
+        """
+        found: Set[str] = set()
+        if self._scan is None or not text:
+            return found
+        implied = self._implied
+        for longest in set(self._scan.findall(text.lower())):
+            found.update(implied[longest])
+        return found
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+@lru_cache(maxsize=64)
+def _cached_matcher(keywords: Tuple[str, ...], word_boundaries: bool) -> KeywordMatcher:
+    return KeywordMatcher(keywords, word_boundaries)
+
+
+def compile_matcher(keywords: Iterable[str], word_boundaries: bool = False) -> KeywordMatcher:
+    """
+    Cached KeywordMatcher: the same keyword list (after normalization) is
+    only compiled once per process, however many times a stage is called.
+    """
+    return _cached_matcher(normalize_keywords(keywords), bool(word_boundaries))
+
+
+class TagMatcher:
+    """
+    Several named keyword sets (tags/categories) scanned together.
+
+        tm = TagMatcher({"ai_research": ["machine learning"], "manufacturing": ["test"]})
+        tm.match("ML Test Engineer", "...machine learning...")
+        -> {"ai_research": {"machine learning"}, "manufacturing": {"test"}}
+
+    Each text is scanned once regardless of how many tags there are.
+    """
+
+    def __init__(self, tags: Dict[str, Iterable[str]], word_boundaries: bool = False):
+        self._by_keyword: Dict[str, List[str]] = {}
+        for tag, keywords in tags.items():
+            for kw in normalize_keywords(keywords):
+                self._by_keyword.setdefault(kw, []).append(tag)
+        self.matcher = compile_matcher(self._by_keyword, word_boundaries)
+
+    def match(self, *texts: str) -> Dict[str, Set[str]]:
+        """
+        {tag: matched keywords} for every tag with at least one match.
+        """
+        keywords: Set[str] = set()
+        for text in texts:
+            keywords |= self.matcher.find_all(text)
+
+        hits: Dict[str, Set[str]] = {}
+        for kw in keywords:
+            for tag in self._by_keyword[kw]:
+                hits.setdefault(tag, set()).add(kw)
+        return hits
+
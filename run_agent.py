@@ -1,102 +1,575 @@
 # run_agent.py
 
+"""
+JobSearch AI Agent command line.
+
+    python run_agent.py                  full run: scrape → process → digest → send
+    python run_agent.py --daemon         keep running (see agent_daemon.py)
+    python run_agent.py scrape           scrape only → outputs/scraped.jsonl
+    python run_agent.py process          filter/classify/dedupe it → outputs/processed.json
+    python run_agent.py digest           build the digest from outputs/processed.json
+    python run_agent.py send             email the current digest
+    python run_agent.py history stats    history backend, size and job count
+    python run_agent.py history compact  reclaim history space
+
+Heavy modules (HTTP, parsing, the processors, SMTP) are imported by the
+commands that use them, so light commands start quickly
+(python -m benchmarks.bench_startup).
+"""
+
 from __future__ import annotations
+import argparse
 import json
+import logging
 from pathlib import Path
-from datetime import datetime
 
-from scrapers.linkedin_scraper import scrape_linkedin
-from processor.filters import filter_jobs
-from processor.relevance_classifier import classify_jobs
-from processor.dedupe import dedupe_jobs
-from output.digest_builder import build_digest
+from utils.config_loader import CONFIG_PATH, ConfigError, RuntimeConfig, load_config
 from utils.logger import init_logger
 
 
-def load_config():
-    try:
-        with open("config/config.json", "r") as f:
-            return json.load(f)
-    except json.JSONDecodeError as e:
-        raise RuntimeError(f"Invalid JSON in config/config.json: {e}")
-    except FileNotFoundError:
-        raise RuntimeError("Missing config/config.json")
+NEAR_DUPES_PATH = Path("history/near_dupes.jsonl")
+DIGEST_PATH = Path("outputs/latest_digest.md")
+SCRAPED_PATH = Path("outputs/scraped.jsonl")
+PROCESSED_PATH = Path("outputs/processed.json")
+
+# Sections rendered digest lines depend on (the category labels and
+# keyword tags come from the scoring sections)
+DIGEST_SECTIONS = ("digest", "search_filters", "ranking")
+
+logger = logging.getLogger("jobsearch_agent")
 
 
 def load_history(path: Path) -> list:
-    if not path.exists():
-        return []
-    try:
-        return json.loads(path.read_text())
-    except Exception:
-        return []
+    from storage.history import load_json_history
+
+    return load_json_history(path)
 
 
 def save_history(path: Path, history: list):
-    # Ensure the directory exists
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(history, indent=2))
+    from storage.history import save_json_history
 
+    save_json_history(path, history)
 
-def main():
-    logger = init_logger()
-    logger.info("=== JobSearch AI Agent 2.0 Started ===")
 
-    # Load configuration
-    config = load_config()
+# ----- pipeline stages ------------------------------------------------------
 
-    # Prepare paths
-    history_path = Path("history/job_history.json")
-    digest_path = Path("outputs/latest_digest.md")
 
-    # Load job history
-    history = load_history(history_path)
+def _batch_stages(config, scraped, store, counts, run) -> list:
+    """
+    FILTER → ENRICH → CLASSIFY over the whole scrape at once, with filtering
+    and classification sharded across processes (see processor/parallel.py).
+    """
+    from processor.parallel import BatchProcessor
+    from scrapers.job_details import iter_enrich_jobs
+    from utils.metrics import timed
 
-    # SCRAPE
-    logger.info("Scraping LinkedIn...")
-    linkedin_jobs = scrape_linkedin(config)
-    logger.info(f"LinkedIn returned {len(linkedin_jobs)} jobs.")
+    jobs = list(scraped)
+    with BatchProcessor(config) as batch:
+        with run.stage("filter"):
+            filtered = batch.filter(jobs)
+        counts["filtered"] = len(filtered)
+        enriched = list(timed(iter_enrich_jobs(filtered, config, store.index), "enrich", run))
+        with run.stage("classify"):
+            return batch.classify(enriched)
 
-    # PROCESS
-    logger.info(f"Processing {len(linkedin_jobs)} scraped jobs...")
-    filtered = filter_jobs(linkedin_jobs, config)
-    logger.info(f"Filtered down to {len(filtered)} jobs.")
 
-    classified = classify_jobs(filtered, config)
-    logger.info(f"Classified {len(classified)} jobs.")
+def _stage_fields(run, stage: str, jobs: int) -> dict:
+    """
+    Structured log fields for a stage summary line (see utils/logger.py).
+    """
+    return {"stage": stage, "jobs": jobs, "seconds": round(run.stages.get(stage, 0.0), 4)}
 
-    # DEDUPE
-    deduped, updated_history = dedupe_jobs(classified, history)
-    logger.info(f"After dedupe: {len(deduped)} new or updated jobs.")
 
-    # SAVE DIGEST (always show full filtered list)
-    build_digest(
-        new_jobs=deduped,
-        all_filtered_jobs=classified,
-        total_in_history=len(updated_history),
-        output_path=digest_path,
+def process_jobs(config, scraped, store, near_dupes, run, counts, classified) -> list:
+    """
+    FILTER → ENRICH → CLASSIFY → CLUSTER → DEDUPE over a stream of scraped
+    jobs. Every classified job is appended to `classified`, stage counts
+    go to `counts`. Returns the new or updated jobs.
+    """
+    from processor.dedupe import iter_dedupe_jobs
+    from processor.filters import iter_filter_jobs
+    from processor.near_dupes import iter_tag_clusters
+    from processor.pipeline import collect, tally
+    from processor.relevance_classifier import iter_classify_jobs
+    from scrapers.job_details import iter_enrich_jobs
+    from utils.metrics import timed
+
+    if config.get("batch", {}).get("enabled", False):
+        relevant = _batch_stages(config, scraped, store, counts, run)
+        classified.extend(relevant)
+    else:
+        filtered = timed(tally(iter_filter_jobs(scraped, config), counts, "filtered"), "filter", run)
+        enriched = timed(iter_enrich_jobs(filtered, config, store.index), "enrich", run)
+        relevant = timed(collect(iter_classify_jobs(enriched, config), classified), "classify", run)
+    clustered = timed(iter_tag_clusters(relevant, near_dupes), "cluster", run)
+    return list(timed(iter_dedupe_jobs(clustered, store.index), "dedupe", run))
+
+
+def _log_counts(run, counts, classified, deduped) -> None:
+    if "scraped" in counts:
+        logger.info(f"Scraped {counts['scraped']} jobs.", extra=_stage_fields(run, "scrape", counts["scraped"]))
+    logger.info(
+        f"Filtered down to {counts.get('filtered', 0)} jobs.", extra=_stage_fields(run, "filter", counts.get("filtered", 0))
     )
+    logger.info(f"Classified {len(classified)} jobs.", extra=_stage_fields(run, "classify", len(classified)))
+    logger.info(f"After dedupe: {len(deduped)} new or updated jobs.", extra=_stage_fields(run, "dedupe", len(deduped)))
 
-    logger.info(f"Digest saved → {digest_path}")
 
-    # UPDATE HISTORY
-    save_history(history_path, updated_history)
+def write_digest(config, new_jobs, classified, total_in_history, run, cache=None) -> None:
+    from output.digest_builder import build_digest
+
+    # SAVE DIGEST (always show full filtered list)
+    with run.stage("digest"):
+        build_digest(
+            new_jobs=new_jobs,
+            all_filtered_jobs=classified,
+            total_in_history=total_in_history,
+            output_path=DIGEST_PATH,
+            extra_outputs=config.get("digest", {}).get("extra_outputs", []),
+            cache=cache,
+            config_version=RuntimeConfig.of(config).section_hash(*DIGEST_SECTIONS),
+        )
+
+    logger.info(f"Digest saved → {DIGEST_PATH}")
 
-    # EMAIL
-    if config.get("email_notifications", {}).get("enabled", False):
+
+def send_email(config, new_jobs, classified, total_in_history, run, outbox=None, email_empty=True) -> None:
+    """
+    Queue the digest email for the `outbox` worker, or send it now when
+    there is none. `new_jobs` None means "not known": everyone gets the
+    digest file as written.
+    """
+    if not config.get("email_notifications", {}).get("enabled", False):
+        logger.info("Email sending disabled in config.")
+    elif not new_jobs and not email_empty:
+        logger.info("No new jobs — email skipped.")
+    elif outbox is not None:
+        from emailer.outbox import queue_digest
+
+        try:
+            with run.stage("email"):
+                queued = queue_digest(
+                    outbox,
+                    DIGEST_PATH,
+                    config,
+                    new_jobs=new_jobs,
+                    all_jobs=classified,
+                    total_in_history=total_in_history,
+                )
+            logger.info(f"Email digest queued ({queued} message(s)).")
+        except Exception as e:
+            run.incr("email_errors")
+            logger.error(f"Email queueing failed: {e}")
+    else:
         from emailer.mailer import send_digest
 
         logger.info("Sending email digest...")
         try:
-            send_digest(digest_path, config)
+            with run.stage("email"):
+                send_digest(
+                    DIGEST_PATH,
+                    config,
+                    new_jobs=new_jobs,
+                    all_jobs=classified,
+                    total_in_history=total_in_history,
+                )
             logger.info("Email sent successfully.")
         except Exception as e:
+            run.incr("email_errors")
             logger.error(f"Email sending failed: {e}")
-    else:
-        logger.info("Email sending disabled in config.")
+
+
+def run_cycle(
+    config, store, near_dupes, scrapers=None, email_empty=True, run=None, outbox=None, digest_cache=None
+) -> list:
+    """
+    One scrape → digest → history → email pass against an already-open
+    history store and near-duplicate index (see cmd_run() and agent_daemon.py).
+    `scrapers` limits the run to some sources (default: all enabled).
+    Stage timings and counters go to `run` (default: a new daemon-cycle
+    record); the caller writes it with finish_run(), once whatever it
+    wants recorded (e.g. outbox delivery) has happened. With an `outbox`
+    worker (emailer/outbox.py) the digest email is queued, not sent.
+    A `digest_cache` (output/digest_builder.py LineCache) kept across
+    cycles spares re-rendering unchanged digest lines.
+    Returns the new or updated jobs.
+    """
+    from processor.pipeline import flatten_batches, tally
+    from scrapers.registry import commit_source_state, run_scrapers
+    from utils import metrics
+    from utils.metrics import timed
+
+    run = run or metrics.begin_run("cycle")
+
+    # SCRAPE → FILTER → ENRICH → CLASSIFY → CLUSTER → DEDUPE, streamed page by
+    # page so processing overlaps with network I/O. Each stage's time is
+    # its own, excluding the stages it pulls from.
+    logger.info("Running enabled scrapers...")
+    reports = []
+    counts = {}
+    classified = []
+
+    scraped = timed(tally(flatten_batches(run_scrapers(config, reports, scrapers)), counts, "scraped"), "scrape", run)
+    deduped = process_jobs(config, scraped, store, near_dupes, run, counts, classified)
+    _log_counts(run, counts, classified, deduped)
+
+    write_digest(config, deduped, classified, len(store), run, digest_cache)
+
+    # UPDATE HISTORY
+    with run.stage("history_save"):
+        store.commit()
+        if near_dupes is not None:
+            near_dupes.save(NEAR_DUPES_PATH)
+        commit_source_state(reports)
+
+    send_email(config, deduped, classified, len(store), run, outbox, email_empty)
+
+    # PER-SOURCE REPORT
+    _log_sources(run, reports)
+
+    # METRICS
+    run.counters.update(counts)
+    run.counters["classified"] = len(classified)
+    run.counters["new"] = len(deduped)
+
+    return deduped
+
+
+def _log_sources(run, reports) -> None:
+    for r in reports:
+        logger.info(
+            f"Source {r}", extra={"source": r.name, "status": r.status, "jobs": r.jobs, "seconds": round(r.seconds, 3)}
+        )
+    run.info["sources"] = [
+        {"name": r.name, "status": r.status, "seconds": round(r.seconds, 3), "jobs": r.jobs} for r in reports
+    ]
+
+
+def finish_run(run, outbox=None) -> None:
+    """
+    Append `run` to logs/metrics.jsonl and log its summary. With an
+    `outbox` worker, what is still queued goes in as outbox_depth.
+    """
+    if outbox is not None:
+        run.counters["outbox_depth"] = outbox.outbox.depth()
+    run.write()
+    logger.info(f"Metrics: {run.summary()}", extra={"stage": "run", "seconds": run.record()["seconds"]})
+
+
+def _open_history(config, run):
+    """
+    Job history (+ the near-duplicate index kept alongside it).
+    """
+    from processor.near_dupes import index_from_config
+    from storage.history import open_history
+
+    with run.stage("history_load"):
+        store = open_history(config)
+        near_dupes = index_from_config(config, NEAR_DUPES_PATH, store.jobs())
+    return store, near_dupes
+
+
+# ----- intermediate files ---------------------------------------------------
+
+
+def _write_jobs(path: Path, jobs) -> int:
+    """
+    Stream jobs to a JSONL file (renamed into place when complete).
+    """
+    from processor.job import as_dict
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    n = 0
+    with open(tmp, "w", encoding="utf-8") as f:
+        for job in jobs:
+            f.write(json.dumps(as_dict(job), ensure_ascii=False) + "\n")
+            n += 1
+    tmp.replace(path)
+    return n
+
+
+def _read_jobs(path: Path):
+    from processor.job import Job
+
+    if not path.exists():
+        raise SystemExit(f"Missing {path} — run `python run_agent.py scrape` first")
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield Job.from_dict(json.loads(line))
+
+
+def _write_processed(path: Path, new_jobs, classified, total_in_history: int) -> None:
+    from processor.job import as_dict
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(
+        json.dumps(
+            {
+                "total_in_history": total_in_history,
+                "new": [as_dict(j) for j in new_jobs],
+                "relevant": [as_dict(j) for j in classified],
+            },
+            ensure_ascii=False,
+        ),
+        encoding="utf-8",
+    )
+    tmp.replace(path)
+
+
+def _read_processed(path: Path):
+    """
+    (new jobs, relevant jobs, total in history) written by `process`.
+    """
+    from processor.job import Job
+
+    if not path.exists():
+        raise SystemExit(f"Missing {path} — run `python run_agent.py process` first")
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return (
+        [Job.from_dict(j) for j in data.get("new", [])],
+        [Job.from_dict(j) for j in data.get("relevant", [])],
+        int(data.get("total_in_history", 0)),
+    )
+
+
+# ----- commands -------------------------------------------------------------
+
+
+def cmd_run(args) -> int:
+    from emailer.outbox import flush_seconds, start_worker
+    from scrapers.incremental import WarmStates, keep_states_warm
+    from utils import metrics
+
+    logger.info("=== JobSearch AI Agent 2.0 Started ===")
+    run = metrics.begin_run("cold")
+
+    # Load configuration
+    with run.stage("config"):
+        config = load_config(args.config)
+
+    store, near_dupes = _open_history(config, run)
+
+    # Delivers mail queued by earlier runs while this one scrapes
+    outbox = start_worker(config)
+
+    # Scrapers seed their incremental state from this store, not a second one
+    keep_states_warm(WarmStates(store))
+    try:
+        run_cycle(config, store, near_dupes, run=run, outbox=outbox)
+    finally:
+        keep_states_warm(None)
+        store.close()
+        # Delivery of this run's digest belongs in this run's record
+        if outbox is not None:
+            outbox.stop(flush_seconds(config))
+    finish_run(run, outbox)
 
     logger.info("=== JobSearch AI Agent 2.0 Complete ===")
+    return 0
+
+
+def cmd_daemon(args) -> int:
+    from agent_daemon import AgentDaemon
+
+    AgentDaemon(args.config).run_forever()
+    return 0
+
+
+def cmd_scrape(args) -> int:
+    from processor.pipeline import flatten_batches, tally
+    from scrapers.registry import commit_source_state, enabled_scrapers, run_scrapers
+    from utils import metrics
+    from utils.metrics import timed
+
+    config = load_config(args.config)
+    run = metrics.begin_run("scrape")
+    scrapers = enabled_scrapers(config)
+    if args.source:
+        scrapers = {name: s for name, s in scrapers.items() if name in args.source}
+
+    reports = []
+    counts = {}
+    scraped = timed(tally(flatten_batches(run_scrapers(config, reports, scrapers)), counts, "scraped"), "scrape", run)
+    _write_jobs(args.out, scraped)
+    # The scraped file is this step's output: once it's written, the jobs
+    # are safe and the sources can move their incremental state on
+    commit_source_state(reports)
+    logger.info(f"Scraped {counts['scraped']} jobs → {args.out}", extra=_stage_fields(run, "scrape", counts["scraped"]))
+    _log_sources(run, reports)
+
+    run.counters.update(counts)
+    finish_run(run)
+    return 0 if all(r.status == "ok" for r in reports) else 1
+
+
+def cmd_process(args) -> int:
+    from utils import metrics
+
+    config = load_config(args.config)
+    run = metrics.begin_run("process")
+    scraped = _read_jobs(args.input)
+    store, near_dupes = _open_history(config, run)
+    counts = {}
+    classified = []
+    try:
+        deduped = process_jobs(config, scraped, store, near_dupes, run, counts, classified)
+        with run.stage("history_save"):
+            store.commit()
+            if near_dupes is not None:
+                near_dupes.save(NEAR_DUPES_PATH)
+        _write_processed(args.out, deduped, classified, len(store))
+    finally:
+        store.close()
+
+    _log_counts(run, counts, classified, deduped)
+    logger.info(f"Processed → {args.out}")
+    run.counters.update(counts)
+    run.counters["classified"] = len(classified)
+    run.counters["new"] = len(deduped)
+    finish_run(run)
+    return 0
+
+
+def cmd_digest(args) -> int:
+    from utils import metrics
+
+    config = load_config(args.config)
+    run = metrics.begin_run("digest")
+    new_jobs, relevant, total = _read_processed(args.input)
+    write_digest(config, new_jobs, relevant, total, run)
+    finish_run(run)
+    return 0
+
+
+def cmd_send(args) -> int:
+    from emailer.outbox import flush_seconds, start_worker
+    from utils import metrics
+
+    config = load_config(args.config)
+    run = metrics.begin_run("send")
+    if args.input.exists():
+        new_jobs, relevant, total = _read_processed(args.input)
+    else:
+        new_jobs, relevant, total = None, [], 0
+
+    outbox = start_worker(config)
+    try:
+        send_email(config, new_jobs, relevant, total, run, outbox)
+    finally:
+        if outbox is not None:
+            outbox.stop(flush_seconds(config))
+    finish_run(run, outbox)
+    return 1 if run.counters.get("email_errors") else 0
+
+
+def _disk_bytes(path: Path) -> int:
+    """
+    Size of a history directory, or of a history file plus its side files
+    (SQLite -wal/-shm).
+    """
+    if path.is_dir():
+        return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+    return sum(p.stat().st_size for p in path.parent.glob(path.name + "*") if p.is_file())
+
+
+def cmd_history(args) -> int:
+    from storage.history import history_location, open_history
+
+    config = load_config(args.config)
+    backend, path = history_location(config)
+    before = _disk_bytes(path)
+    store = open_history(config)
+    try:
+        if args.action == "stats":
+            print(f"backend:  {backend}")
+            print(f"path:     {path}")
+            print(f"jobs:     {len(store):,}")
+            print(f"on disk:  {before / 1024:,.0f} KiB")
+            return 0
+        store.compact()
+    finally:
+        store.close()
+
+    logger.info(f"[History] Compacted {path}: {before / 1024:,.0f} KiB → {_disk_bytes(path) / 1024:,.0f} KiB")
+    return 0
+
+
+# ----- entry point ----------------------------------------------------------
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="JobSearch AI Agent", epilog="With no command, runs the full pipeline."
+    )
+    parser.add_argument("--config", type=Path, default=CONFIG_PATH, help=f"config file (default: {CONFIG_PATH})")
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="keep running and scrape on each source's interval (see agent_daemon.py)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="run under cProfile; writes logs/profile_<time>.prof and a top-functions .txt",
+    )
+    sub = parser.add_subparsers(dest="command", metavar="command")
+
+    sub.add_parser("run", help="scrape → process → digest → send (the default)")
+
+    p = sub.add_parser("scrape", help=f"run the scrapers, write the jobs to {SCRAPED_PATH}")
+    p.add_argument("--source", action="append", help="only this scraper (repeatable)")
+    p.add_argument("--out", type=Path, default=SCRAPED_PATH)
+
+    p = sub.add_parser("process", help=f"filter, classify and dedupe a scrape, write {PROCESSED_PATH}")
+    p.add_argument("--in", dest="input", type=Path, default=SCRAPED_PATH)
+    p.add_argument("--out", type=Path, default=PROCESSED_PATH)
+
+    p = sub.add_parser("digest", help=f"build the digest from {PROCESSED_PATH}")
+    p.add_argument("--in", dest="input", type=Path, default=PROCESSED_PATH)
+
+    p = sub.add_parser("send", help="email the digest (personalized from the last `process`, if any)")
+    p.add_argument("--in", dest="input", type=Path, default=PROCESSED_PATH)
+
+    p = sub.add_parser("history", help="job history maintenance")
+    p.add_argument("action", choices=["stats", "compact"])
+
+    return parser
+
+
+COMMANDS = {
+    "run": cmd_run,
+    "scrape": cmd_scrape,
+    "process": cmd_process,
+    "digest": cmd_digest,
+    "send": cmd_send,
+    "history": cmd_history,
+}
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    command = cmd_daemon if args.daemon else COMMANDS[args.command or "run"]
+
+    try:
+        log_settings = load_config(args.config).get("logging")
+    except ConfigError:
+        log_settings = None  # reported by the command
+    init_logger(log_settings)
+
+    try:
+        if args.profile:
+            from utils import metrics
+
+            with metrics.profiled():
+                return command(args)
+        return command(args)
+    except ConfigError as e:
+        logger.error(str(e))
+        return 1
 
 
 if __name__ == "__main__":
-    main()
+    raise SystemExit(main())
@@ -15,6 +15,19 @@ It should return a list of job dictionaries with fields:
         "source": str
     }
 
+Plain dicts are fine. The pipeline turns them into processor.job.Job
+records, and scrapers may also build Job(title, company, location, url,
+source=...) objects directly.
+
+Any module in scrapers/ that defines run() is picked up automatically by
+scrapers/registry.py. It runs when config["scrapers"] has a section for
+it whose "enabled" flag isn't false. The section name is the module name
+without a trailing "_scraper" (greenhouse_scraper.py -> "greenhouse"),
+or a module-level SOURCE_NAME if you define one.
+
+Enabled scrapers run concurrently. Each gets
+config["scrapers"][<name>]["timeout_seconds"] (default 600) to finish.
+
 This template is fully commented to guide new scraper authors.
 """
 
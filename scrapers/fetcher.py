@@ -0,0 +1,490 @@
+# scrapers/fetcher.py
+
+from __future__ import annotations
+import logging
+import math
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple, TypeVar
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils import metrics
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+logger = logging.getLogger("jobsearch_agent")
+
+DEFAULT_HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+
+def build_session(pool_size: int = 4, headers: Optional[Dict[str, str]] = None) -> requests.Session:
+    """
+    Create a keep-alive HTTP session whose connection pool is large enough
+    for `pool_size` concurrent workers hitting the same host.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(headers or DEFAULT_HEADERS)
+    return session
+
+
+class SessionPool:
+    """
+    Named sessions kept open across runs, so a long-running process (see
+    agent_daemon.py) reuses its keep-alive connections instead of
+    reconnecting every cycle.
+
+    The pool also keeps one HostBudget per (name, host), so the rate a
+    host taught us, a pending Retry-After pause and an open circuit carry
+    over to the next cycle instead of starting from scratch.
+    """
+
+    def __init__(self):
+        self._sessions: Dict[str, requests.Session] = {}
+        self._budgets: Dict[Tuple[str, str], Tuple[Dict[str, Any], HostBudget]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str, pool_size: int) -> requests.Session:
+        with self._lock:
+            session = self._sessions.get(name)
+            if session is None:
+                session = build_session(pool_size=pool_size)
+                self._sessions[name] = session
+            return session
+
+    def budget(self, name: str, url: str, settings: Dict[str, Any]) -> HostBudget:
+        """
+        The pooled budget for `name` and the host of `url`; rebuilt only
+        when `settings` (HostBudget keyword arguments) change.
+        """
+        key = (name, urlsplit(url).netloc.lower())
+        with self._lock:
+            entry = self._budgets.get(key)
+            if entry is None or entry[0] != settings:
+                entry = (dict(settings), HostBudget(**settings))
+                self._budgets[key] = entry
+            return entry[1]
+
+    def close(self) -> None:
+        """
+        Close the sessions. Budgets are kept: closing connections (e.g. on
+        a config reload) doesn't make a host any less throttled.
+        """
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+_warm_sessions: Optional[SessionPool] = None
+
+
+def keep_sessions_warm(pool: Optional[SessionPool]) -> None:
+    """
+    Make shared_session() hand out sessions from `pool` (None: go back to
+    one fresh session per use).
+    """
+    global _warm_sessions
+    _warm_sessions = pool
+
+
+@contextmanager
+def shared_session(name: str, pool_size: int = 4) -> Iterator[requests.Session]:
+    """
+    Session for one scrape or enrichment pass: a fresh one closed on exit,
+    or the pooled one for `name` while keep_sessions_warm() is in effect.
+    """
+    pool = _warm_sessions
+    if pool is None:
+        with build_session(pool_size=pool_size) as session:
+            yield session
+    else:
+        yield pool.get(name, pool_size)
+
+
+class CircuitOpenError(requests.RequestException):
+    """
+    Raised instead of sending a request while a host's circuit is open.
+    """
+
+
+# Statuses that mean "slow down" (throttle) or "try again" (transient)
+THROTTLE_STATUSES = frozenset((429, 503))
+RETRY_STATUSES = THROTTLE_STATUSES | {500, 502, 504}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Seconds to wait from a Retry-After header (delta-seconds or HTTP date).
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class HostBudget:
+    """
+    Adaptive politeness budget for a single host.
+
+    - At most `max_in_flight` requests are outstanding at once.
+    - Request starts draw from a token bucket (depth `burst`) refilled at
+      `rate` tokens/s, plus a random 0..`jitter` seconds per request. The
+      rate starts at, and never exceeds, 1 / `min_interval` (unlimited
+      when min_interval is 0).
+    - On 429/503 the rate halves (floor `min_rate`; an unlimited rate
+      first drops to the rate recently achieved), and the whole host
+      pauses for Retry-After when the server sends one. The throttled
+      request itself retries after that, or after a jittered exponential
+      backoff. Once the new rate has had time to show, every success
+      raises it by ~10% again.
+    - After `failure_threshold` consecutive failures (network errors,
+      5xx) the circuit opens: requests fail fast with CircuitOpenError
+      for `cooldown` seconds, then a single trial request decides whether
+      it closes again (a 429 hands that decision to its retry).
+
+    Counters (requests, retries, throttled, errors, circuit_opens) are
+    reported by summary() and cleared by reset_counters().
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 2,
+        min_interval: float = 0.4,
+        jitter: float = 0.4,
+        burst: int = 1,
+        min_rate: float = 0.05,
+        max_retries: int = 3,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+        failure_threshold: int = 5,
+        cooldown: float = 60.0,
+    ):
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.min_interval = max(0.0, float(min_interval))
+        self.jitter = max(0.0, float(jitter))
+        self.burst = max(1, int(burst))
+        self.max_rate = 1.0 / self.min_interval if self.min_interval else math.inf
+        self.min_rate = float(min_rate)
+        self.max_retries = max(0, int(max_retries))
+        self.backoff_base = float(backoff_base)
+        self.backoff_max = float(backoff_max)
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.cooldown = float(cooldown)
+
+        self._slots = threading.BoundedSemaphore(self.max_in_flight)
+        self._lock = threading.Lock()
+        self.rate = self.max_rate
+        self._tokens = float(self.burst)
+        self._refilled = time.monotonic()
+        self._paused_until = 0.0
+        self._slowed_at = 0.0
+        self._holdoff = 0.0
+        self._recent: deque = deque(maxlen=32)
+        self._failures = 0
+        self._open_until = 0.0
+        self._trial = False
+
+        self.reset_counters()
+
+    def reset_counters(self) -> None:
+        """
+        Start a new reporting period; the learned rate, pause and circuit
+        state are kept.
+        """
+        with self._lock:
+            self.requests = 0
+            self.retries = 0
+            self.throttled = 0
+            self.errors = 0
+            self.circuit_opens = 0
+            self._first = self._last = 0.0
+
+    # ----- pacing ---------------------------------------------------------
+
+    def _check_circuit(self, now: float) -> None:
+        if self._failures < self.failure_threshold:
+            return
+        if now < self._open_until or self._trial:
+            raise CircuitOpenError("circuit open: too many consecutive failures")
+        self._trial = True  # half-open: let one request through
+
+    def _wait_turn(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._check_circuit(now)
+            if math.isinf(self.rate):
+                delay = 0.0
+            else:
+                self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate)
+                self._refilled = now
+                self._tokens -= 1.0
+                delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            delay = max(delay, self._paused_until - now)
+            if self.jitter:
+                delay += random.uniform(0, self.jitter)
+            start = now + delay
+            self.requests += 1
+            self._first = self._first or start
+            self._last = max(self._last, start)
+            self._recent.append(start)
+        if delay > 0:
+            time.sleep(delay)
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        self._slots.acquire()
+        try:
+            self._wait_turn()
+            yield
+        finally:
+            self._slots.release()
+
+    # ----- feedback -------------------------------------------------------
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Full-jitter exponential backoff for the given retry attempt.
+        """
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def record_retry(self) -> None:
+        with self._lock:
+            self.retries += 1
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._trial = False
+            settled = time.monotonic() >= self._slowed_at + self._holdoff
+            if settled and self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate * 1.1 + 0.05)
+
+    def record_throttle(
+        self, status: int, retry_after: Optional[float], attempt: int = 0, sent_at: float = 0.0
+    ) -> float:
+        """
+        Slow down after a 429/503 to a request sent at `sent_at` (monotonic).
+        Returns the pause applied, in seconds. Responses to requests sent
+        before, or shortly after, the last slowdown don't halve the rate
+        again. A 503 also counts towards the circuit breaker; a 429 only
+        means "slower".
+        """
+        pause = retry_after if retry_after is not None else self.backoff(attempt)
+        with self._lock:
+            self.throttled += 1
+            now = time.monotonic()
+            if sent_at >= self._slowed_at + self._holdoff:
+                if math.isinf(self.rate):
+                    # Unlimited so far: start from the rate actually achieved
+                    self.rate = self._recent_rate(now) or 1.0
+                self.rate = max(self.min_rate, self.rate / 2)
+                self._tokens = min(self._tokens, 0.0)
+                self._slowed_at = now
+                # Servers count requests over a window; give the new rate
+                # time to show before reacting again
+                self._holdoff = min(5.0, 2.0 / self.rate)
+            if retry_after is not None:
+                # The server named a time: hold every request to this host
+                self._paused_until = max(self._paused_until, now + retry_after)
+            if self._trial and status == 429:
+                # A throttled half-open trial neither closes nor reopens the
+                # circuit: the retry after the pause is the next trial
+                self._trial = False
+                self._open_until = max(self._open_until, now + pause)
+        if status != 429:
+            self.record_failure()
+        return pause
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.errors += 1
+            self._failures += 1
+            if self._failures >= self.failure_threshold and (self._trial or self._failures == self.failure_threshold):
+                self._open_until = time.monotonic() + self.cooldown
+                self._trial = False
+                self.circuit_opens += 1
+
+    # ----- reporting ------------------------------------------------------
+
+    def _recent_rate(self, now: float) -> float:
+        """
+        Request starts per second over the last (up to) 32 requests.
+        """
+        if len(self._recent) < 2:
+            return 0.0
+        span = max(now, self._recent[-1]) - self._recent[0]
+        return (len(self._recent) - 1) / span if span > 0 else 0.0
+
+    def _observed_rate(self) -> float:
+        span = self._last - self._first
+        return self.requests / span if span > 0 else 0.0
+
+    def summary(self) -> str:
+        rate = "unlimited" if math.isinf(self.rate) else f"{self.rate:.2f}/s"
+        return (
+            f"requests={self.requests} ({self._observed_rate():.2f} req/s) retries={self.retries} "
+            f"throttled={self.throttled} errors={self.errors} circuit_opens={self.circuit_opens} "
+            f"rate={rate}"
+        )
+
+
+def budget_settings(cfg: Dict[str, Any], **defaults: Any) -> Dict[str, Any]:
+    """
+    HostBudget keyword arguments from a scraper-style config section:
+    max_in_flight, min_request_interval, request_jitter, max_retries,
+    backoff_base, backoff_max, circuit_failures, circuit_cooldown.
+    """
+    def opt(key: str, name: str, default: Any) -> Any:
+        return cfg.get(key, defaults.get(name, default))
+
+    return dict(
+        max_in_flight=opt("max_in_flight", "max_in_flight", 2),
+        min_interval=opt("min_request_interval", "min_interval", 0.4),
+        jitter=opt("request_jitter", "jitter", 0.4),
+        max_retries=opt("max_retries", "max_retries", 3),
+        backoff_base=opt("backoff_base", "backoff_base", 1.0),
+        backoff_max=opt("backoff_max", "backoff_max", 60.0),
+        failure_threshold=opt("circuit_failures", "failure_threshold", 5),
+        cooldown=opt("circuit_cooldown", "cooldown", 60.0),
+    )
+
+
+def shared_budget(name: str, url: str, cfg: Dict[str, Any], **defaults: Any) -> HostBudget:
+    """
+    Budget for one scrape or enrichment pass against the host of `url`: a
+    fresh one, or the pooled one while keep_sessions_warm() is in effect,
+    so what the host taught the previous cycle still applies. Counters
+    start from zero either way, keeping summary() per pass.
+    """
+    settings = budget_settings(cfg, **defaults)
+    pool = _warm_sessions
+    if pool is None:
+        return HostBudget(**settings)
+    budget = pool.budget(name, url, settings)
+    budget.reset_counters()
+    return budget
+
+
+def polite_get(
+    session: requests.Session,
+    url: str,
+    budget: HostBudget,
+    timeout: float = 10,
+    **kwargs: Any,
+) -> requests.Response:
+    """
+    GET `url` through `session` while holding a slot of `budget`.
+
+    429/503 responses throttle the host (see HostBudget) and, like other
+    transient failures (500/502/504, connection errors, timeouts), are
+    retried up to budget.max_retries times with jittered exponential
+    backoff. The last response is returned whatever its status; the last
+    exception is re-raised. Raises CircuitOpenError while the host's
+    circuit is open.
+
+    Each attempt's latency (request_ms), status and body size
+    (bytes_downloaded) go to the current run's metrics.
+    """
+    run = metrics.current()
+    attempt = 0
+    while True:
+        try:
+            with budget.slot():
+                sent_at = time.monotonic()
+                resp = session.get(url, timeout=timeout, **kwargs)
+                run.observe("request_ms", (time.monotonic() - sent_at) * 1000)
+                run.incr("requests")
+                run.incr(f"http_{resp.status_code}")
+                run.incr("bytes_downloaded", len(resp.content))
+        except CircuitOpenError:
+            raise
+        except requests.RequestException:
+            run.incr("request_errors")
+            budget.record_failure()
+            if attempt >= budget.max_retries:
+                raise
+            pause = budget.backoff(attempt)
+        except Exception:
+            # Anything else still settles a half-open trial
+            budget.record_failure()
+            raise
+        else:
+            if resp.status_code not in RETRY_STATUSES:
+                budget.record_success()
+                return resp
+            if resp.status_code in THROTTLE_STATUSES:
+                retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                pause = budget.record_throttle(resp.status_code, retry_after, attempt, sent_at)
+            else:
+                budget.record_failure()
+                pause = budget.backoff(attempt)
+            if attempt >= budget.max_retries:
+                return resp
+            resp.close()
+
+        attempt += 1
+        budget.record_retry()
+        logger.debug(f"Retrying {url} in {pause:.1f}s (attempt {attempt}/{budget.max_retries})")
+        time.sleep(pause)
+
+
+def fetch_in_order(
+    work: Callable[[T], R],
+    items: Iterable[T],
+    workers: int = 4,
+    stop: Optional[Callable[[R], bool]] = None,
+) -> Iterator[R]:
+    """
+    Run `work` over `items` in a bounded thread pool and yield results in
+    the original order.
+
+    Only `workers` items are ever submitted ahead of the consumer. As soon
+    as `stop(result)` is true, that result is yielded, nothing further is
+    submitted, and results of items queued after it are discarded.
+    """
+    workers = max(1, int(workers))
+    it = iter(items)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        window: deque = deque()
+        for item in it:
+            window.append(pool.submit(work, item))
+            if len(window) >= workers:
+                break
+
+        while window:
+            result = window.popleft().result()
+            yield result
+
+            if stop is not None and stop(result):
+                for fut in window:
+                    fut.cancel()
+                return
+
+            nxt = next(it, _SENTINEL)
+            if nxt is not _SENTINEL:
+                window.append(pool.submit(work, nxt))
+
+
+_SENTINEL: Any = object()
@@ -0,0 +1,207 @@
+# scrapers/http_cache.py
+
+from __future__ import annotations
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+
+from scrapers.fetcher import HostBudget, polite_get
+from utils import metrics
+
+
+def normalize_url(url: str) -> str:
+    """
+    Cache key form of a URL: lowercase scheme/host, sorted query, no fragment.
+    """
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    path = parts.path or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, query, ""))
+
+
+def _to_json(obj: Any) -> Any:
+    # Parsed results may hold records such as processor.job.Job
+    if hasattr(obj, "to_dict"):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+class ResponseCache:
+    """
+    On-disk cache of HTTP responses and the jobs parsed out of them.
+
+    Each entry is one JSON file holding the validators (ETag, Last-Modified),
+    a SHA-256 of the body, the body itself and the parsed result. Entries
+    older than `ttl_seconds` are ignored. File mtimes track last use, and
+    `flush()` evicts least-recently-used entries until the cache fits in
+    `max_bytes`.
+    """
+
+    def __init__(self, directory: Path, ttl_seconds: float = 24 * 3600, max_bytes: int = 50 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.stats = {
+            "hits": 0,            # served from cache (304 or identical body)
+            "not_modified": 0,    # server answered 304
+            "unchanged_body": 0,  # 200 with the same body hash as last time
+            "misses": 0,          # had to parse a new body
+            "evictions": 0,
+        }
+
+    def _path(self, url: str) -> Path:
+        key = hashlib.sha1(normalize_url(url).encode("utf-8")).hexdigest()
+        return self.directory / f"{key}.json"
+
+    def _count(self, *names: str) -> None:
+        with self._lock:
+            for name in names:
+                self.stats[name] += 1
+
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        path = self._path(url)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry.get("stored_at", 0) > self.ttl_seconds:
+            return None
+        return entry
+
+    def conditional_headers(self, entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, url: str, resp: requests.Response, body_hash: str, parsed: Any) -> None:
+        entry = {
+            "url": normalize_url(url),
+            "etag": resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified"),
+            "body_hash": body_hash,
+            "stored_at": time.time(),
+            "body": resp.text,
+            "parsed": parsed,
+        }
+        path = self._path(url)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entry, f, default=_to_json)
+        os.replace(tmp, path)
+
+    def touch(self, url: str) -> None:
+        try:
+            os.utime(self._path(url))
+        except OSError:
+            pass
+
+    def flush(self) -> None:
+        """
+        Evict least-recently-used entries until the cache fits in max_bytes.
+        """
+        entries = []
+        total = 0
+        for p in self.directory.glob("*.json"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+            total += st.st_size
+
+        entries.sort()
+        for _, size, p in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                p.unlink()
+            except OSError:
+                continue
+            total -= size
+            self._count("evictions")
+
+    def summary(self) -> str:
+        s = self.stats
+        return (
+            f"hits={s['hits']} (304={s['not_modified']}, unchanged={s['unchanged_body']}) "
+            f"misses={s['misses']} evictions={s['evictions']}"
+        )
+
+
+def cache_from_config(config: Dict[str, Any]) -> Optional[ResponseCache]:
+    """
+    Build the shared response cache from config["http_cache"], or None when
+    it is disabled. Defaults: enabled, cache/http, 24h TTL, 50 MB.
+    """
+    cfg = config.get("http_cache", {})
+    if not cfg.get("enabled", True):
+        return None
+    return ResponseCache(
+        Path(cfg.get("dir", "cache/http")),
+        ttl_seconds=float(cfg.get("ttl_hours", 24)) * 3600,
+        max_bytes=int(float(cfg.get("max_mb", 50)) * 1024 * 1024),
+    )
+
+
+def fetch_parsed(
+    session: requests.Session,
+    url: str,
+    budget: HostBudget,
+    parse: Callable[[str], Any],
+    cache: Optional[ResponseCache] = None,
+    timeout: float = 10,
+) -> Tuple[int, Optional[Any]]:
+    """
+    GET `url` and return (status_code, parse(body)).
+
+    With a cache, the request is made conditional on the stored validators.
+    A 304, or a 200 whose body hash matches the stored one, returns the
+    cached parse result without re-parsing. The parsed value is None for
+    any status other than 200/304. Parse time goes to the current run's
+    metrics as stage "parse".
+    """
+    run = metrics.current()
+
+    if cache is None:
+        resp = polite_get(session, url, budget, timeout=timeout)
+        if resp.status_code != 200:
+            return resp.status_code, None
+        with run.stage("parse"):
+            return resp.status_code, parse(resp.text)
+
+    entry = cache.lookup(url)
+    resp = polite_get(session, url, budget, timeout=timeout, headers=cache.conditional_headers(entry))
+
+    if resp.status_code == 304 and entry is not None:
+        cache._count("hits", "not_modified")
+        cache.touch(url)
+        return 200, entry["parsed"]
+
+    if resp.status_code != 200:
+        return resp.status_code, None
+
+    body_hash = hashlib.sha256(resp.content).hexdigest()
+    if entry is not None and entry.get("body_hash") == body_hash:
+        cache._count("hits", "unchanged_body")
+        parsed = entry["parsed"]
+    else:
+        cache._count("misses")
+        with run.stage("parse"):
+            parsed = parse(resp.text)
+
+    # Refresh validators and stored_at even on an unchanged body
+    cache.store(url, resp, body_hash, parsed)
+    return 200, parsed
@@ -0,0 +1,261 @@
+# scrapers/incremental.py
+
+"""
+State for incremental scraping: which postings a scraper has already seen.
+
+- KnownJobs: a scalable Bloom filter of posting keys (e.g. "linkedin:<id>")
+  seen in earlier runs. First built from job history, then extended with
+  every posting each run sees. Lookups are a few hash probes however
+  large it grows; a false positive (default rate 0.1%) can only make a
+  search stop one page early when every other posting on that page is
+  genuinely known.
+- Watermarks: per search query, the newest posting keys seen on its first
+  page last run, when that run happened, and how many pages it needed.
+
+Both are stored together in one JSON file (history/linkedin_incremental.json
+for LinkedIn). Inspect or reset it with:
+
+    python -m scrapers.incremental show  [--path FILE]
+    python -m scrapers.incremental reset [--path FILE] [--query LABEL]
+
+Resetting everything makes the next run a full scrape that rebuilds the
+filter from history. The daemon keeps the state in memory between cycles
+(WarmStates) and notices a reset by the file's mtime.
+"""
+
+from __future__ import annotations
+import argparse
+import base64
+import hashlib
+import json
+import math
+import os
+import sys
+import tempfile
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_STATE_PATH = Path("history/linkedin_incremental.json")
+WATERMARK_SIZE = 25
+
+
+class BloomFilter:
+    """
+    Fixed-capacity Bloom filter (double hashing over one blake2b digest).
+    """
+
+    def __init__(self, capacity: int, error_rate: float, bits: Optional[bytearray] = None, count: int = 0):
+        self.capacity = max(1, int(capacity))
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self.bits = bits if bits is not None else bytearray((self.num_bits + 7) // 8)
+        self.count = count
+
+    def _positions(self, key: str) -> Iterable[int]:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        n = self.num_bits
+        return ((h1 + i * h2) % n for i in range(self.num_hashes))
+
+    def __contains__(self, key: str) -> bool:
+        bits = self.bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+    def add(self, key: str) -> None:
+        bits = self.bits
+        for p in self._positions(key):
+            bits[p >> 3] |= 1 << (p & 7)
+        self.count += 1
+
+
+class KnownJobs:
+    """
+    Scalable Bloom filter: when the newest filter is full, a new one with
+    twice the capacity (and a tighter error rate) is added, keeping the
+    overall false-positive rate near `error_rate`.
+    """
+
+    def __init__(self, initial_capacity: int = 10_000, error_rate: float = 0.001):
+        self.initial_capacity = initial_capacity
+        self.error_rate = error_rate
+        self.filters: List[BloomFilter] = []
+        self._lock = threading.Lock()
+
+    def __contains__(self, key: str) -> bool:
+        return any(key in f for f in self.filters)
+
+    def __len__(self) -> int:
+        return sum(f.count for f in self.filters)
+
+    def add(self, key: str) -> None:
+        with self._lock:
+            if key in self:
+                return
+            if not self.filters or self.filters[-1].count >= self.filters[-1].capacity:
+                n = len(self.filters)
+                self.filters.append(
+                    BloomFilter(self.initial_capacity * (2 ** n), self.error_rate * (0.5 ** (n + 1)))
+                )
+            self.filters[-1].add(key)
+
+    def update(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self.add(key)
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "initial_capacity": self.initial_capacity,
+            "error_rate": self.error_rate,
+            "filters": [
+                [f.capacity, f.error_rate, f.count, base64.b64encode(bytes(f.bits)).decode("ascii")]
+                for f in self.filters
+            ],
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "KnownJobs":
+        known = cls(data.get("initial_capacity", 10_000), data.get("error_rate", 0.001))
+        for capacity, error_rate, count, packed in data.get("filters", []):
+            known.filters.append(
+                BloomFilter(capacity, error_rate, bytearray(base64.b64decode(packed)), count)
+            )
+        return known
+
+
+class IncrementalState:
+    """
+    KnownJobs + per-query watermarks, loaded from and saved to one file.
+    """
+
+    def __init__(self, path: Path, known: Optional[KnownJobs] = None, watermarks: Optional[Dict[str, Any]] = None):
+        self.path = Path(path)
+        self.known = known if known is not None else KnownJobs()
+        self.watermarks: Dict[str, Dict[str, Any]] = watermarks or {}
+        self.bootstrapped = known is not None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: Path) -> "IncrementalState":
+        try:
+            data = json.loads(Path(path).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return cls(path)
+        known = KnownJobs.from_json(data["known"]) if "known" in data else None
+        return cls(path, known, data.get("watermarks", {}))
+
+    def is_known(self, key: str) -> bool:
+        return key in self.known
+
+    def record_query(self, label: str, newest: List[str], pages: int, stopped_early: bool) -> None:
+        with self._lock:
+            self.watermarks[label] = {
+                "newest": newest[:WATERMARK_SIZE],
+                "pages": pages,
+                "stopped_early": stopped_early,
+                "updated": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            }
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {"watermarks": self.watermarks, "known": self.known.to_json()}
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1)
+        os.replace(tmp, self.path)
+        if _warm_states is not None:
+            _warm_states.put(self)
+
+
+class WarmStates:
+    """
+    Incremental states kept in memory between daemon cycles, by file, and
+    the open history store that states without a file are seeded from.
+
+    A run takes its state out and it only comes back once saved, i.e. once
+    the run's jobs are committed: after a failed run the next one reloads
+    the file instead of trusting what the failed run learned. So does a
+    run after the file was changed behind our back (e.g. reset).
+    """
+
+    def __init__(self, history: Any = None):
+        self.history = history
+        self._states: Dict[Path, Tuple[Optional[int], IncrementalState]] = {}
+        self._lock = threading.Lock()
+
+    def take(self, path: Path) -> Optional[IncrementalState]:
+        with self._lock:
+            mtime, state = self._states.pop(Path(path), (None, None))
+        return state if state is not None and mtime == _mtime_ns(state.path) else None
+
+    def put(self, state: IncrementalState) -> None:
+        with self._lock:
+            self._states[state.path] = (_mtime_ns(state.path), state)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._states.clear()
+
+
+def _mtime_ns(path: Path) -> Optional[int]:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+_warm_states: Optional[WarmStates] = None
+
+
+def keep_states_warm(states: Optional[WarmStates]) -> None:
+    """
+    Make scrapers take their incremental state from `states` (None: load
+    it from its file every run).
+    """
+    global _warm_states
+    _warm_states = states
+
+
+def warm_states() -> Optional[WarmStates]:
+    """
+    The WarmStates set by keep_states_warm(), if any.
+    """
+    return _warm_states
+
+
+# ----- inspect / reset ----------------------------------------------------
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("command", choices=["show", "reset"])
+    ap.add_argument("--path", type=Path, default=DEFAULT_STATE_PATH)
+    ap.add_argument("--query", help="reset only this query's watermark (label as shown by 'show')")
+    args = ap.parse_args(argv)
+
+    state = IncrementalState.load(args.path)
+
+    if args.command == "show":
+        print(f"{args.path}: {len(state.known):,} known postings in {len(state.known.filters)} filter(s)")
+        for label, mark in sorted(state.watermarks.items()):
+            early = "stopped early" if mark.get("stopped_early") else "full"
+            print(f"  {label}: {mark.get('pages')} page(s), {early}, {len(mark.get('newest', []))} newest ids, {mark.get('updated')}")
+        return 0
+
+    if args.query:
+        if state.watermarks.pop(args.query, None) is None:
+            print(f"No watermark for {args.query!r}")
+            return 1
+        state.save()
+        print(f"Reset watermark for {args.query!r}")
+    elif args.path.exists():
+        args.path.unlink()
+        print(f"Removed {args.path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,249 @@
+# scrapers/job_details.py
+
+"""
+Description enrichment: fetch detail pages for new jobs.
+
+Search result cards carry no description, so classification only sees
+titles. iter_enrich_jobs() is a streaming stage that sits between
+filtering and classification:
+
+- jobs that already have a description pass through untouched;
+- jobs already in history get the description stored with them, or the
+  one in the on-disk description cache, but are never fetched (so a job
+  scores the same on every run);
+- every other job gets job["description"], from the cache when
+  possible, otherwise from its detail page, fetched in a bounded worker
+  pool that shares one per-host politeness budget, within this run's
+  limits.
+
+The stage runs when config has an "enrichment" section whose "enabled"
+flag isn't false:
+
+    "enrichment": {
+        "enabled": true,
+        "workers": 4,
+        "max_fetches": 50,          # detail pages fetched per run
+        "max_mb": 10,               # bytes downloaded per run
+        "request_timeout": 10,
+        "min_request_interval": 0.4,
+        "request_jitter": 0.4,
+        "cache_dir": "cache/descriptions",
+        "parser": "auto",           # utils/html_backend name
+        "detail_url": "https://www.linkedin.com/jobs-guest/jobs/api/jobPosting/{job_id}"
+    }
+
+Jobs without a job_id are fetched from their own url.
+"""
+
+from __future__ import annotations
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from processor.dedupe import dedupe_key
+from scrapers.fetcher import fetch_in_order, polite_get, shared_budget, shared_session
+from utils.html_backend import get_backend
+from utils.html_utils import find_first, safe_soup
+
+logger = logging.getLogger("jobsearch_agent")
+
+DETAIL_URL = "https://www.linkedin.com/jobs-guest/jobs/api/jobPosting/{job_id}"
+
+# Description containers, most specific first
+DESCRIPTION_SELECTORS = [
+    "div.show-more-less-html__markup",
+    "div.description__text",
+    "section.description",
+    "div#job-details",
+    "div.jobs-description__content",
+]
+
+
+class DescriptionCache:
+    """
+    One text file per job under `directory`, keyed by LinkedIn job id
+    (or a hash of the URL for jobs without one).
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.txt"
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            return self._path(key).read_text(encoding="utf-8")
+        except OSError:
+            return None
+
+    def put(self, key: str, text: str) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, self._path(key))
+
+
+class EnrichStats:
+    """
+    Per-run counters and timings for the enrichment stage.
+    """
+
+    def __init__(self):
+        self.known = 0
+        self.cached = 0
+        self.fetched = 0
+        self.failed = 0
+        self.over_limit = 0
+        self.bytes = 0
+        self.fetch_seconds = 0.0
+        self.seconds = 0.0
+
+    def __str__(self) -> str:
+        avg = self.fetch_seconds / self.fetched if self.fetched else 0.0
+        return (
+            f"fetched={self.fetched} ({self.bytes / 1024:.0f} KiB, avg {avg * 1000:.0f} ms) "
+            f"cached={self.cached} known={self.known} failed={self.failed} "
+            f"over_limit={self.over_limit} in {self.seconds:.1f}s"
+        )
+
+
+def description_key(job: Dict[str, Any]) -> str:
+    job_id = job.get("job_id")
+    if job_id:
+        return str(job_id)
+    url = (job.get("url") or "").split("?")[0].rstrip("/").lower()
+    return "u" + hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+
+
+def extract_description(html: str, backend: str = "auto") -> str:
+    """
+    Description text of a detail page ("" if none of the known
+    containers has any), parsed with a utils/html_backend backend.
+    """
+    name = get_backend(backend).name
+    soup = safe_soup(html, name)
+    return find_first(soup, DESCRIPTION_SELECTORS, name, separator=" ") or ""
+
+
+class _Enricher:
+    def __init__(self, cfg: Dict[str, Any], stats: EnrichStats):
+        self.stats = stats
+        self.detail_url = cfg.get("detail_url", DETAIL_URL)
+        self.max_fetches = int(cfg.get("max_fetches", 50))
+        self.max_bytes = int(float(cfg.get("max_mb", 10)) * 1024 * 1024)
+        self.timeout = float(cfg.get("request_timeout", 10))
+        self.cache = DescriptionCache(Path(cfg.get("cache_dir", "cache/descriptions")))
+        self.budget = shared_budget("enrichment", self.detail_url, cfg, max_in_flight=cfg.get("workers", 4))
+        self.backend = get_backend(cfg.get("parser", "auto")).name
+        self.session: Any = None
+        self._lock = threading.Lock()
+        self._started = 0
+
+    def _url(self, job: Dict[str, Any]) -> str:
+        job_id = job.get("job_id")
+        return self.detail_url.format(job_id=job_id) if job_id else job.get("url", "")
+
+    def _reserve(self) -> bool:
+        # Limits are checked before each fetch; fetches already in flight
+        # may overshoot max_mb by at most `workers` pages.
+        with self._lock:
+            if self._started >= self.max_fetches or self.stats.bytes >= self.max_bytes:
+                self.stats.over_limit += 1
+                return False
+            self._started += 1
+            return True
+
+    def known(self, job: Dict[str, Any], stored: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        A job already in history: its stored description, else the cached
+        one. Never fetched.
+        """
+        with self._lock:
+            self.stats.known += 1
+        text = stored.get("description") or self.cache.get(description_key(job))
+        if text:
+            job["description"] = text
+        return job
+
+    def enrich(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        key = description_key(job)
+        text = self.cache.get(key)
+        if text is not None:
+            with self._lock:
+                self.stats.cached += 1
+            job["description"] = text
+            return job
+
+        url = self._url(job)
+        if not url or not self._reserve():
+            return job
+
+        start = time.perf_counter()
+        try:
+            resp = polite_get(self.session, url, self.budget, timeout=self.timeout)
+            ok = resp.status_code == 200
+            size = len(resp.content)
+        except Exception as e:
+            logger.debug(f"[Enrich] {url}: {e}")
+            ok, size = False, 0
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self.stats.bytes += size
+            self.stats.fetch_seconds += elapsed
+            if not ok:
+                self.stats.failed += 1
+                return job
+            self.stats.fetched += 1
+
+        # Cached even when empty (unknown layout) so the page isn't refetched
+        text = extract_description(resp.text, self.backend)
+        self.cache.put(key, text)
+        job["description"] = text
+        return job
+
+
+def iter_enrich_jobs(
+    jobs: Iterable[Dict[str, Any]],
+    config: Dict[str, Any],
+    history_index: Any,
+    stats: Optional[EnrichStats] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Streaming stage: add job["description"] to jobs, fetching it only for
+    those not yet in `history_index` (a dedupe-key mapping, see
+    processor/dedupe.py).
+    Order is preserved. Counters go to `stats` when given.
+    """
+    cfg = config.get("enrichment", {})
+    stats = stats if stats is not None else EnrichStats()
+    if not cfg or not cfg.get("enabled", True):
+        yield from jobs
+        return
+
+    enricher = _Enricher(cfg, stats)
+    start = time.perf_counter()
+
+    def work(job: Dict[str, Any]) -> Dict[str, Any]:
+        if job.get("description"):
+            return job
+        stored = history_index.get(dedupe_key(job))
+        if stored is not None:
+            return enricher.known(job, stored)
+        return enricher.enrich(job)
+
+    try:
+        with shared_session("enrichment", pool_size=enricher.budget.max_in_flight) as session:
+            enricher.session = session
+            yield from fetch_in_order(work, jobs, workers=enricher.budget.max_in_flight)
+    finally:
+        stats.seconds = time.perf_counter() - start
+        logger.info(f"[Enrich] {stats}")
+        logger.info(f"[Enrich] Requests: {enricher.budget.summary()}")
@@ -1,14 +1,28 @@
 # scrapers/linkedin_scraper.py
 
 import requests
-from bs4 import BeautifulSoup
-from typing import List, Dict, Any
-import time
-import random
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Generator, Iterator, Optional, Tuple
+from urllib.parse import quote, urlencode
+import logging
+import queue
 import re
+import threading
+
+from scrapers.fetcher import HostBudget, fetch_in_order, shared_budget, shared_session
+from scrapers.http_cache import ResponseCache, cache_from_config, fetch_parsed
+from scrapers.incremental import DEFAULT_STATE_PATH, IncrementalState, warm_states
+from processor.job import Job, as_job
+from utils.html_backend import get_backend
+
+logger = logging.getLogger("jobsearch_agent")
 
 SEARCH_URL = "https://www.linkedin.com/jobs/search/"
 
+RESULTS_PER_PAGE = 25
+
+_JOB_ID_RE = re.compile(r"(?:-|/)(\d{6,})/?$")
+
 
 def _parse_posted_age(raw: str) -> int | None:
     """
@@ -57,110 +71,473 @@ def _parse_posted_age(raw: str) -> int | None:
     return None
 
 
-def scrape_linkedin(config: Dict[str, Any]) -> List[Dict[str, Any]]:
+def _build_page_url(base_url: str, keywords: str, location: str, start: int, newest_first: bool = False) -> str:
+    params = {"keywords": keywords, "location": location, "f_TPR": "r604800", "start": start}
+    if newest_first:
+        params["sortBy"] = "DD"
+    query = urlencode({k: v for k, v in params.items() if v != ""}, quote_via=quote)
+    return f"{base_url}?{query}"
+
+
+def _job_id(url: str) -> str | None:
     """
-    Stable LinkedIn scraper (public HTML version)
-    - Single broad search: "Engineer"
-    - Location: California, United States
-    - Max ~200 results (8 pages)
-    - Extracts title, company, location, url, and posting age.
+    Pull LinkedIn's numeric posting id out of a job URL, e.g.
+      https://www.linkedin.com/jobs/view/software-engineer-at-acme-3812345678 -> '3812345678'
     """
+    m = _JOB_ID_RE.search(url)
+    return m.group(1) if m else None
 
-    headers = {"User-Agent": "Mozilla/5.0"}
 
-    keywords = "Engineer"
-    location = "California, United States"
+def canonical_job_key(job: Dict[str, Any]) -> str:
+    """
+    Stable identity for a scraped posting: the LinkedIn job id when known,
+    otherwise the query-less, lowercased URL.
+    """
+    job_id = job.get("job_id")
+    if job_id:
+        return f"linkedin:{job_id}"
+    return job.get("url", "").split("?")[0].rstrip("/").lower()
+
+
+# (tag, class) -> card field, for the single-pass extractor.
+# A class of None matches the tag regardless of class.
+_CARD_FIELDS = {
+    ("h3", "base-search-card__title"): "title",
+    ("h4", "base-search-card__subtitle"): "company",
+    ("span", "job-search-card__location"): "location",
+    ("a", "base-card__full-link"): "link",
+    ("time", None): "time",
+    ("span", "job-search-card__listdate"): "listdate",
+    ("span", "job-search-card__listdate--new"): "listdate_new",
+}
+_CARD_TAGS = frozenset(tag for tag, _ in _CARD_FIELDS)
+
+
+def _extract_card(backend: Any, card: Any) -> Dict[str, Any]:
+    """
+    Collect the first element for every card field in one walk over the
+    card's subtree (instead of one find() per field).
+    """
+    found: Dict[str, Any] = {}
+
+    for tag, classes, el in backend.iter_elements(card):
+        if tag not in _CARD_TAGS:
+            continue
+        field = _CARD_FIELDS.get((tag, None))
+        if field and field not in found:
+            found[field] = el
+        for cls in classes:
+            field = _CARD_FIELDS.get((tag, cls))
+            if field and field not in found:
+                found[field] = el
+        if len(found) == len(_CARD_FIELDS):
+            break
+
+    return found
+
+
+def _parse_cards(html: str, backend: Any = None) -> List[Job]:
+    """
+    Extract Job records from one LinkedIn search results page.
+    `backend` is a utils.html_backend backend (default: fastest installed).
+    """
+    if backend is None:
+        backend = get_backend()
+
+    root = backend.parse(html)
+    text = backend.text
 
-    all_jobs: List[Dict[str, Any]] = []
-    max_pages = 8  # ≈ 200 jobs
-    results_per_page = 25
+    jobs: List[Job] = []
 
-    for page in range(max_pages):
-        start = page * results_per_page
+    for card in backend.find_all(root, "div", "base-card"):
+        found = _extract_card(backend, card)
+
+        # Posting age can be in <time> or in listdate spans
+        posted_raw = None
+        for field in ("time", "listdate", "listdate_new"):
+            el = found.get(field)
+            if el is not None:
+                posted_raw = text(el) or None
+                if posted_raw:
+                    break
 
-        page_url = (
-            f"{SEARCH_URL}"
-            f"?keywords={keywords}"
-            f"&location={location.replace(' ', '%20')}"
-            f"&f_TPR=r604800"
-            f"&start={start}"
+        days_since = _parse_posted_age(posted_raw)
+
+        title = text(found["title"]) if "title" in found else ""
+        company = text(found["company"]) if "company" in found else ""
+        location = text(found["location"]) if "location" in found else ""
+        url = backend.attr(found["link"], "href") if "link" in found else ""
+
+        if url:
+            url = url.split("?")[0]
+
+        if title and url:
+            job = Job(title, company, location, url, source="linkedin")
+
+            job_id = _job_id(url)
+            if job_id:
+                job["job_id"] = job_id
+
+            # Add posting age info (optional but very nice to have)
+            if posted_raw:
+                job["posted_age_raw"] = posted_raw
+            if days_since is not None:
+                job["days_since_posted"] = days_since
+
+            jobs.append(job)
+
+    return jobs
+
+
+def _plan_queries(li_cfg: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """
+    One search per (keyword, location) pair from config, in config order,
+    with case-insensitive duplicates dropped. An empty list on either side
+    means "don't constrain that parameter".
+    """
+    def _unique(values: List[str]) -> List[str]:
+        seen = set()
+        out = []
+        for v in values:
+            v = (v or "").strip()
+            if v.lower() not in seen:
+                seen.add(v.lower())
+                out.append(v)
+        return out or [""]
+
+    keywords = _unique(li_cfg.get("keywords", []))
+    locations = _unique(li_cfg.get("location_keywords", []))
+
+    return [(kw, loc) for kw in keywords for loc in locations]
+
+
+class _JobMerger:
+    """
+    Thread-safe gate that drops postings already seen under another page or
+    query and hands each page's new jobs on to the output queue.
+    Only the keys are kept, so memory doesn't grow with the jobs themselves.
+    """
+
+    def __init__(self, out: "queue.Queue[List[Job]]"):
+        self._seen: set = set()
+        self._lock = threading.Lock()
+        self._out = out
+        self.count = 0
+
+    def add(self, cards: List[Job]) -> int:
+        """
+        Merge a page of cards. Returns how many of them were new.
+        """
+        fresh = []
+        with self._lock:
+            for job in cards:
+                key = canonical_job_key(job)
+                if key not in self._seen:
+                    self._seen.add(key)
+                    fresh.append(job)
+            self.count += len(fresh)
+        if fresh:
+            self._out.put(fresh)
+        return len(fresh)
+
+    def keys(self) -> List[str]:
+        with self._lock:
+            return list(self._seen)
+
+
+class _SearchContext:
+    """
+    Everything the searches of one scrape_linkedin() call share.
+    """
+
+    def __init__(
+        self,
+        session: requests.Session,
+        budget: HostBudget,
+        backend: Any,
+        cache: Optional[ResponseCache],
+        merger: _JobMerger,
+        base_url: str,
+        max_pages: int,
+        workers: int,
+        timeout: float,
+        incremental: Optional[IncrementalState] = None,
+    ):
+        self.session = session
+        self.budget = budget
+        self.backend = backend
+        self.cache = cache
+        self.merger = merger
+        self.base_url = base_url
+        self.max_pages = max_pages
+        self.workers = workers
+        self.timeout = timeout
+        self.incremental = incremental
+
+
+def _fetch_page(ctx: _SearchContext, label: str, page: int, url: str) -> Optional[List[Job]]:
+    """
+    Fetch and parse one results page (or reuse its cached parse).
+    Returns None when the page failed (network error or non-200), which
+    ends pagination just like an empty page does.
+    """
+    logger.info(
+        f"[LinkedIn] Fetching page {page+1}/{ctx.max_pages} — {label}",
+        extra={"source": "linkedin", "query": label, "page": page + 1},
+    )
+
+    try:
+        status, cards = fetch_parsed(
+            ctx.session,
+            url,
+            ctx.budget,
+            lambda html: _parse_cards(html, ctx.backend),
+            cache=ctx.cache,
+            timeout=ctx.timeout,
         )
+    except Exception as e:
+        logger.error(f"[LinkedIn] ERROR fetching page: {e}", extra={"source": "linkedin", "query": label})
+        return None
+
+    if status != 200:
+        logger.warning(f"[LinkedIn] HTTP {status} — stopping {label}.", extra={"source": "linkedin", "query": label})
+        return None
 
-        print(f"[LinkedIn] Fetching page {page+1}/{max_pages}")
+    # Cached parses come back as plain dicts
+    return [as_job(c) for c in cards]
 
-        try:
-            resp = requests.get(page_url, headers=headers, timeout=10)
-        except Exception as e:
-            print(f"[LinkedIn] ERROR fetching page: {e}")
-            break
 
-        if resp.status_code != 200:
-            print(f"[LinkedIn] HTTP {resp.status_code} — stopping.")
-            break
+def _query_label(keywords: str, location: str) -> str:
+    return f"'{keywords or '*'}' in '{location or '*'}'"
+
+
+def _reached_known(state: IncrementalState, watermark: set, cards: List[Job]) -> bool:
+    """
+    True when a newest-first page shows the search has caught up with
+    earlier runs: it holds last run's newest posting, or nothing new.
+    """
+    keys = [canonical_job_key(c) for c in cards]
+    return any(k in watermark for k in keys) or all(state.is_known(k) for k in keys)
+
 
-        soup = BeautifulSoup(resp.text, "html.parser")
+def _run_query(ctx: _SearchContext, keywords: str, location: str) -> None:
+    """
+    Paginate a single search, merging each page as it arrives.
+    Stops at the first empty/failed page, or once a page brings in
+    nothing that another page or query hasn't already produced.
+
+    In incremental mode the results are sorted newest first, and the
+    search also stops after the first page that reaches postings known
+    from earlier runs. The first page is fetched on its own so that a
+    search with nothing new costs a single request.
+    """
+    label = _query_label(keywords, location)
+    state = ctx.incremental
+    page_urls = [
+        (page, _build_page_url(ctx.base_url, keywords, location, page * RESULTS_PER_PAGE, state is not None))
+        for page in range(ctx.max_pages)
+    ]
+    watermark = set(state.watermarks.get(label, {}).get("newest", [])) if state else set()
+
+    exhausted = False
+    fetched = 0
+    newest: List[str] = []
+
+    def _stop(cards: Optional[List[Job]]) -> bool:
+        return not cards or exhausted
+
+    def _pages() -> Iterator[Optional[List[Job]]]:
+        if state is None:
+            yield from fetch_in_order(
+                lambda item: _fetch_page(ctx, label, item[0], item[1]), page_urls, workers=ctx.workers, stop=_stop
+            )
+            return
+        first = _fetch_page(ctx, label, *page_urls[0])
+        yield first
+        if not _stop(first):
+            yield from fetch_in_order(
+                lambda item: _fetch_page(ctx, label, item[0], item[1]), page_urls[1:], workers=ctx.workers, stop=_stop
+            )
 
-        # Find all job cards
-        cards = soup.find_all("div", class_="base-card")
+    for cards in _pages():
+        if cards is None:
+            break
         if not cards:
-            print("[LinkedIn] No more job cards — stopping.")
+            logger.info(f"[LinkedIn] No more job cards — stopping {label}.")
             break
+        fetched += 1
+        if fetched == 1:
+            newest = [canonical_job_key(c) for c in cards]
+        caught_up = state is not None and _reached_known(state, watermark, cards)
+        if ctx.merger.add(cards) == 0:
+            logger.info(f"[LinkedIn] Only already-seen jobs — stopping {label}.")
+            exhausted = True
+        elif caught_up:
+            logger.info(f"[LinkedIn] Reached jobs from earlier runs — stopping {label}.")
+            exhausted = True
+
+    if state is not None and fetched:
+        state.record_query(label, newest, fetched, exhausted)
+
+
+def _load_incremental(config: Dict[str, Any], li_cfg: Dict[str, Any]) -> Optional[IncrementalState]:
+    """
+    Incremental state for this run, or None when incremental mode is off:
+    the one kept warm by the caller (see keep_states_warm), else the state
+    file. Without a state file the known-jobs filter is built from job
+    history, preferably the caller's open store.
+    """
+    if not li_cfg.get("incremental", False):
+        return None
 
-        for card in cards:
-            title_tag = card.find("h3", class_="base-search-card__title")
-            company_tag = card.find("h4", class_="base-search-card__subtitle")
-            location_tag = card.find("span", class_="job-search-card__location")
-            link_tag = card.find("a", class_="base-card__full-link")
-
-            # Posting age can be in <time> or in listdate spans
-            time_tag = card.find("time")
-            listdate_tag = card.find("span", class_="job-search-card__listdate")
-            listdate_new_tag = card.find(
-                "span", class_="job-search-card__listdate--new"
-            )
+    path = li_cfg.get("incremental_state", DEFAULT_STATE_PATH)
+    warm = warm_states()
+    state = warm.take(path) if warm is not None else None
+    if state is None:
+        state = IncrementalState.load(path)
+    if not state.bootstrapped:
+        if warm is not None and warm.history is not None:
+            state.known.update(canonical_job_key(job) for job in warm.history.jobs())
+        else:
+            from storage.history import open_history
+
+            store = open_history(config)
+            try:
+                state.known.update(canonical_job_key(job) for job in store.jobs())
+            finally:
+                store.close()
+        state.bootstrapped = True
+        logger.info(f"[LinkedIn] Incremental: seeded {len(state.known):,} known jobs from history")
+    return state
+
+
+def stream_linkedin(config: Dict[str, Any]) -> Generator[List[Job], None, Optional[IncrementalState]]:
+    """
+    Stable LinkedIn scraper (public HTML version)
+    - One search per (keyword, location) pair from
+      scrapers.linkedin.keywords × scrapers.linkedin.location_keywords
+    - Up to max_pages pages (25 results each) per search
+    - Extracts title, company, location, url, and posting age.
+    - Results are merged and deduplicated by LinkedIn job id / URL.
+    - Yields each page's new jobs as soon as it has been parsed.
+
+    Searches run concurrently and share one pooled keep-alive session and
+    one per-host politeness budget (kept across cycles by the daemon's
+    session pool). Tunables under config["scrapers"]["linkedin"]:
+    - max_pages             pages per search (default 8)
+    - query_workers         searches run at once (default 4)
+    - workers               page lookahead per search (default 4)
+    - max_in_flight         concurrent requests per host (default 2)
+    - min_request_interval  fastest spacing between request starts (default 0.4)
+    - request_jitter        extra random spacing, seconds (default 0.4)
+    - max_retries           retries per request on 429/5xx/network errors (default 3)
+    - backoff_base          first retry backoff, seconds; doubles per retry (default 1)
+    - circuit_failures      consecutive failures that pause the host (default 5)
+    - circuit_cooldown      seconds the host stays paused (default 60)
+    - request_timeout       per-request timeout, seconds (default 10)
+    - base_url              search endpoint (override for local testing)
+    - parser                HTML backend: auto|selectolax|lxml|bs4 (default auto)
+    - incremental           sort newest first and stop each search once it
+                            reaches jobs seen in earlier runs (default false)
+    - incremental_state     watermark/known-jobs file
+                            (default history/linkedin_incremental.json)
+    A search stops paginating at the first empty or failed page, or at the
+    first page made up only of jobs already seen in this run. Incremental
+    state can be inspected and reset with `python -m scrapers.incremental`.
+    It is returned (None when incremental mode is off) rather than saved,
+    so the caller can save it once the jobs are committed to history.
+
+    Result pages go through the conditional-request cache configured under
+    config["http_cache"] (see scrapers/http_cache.py); unchanged pages reuse
+    their previously parsed jobs.
+    """
 
-            posted_raw = None
-            if time_tag and time_tag.get_text(strip=True):
-                posted_raw = time_tag.get_text(strip=True)
-            elif listdate_tag and listdate_tag.get_text(strip=True):
-                posted_raw = listdate_tag.get_text(strip=True)
-            elif listdate_new_tag and listdate_new_tag.get_text(strip=True):
-                posted_raw = listdate_new_tag.get_text(strip=True)
-
-            days_since = _parse_posted_age(posted_raw)
-
-            title = title_tag.get_text(strip=True) if title_tag else ""
-            company = company_tag.get_text(strip=True) if company_tag else ""
-            location = location_tag.get_text(strip=True) if location_tag else ""
-            url = link_tag.get("href", "") if link_tag else ""
-
-            if url:
-                url = url.split("?")[0]
-
-            if title and url:
-                job: Dict[str, Any] = {
-                    "title": title,
-                    "company": company,
-                    "location": location,
-                    "url": url,
-                    "source": "linkedin",
-                }
-
-                # Add posting age info (optional but very nice to have)
-                if posted_raw:
-                    job["posted_age_raw"] = posted_raw
-                if days_since is not None:
-                    job["days_since_posted"] = days_since
+    li_cfg = config.get("scrapers", {}).get("linkedin", {})
+
+    queries = _plan_queries(li_cfg)
+
+    query_workers = int(li_cfg.get("query_workers", 4))
+
+    base_url = li_cfg.get("base_url", SEARCH_URL)
+    budget = shared_budget("linkedin", base_url, li_cfg)
+    cache = cache_from_config(config)
+    incremental = _load_incremental(config, li_cfg)
+    pages: "queue.Queue[List[Job]]" = queue.Queue()
 
-                all_jobs.append(job)
+    logger.info(f"[LinkedIn] Planned {len(queries)} searches.", extra={"source": "linkedin"})
 
-        time.sleep(random.uniform(0.4, 0.8))
+    with shared_session("linkedin", pool_size=budget.max_in_flight) as session:
+        ctx = _SearchContext(
+            session=session,
+            budget=budget,
+            backend=get_backend(li_cfg.get("parser", "auto")),
+            cache=cache,
+            merger=_JobMerger(pages),
+            base_url=base_url,
+            max_pages=int(li_cfg.get("max_pages", 8)),
+            workers=int(li_cfg.get("workers", 4)),
+            timeout=float(li_cfg.get("request_timeout", 10)),
+            incremental=incremental,
+        )
+        with ThreadPoolExecutor(max_workers=max(1, query_workers)) as pool:
+            futures = [pool.submit(_run_query, ctx, kw, loc) for kw, loc in queries]
+
+            while True:
+                try:
+                    yield pages.get(timeout=0.1)
+                except queue.Empty:
+                    if all(f.done() for f in futures) and pages.empty():
+                        break
+
+            for fut in futures:
+                fut.result()
+
+    if cache is not None:
+        cache.flush()
+        logger.info(f"[LinkedIn] HTTP cache: {cache.summary()}")
+    logger.info(f"[LinkedIn] Requests: {budget.summary()}")
+
+    if incremental is not None:
+        incremental.known.update(ctx.merger.keys())
+        marks = [incremental.watermarks.get(_query_label(kw, loc), {}) for kw, loc in queries]
+        stopped = sum(1 for m in marks if m.get("stopped_early"))
+        logger.info(
+            f"[LinkedIn] Incremental: {stopped}/{len(queries)} searches stopped at known jobs, "
+            f"{len(incremental.known):,} known"
+        )
+
+    logger.info(
+        f"[LinkedIn] Total deduped jobs: {ctx.merger.count}",
+        extra={"source": "linkedin", "jobs": ctx.merger.count},
+    )
+    return incremental
 
-    # Deduplicate
-    deduped = {
-        (j["title"], j["company"], j.get("location", ""), j["url"]): j for j in all_jobs
-    }
 
-    print(f"[LinkedIn] Total deduped jobs: {len(deduped)}")
+def scrape_linkedin(config: Dict[str, Any]) -> List[Job]:
+    """
+    List-returning wrapper around stream_linkedin() that saves the
+    incremental state straight away (there is no history to wait for).
+    """
+    jobs: List[Job] = []
+    pages = stream_linkedin(config)
+    try:
+        while True:
+            jobs.extend(next(pages))
+    except StopIteration as done:
+        if done.value is not None:
+            done.value.save()
+    return jobs
+
+
+def run(config: Dict[str, Any]) -> List[Job]:
+    """
+    Scraper contract entry point used by scrapers/registry.py.
+    """
+    return scrape_linkedin(config)
+
 
-    return list(deduped.values())
+def stream(config: Dict[str, Any]) -> Generator[List[Job], None, Optional[IncrementalState]]:
+    """
+    Streaming scraper contract entry point used by scrapers/registry.py.
+    """
+    return stream_linkedin(config)
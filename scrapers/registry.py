@@ -0,0 +1,227 @@
+# scrapers/registry.py
+
+from __future__ import annotations
+import importlib
+import logging
+import pkgutil
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Generator, Iterable, Iterator, List, Optional, Tuple
+
+from utils.config_loader import RuntimeConfig
+
+logger = logging.getLogger("jobsearch_agent")
+
+ScraperFn = Callable[[Dict[str, Any]], List[Dict[str, Any]]]
+StreamFn = Callable[[Dict[str, Any]], Iterator[List[Dict[str, Any]]]]
+
+DEFAULT_TIMEOUT_SECONDS = 600
+
+
+class SourceReport:
+    """
+    Outcome of one scraper run: how long it took and what it returned.
+    status is one of "ok", "error", "timeout". state is whatever a
+    successful stream() returned (e.g. incremental scraping state), to be
+    saved by commit_source_state() once the run's jobs are safely stored.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.status = "pending"
+        self.seconds = 0.0
+        self.jobs = 0
+        self.error: Optional[str] = None
+        self.state: Any = None
+
+    def __str__(self) -> str:
+        line = f"{self.name}: {self.status}, {self.jobs} jobs in {self.seconds:.1f}s"
+        if self.error:
+            line += f" ({self.error})"
+        return line
+
+
+def source_name(module: Any) -> str:
+    """
+    Config key for a scraper module: its SOURCE_NAME attribute, or the
+    module name without a trailing "_scraper" (linkedin_scraper -> linkedin).
+    """
+    name = getattr(module, "SOURCE_NAME", None)
+    if name:
+        return name
+    short = module.__name__.rsplit(".", 1)[-1]
+    return short[: -len("_scraper")] if short.endswith("_scraper") else short
+
+
+class Scraper:
+    """
+    A discovered scraper module: its run(config) -> List[dict], and its
+    optional stream(config) -> Iterator[List[dict]] that yields batches
+    (e.g. one per results page) as they become available. A stream may
+    return state with a save() method; see SourceReport.state.
+    """
+
+    def __init__(self, name: str, run: ScraperFn, stream: Optional[StreamFn] = None):
+        self.name = name
+        self.run = run
+        self.stream = stream
+
+    def batches(self, config: Dict[str, Any]) -> Generator[List[Dict[str, Any]], None, Any]:
+        if self.stream is not None:
+            return (yield from self.stream(config))
+        yield self.run(config)
+        return None
+
+
+def discover_scrapers() -> Dict[str, Scraper]:
+    """
+    Import every module in scrapers/ and collect the ones that implement
+    the scraper contract, a module-level run(config) -> List[dict].
+    """
+    found: Dict[str, Scraper] = {}
+    pkg_dir = Path(__file__).parent
+
+    for info in pkgutil.iter_modules([str(pkg_dir)]):
+        if info.ispkg or info.name == "registry":
+            continue
+        try:
+            module = importlib.import_module(f"scrapers.{info.name}")
+        except Exception as e:
+            logger.warning(f"Skipping scraper module {info.name}: {e}")
+            continue
+
+        run = getattr(module, "run", None)
+        if callable(run):
+            name = source_name(module)
+            stream = getattr(module, "stream", None)
+            found[name] = Scraper(name, run, stream if callable(stream) else None)
+
+    return found
+
+
+def enabled_scrapers(config: Dict[str, Any]) -> Dict[str, Scraper]:
+    """
+    Discovered scrapers that have a section under config["scrapers"]
+    whose "enabled" flag isn't false.
+    """
+    enabled = RuntimeConfig.of(config).enabled_scrapers
+    return {name: scraper for name, scraper in discover_scrapers().items() if name in enabled}
+
+
+class _Done:
+    """
+    End-of-source marker pushed by _drive().
+    """
+
+    def __init__(self, seconds: float, error: Optional[BaseException], state: Any = None):
+        self.seconds = seconds
+        self.error = error
+        self.state = state
+
+
+def _drive(scraper: Scraper, config: Dict[str, Any], out: "queue.Queue[Tuple[str, Any]]") -> None:
+    """
+    Worker body: push each batch onto `out`, then a final _Done marker
+    carrying what the scraper returned.
+    """
+    start = time.perf_counter()
+    error: Optional[BaseException] = None
+    state: Any = None
+    batches = scraper.batches(config)
+    try:
+        while True:
+            out.put((scraper.name, next(batches)))
+    except StopIteration as done:
+        state = done.value
+    except Exception as e:
+        error = e
+    out.put((scraper.name, _Done(time.perf_counter() - start, error, state)))
+
+
+def run_scrapers(
+    config: Dict[str, Any],
+    reports: Optional[List[SourceReport]] = None,
+    scrapers: Optional[Dict[str, Any]] = None,
+) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+    """
+    Run every enabled scraper concurrently and yield (source, jobs) batches
+    as they arrive, so processing overlaps with the remaining network I/O.
+    Scrapers with a stream() entry point yield one batch per page; the
+    others yield their whole result once run() returns.
+
+    Each source gets config["scrapers"][name]["timeout_seconds"]
+    (default 600). A source that errors or overruns is reported and the
+    rest of its output dropped; an overrunning thread is abandoned, not killed.
+    If `reports` is given, one SourceReport per source is appended to it.
+    `scrapers` maps names to Scraper objects or plain run() callables.
+    """
+    if scrapers is None:
+        scrapers = enabled_scrapers(config)
+    if reports is None:
+        reports = []
+    if not scrapers:
+        return
+
+    sections = config.get("scrapers", {})
+    out: "queue.Queue[Tuple[str, Any]]" = queue.Queue()
+    pool = ThreadPoolExecutor(max_workers=len(scrapers), thread_name_prefix="scraper")
+
+    pending: Dict[str, SourceReport] = {}
+    deadlines: Dict[str, float] = {}
+    started = time.monotonic()
+
+    for name, scraper in scrapers.items():
+        if not isinstance(scraper, Scraper):
+            scraper = Scraper(name, scraper)
+        report = SourceReport(name)
+        reports.append(report)
+        pending[name] = report
+        timeout = float(sections.get(name, {}).get("timeout_seconds", DEFAULT_TIMEOUT_SECONDS))
+        deadlines[name] = started + timeout
+        pool.submit(_drive, scraper, config, out)
+
+    try:
+        while pending:
+            wait_for = max(0.0, min(deadlines[n] for n in pending) - time.monotonic())
+            try:
+                name, item = out.get(timeout=wait_for)
+            except queue.Empty:
+                name, item = None, None
+
+            if name in pending:
+                report = pending[name]
+                if isinstance(item, _Done):
+                    del pending[name]
+                    report.seconds = item.seconds
+                    if item.error is not None:
+                        report.status = "error"
+                        report.error = str(item.error)
+                        logger.error(f"Scraper {name} failed: {item.error}")
+                    else:
+                        report.status = "ok"
+                        report.state = item.state
+                else:
+                    report.jobs += len(item)
+                    yield name, item
+
+            now = time.monotonic()
+            for name in [n for n in pending if deadlines[n] <= now]:
+                report = pending.pop(name)
+                report.status = "timeout"
+                report.seconds = now - started
+                logger.error(f"Scraper {name} timed out after {report.seconds:.0f}s")
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def commit_source_state(reports: Iterable[SourceReport]) -> None:
+    """
+    Save the state returned by each source that finished. Call it only
+    after the jobs of the run are stored, so a failed run leaves the
+    state as it was and the next run sees those jobs again.
+    """
+    for report in reports:
+        if report.state is not None:
+            report.state.save()
@@ -0,0 +1,137 @@
+# storage/history.py
+
+"""
+Job history backends.
+
+Every backend exposes the same small interface used by run_agent:
+
+    store.index      mapping of dedupe key -> job, with .get() and [key] = job;
+                     passed straight to processor.dedupe.iter_dedupe_jobs
+    len(store)       number of tracked jobs
+    store.jobs()     iterate every tracked job
+    store.commit()   persist this run's changes
+    store.discard()  drop this run's uncommitted changes (after a failed run)
+    store.compact()  reclaim space / fold logs (python run_agent.py history compact)
+    store.close()
+
+Backends (config["history"]["backend"]):
+    "sqlite"   indexed SQLite store, history/jobs.db (default)
+    "journal"  append-only journal + compacted snapshot, history/journal/
+    "json"     the original whole-file history/job_history.json
+"""
+
+from __future__ import annotations
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+from processor.dedupe import index_history
+from processor.job import Job, as_dict
+
+DEFAULT_JSON_PATH = Path("history/job_history.json")
+DEFAULT_SQLITE_PATH = Path("history/jobs.db")
+
+
+def load_json_history(path: Path) -> List[Dict[str, Any]]:
+    """
+    Read a JSON history file. Accepts both the plain list written by
+    run_agent and the {"jobs": [...]} format of output/history_tracker.py.
+    Missing or unreadable files count as empty history.
+    """
+    if not path.exists():
+        return []
+    try:
+        data = json.loads(path.read_text())
+    except Exception:
+        return []
+    if isinstance(data, dict):
+        data = data.get("jobs", [])
+    return data if isinstance(data, list) else []
+
+
+def save_json_history(path: Path, history: List[Dict[str, Any]]) -> None:
+    # Ensure the directory exists
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps([as_dict(j) for j in history], indent=2))
+
+
+class JsonHistoryStore:
+    """
+    Whole-file JSON history: loaded fully on open (as Job records, with
+    their keys precomputed), rewritten on commit.
+    """
+
+    def __init__(self, path: Path = DEFAULT_JSON_PATH):
+        self.path = Path(path)
+        self.index = index_history(Job.from_dict(j) for j in load_json_history(self.path))
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def jobs(self) -> Iterator[Dict[str, Any]]:
+        return iter(list(self.index.values()))
+
+    def commit(self) -> None:
+        save_json_history(self.path, list(self.index.values()))
+
+    def discard(self) -> None:
+        # The index is updated in place, so go back to the last commit
+        self.index = index_history(Job.from_dict(j) for j in load_json_history(self.path))
+
+    def compact(self) -> None:
+        self.commit()
+
+    def close(self) -> None:
+        pass
+
+
+def history_location(config: Dict[str, Any]) -> Tuple[str, Path]:
+    """
+    The configured history backend and the file (or directory) it uses.
+    """
+    from storage.journal_store import DEFAULT_JOURNAL_DIR
+
+    cfg = config.get("history", {})
+    backend = cfg.get("backend", "sqlite")
+    default = {"json": DEFAULT_JSON_PATH, "journal": DEFAULT_JOURNAL_DIR}.get(backend, DEFAULT_SQLITE_PATH)
+    return backend, Path(cfg.get("path", default))
+
+
+def open_history(config: Dict[str, Any]) -> Any:
+    """
+    Open the history backend selected by config["history"]:
+
+        "history": {"backend": "sqlite", "path": "history/jobs.db"}
+
+    A new SQLite or journal store is seeded once from an existing
+    history/job_history.json.
+    """
+    cfg = config.get("history", {})
+    backend = cfg.get("backend", "sqlite")
+
+    if backend == "json":
+        return JsonHistoryStore(Path(cfg.get("path", DEFAULT_JSON_PATH)))
+
+    if backend == "sqlite":
+        from storage.sqlite_store import SqliteJobStore
+
+        path = Path(cfg.get("path", DEFAULT_SQLITE_PATH))
+        is_new = not path.exists()
+        store = SqliteJobStore(path)
+    elif backend == "journal":
+        from storage.journal_store import DEFAULT_COMPACT_BYTES, DEFAULT_JOURNAL_DIR, JournalHistoryStore
+
+        path = Path(cfg.get("path", DEFAULT_JOURNAL_DIR))
+        is_new = not path.exists()
+        compact_mb = cfg.get("compact_after_mb")
+        store = JournalHistoryStore(
+            path,
+            compact_bytes=int(compact_mb * 1024 * 1024) if compact_mb else DEFAULT_COMPACT_BYTES,
+        )
+    else:
+        raise ValueError(f"Unknown history backend: {backend!r}")
+
+    legacy = Path(cfg.get("migrate_from", DEFAULT_JSON_PATH))
+    if is_new and legacy.exists():
+        store.import_jobs(load_json_history(legacy))
+    return store
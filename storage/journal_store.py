@@ -0,0 +1,414 @@
+# storage/journal_store.py
+
+"""
+Append-only, crash-safe job history: a JSONL journal of per-run deltas
+on top of a periodically compacted, memory-mapped snapshot.
+
+Layout (history/journal/ by default):
+
+    snapshot-<seq>.bin  header | job JSON lines | sorted (key hash, offset) table
+    journal.jsonl       one line per run: {"seq", "ts", "put": [jobs], "del": [keys]}
+
+Opening the store maps the snapshot and replays only the journal, so
+startup cost depends on the activity since the last compaction, not on
+history size. Each commit() appends one line with a single write() and
+fsyncs it; a torn last line (crash mid-write) is dropped on replay.
+
+Once the journal grows past a threshold, compaction runs in a background
+thread: it merges snapshot + journal into a new snapshot (atomic rename)
+and then drops the journal records it absorbed. Records carry a sequence
+number and the snapshot records the last one it contains, so a crash
+between those two steps replays nothing twice.
+"""
+
+from __future__ import annotations
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from array import array
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from processor.dedupe import DedupeKey, dedupe_key
+from processor.job import as_dict
+
+DEFAULT_JOURNAL_DIR = Path("history/journal")
+DEFAULT_COMPACT_BYTES = 8 * 1024 * 1024
+
+_MAGIC = b"JHS1"
+_HEADER = struct.Struct("<4sQQQ")  # magic, count, last_seq, table offset
+_ENTRY = struct.Struct("<QQ")  # key hash, record offset
+
+
+def _key_hash(key: DedupeKey) -> int:
+    raw = "\x1f".join(key).encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(raw, digest_size=8).digest(), "little")
+
+
+def _fsync_dir(path: Path) -> None:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:  # not supported on Windows
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class _Snapshot:
+    """
+    Read-only, memory-mapped view of one snapshot file. Lookups binary-search
+    the hash table, so nothing is parsed up front.
+    """
+
+    def __init__(self, path: Path):
+        self.count = 0
+        self.last_seq = 0
+        self._mm: Optional[mmap.mmap] = None
+        self._table = 0
+
+        if not path.exists() or path.stat().st_size < _HEADER.size:
+            return
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, self.last_seq, self._table = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not a job history snapshot")
+
+    def _entry(self, i: int) -> Tuple[int, int]:
+        return _ENTRY.unpack_from(self._mm, self._table + i * _ENTRY.size)
+
+    def _record(self, offset: int) -> Dict[str, Any]:
+        end = self._mm.find(b"\n", offset)
+        return json.loads(self._mm[offset:end])
+
+    def get(self, key: DedupeKey) -> Optional[Dict[str, Any]]:
+        if not self.count:
+            return None
+        h = _key_hash(key)
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._entry(mid)[0] < h:
+                lo = mid + 1
+            else:
+                hi = mid
+        # Walk the (almost always single) run of equal hashes
+        while lo < self.count:
+            eh, offset = self._entry(lo)
+            if eh != h:
+                break
+            job = self._record(offset)
+            if dedupe_key(job) == key:
+                return job
+            lo += 1
+        return None
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        if not self.count:
+            return
+        pos = _HEADER.size
+        while pos < self._table:
+            end = self._mm.find(b"\n", pos)
+            yield json.loads(self._mm[pos:end])
+            pos = end + 1
+
+
+def write_snapshot(path: Path, jobs: Iterable[Dict[str, Any]], last_seq: int) -> int:
+    """
+    Atomically write a snapshot of `jobs` (unique by dedupe key).
+    Returns the number of jobs written.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    hashes = array("Q")
+    offsets = array("Q")
+
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, 0, 0, 0))
+            pos = _HEADER.size
+            for job in jobs:
+                line = json.dumps(as_dict(job), separators=(",", ":")).encode("utf-8") + b"\n"
+                hashes.append(_key_hash(dedupe_key(job)))
+                offsets.append(pos)
+                f.write(line)
+                pos += len(line)
+
+            table = pos
+            for i in sorted(range(len(hashes)), key=hashes.__getitem__):
+                f.write(_ENTRY.pack(hashes[i], offsets[i]))
+
+            f.seek(0)
+            f.write(_HEADER.pack(_MAGIC, len(hashes), last_seq, table))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    _fsync_dir(path.parent)
+    return len(hashes)
+
+
+class _JournalIndex:
+    """
+    Mapping view for iter_dedupe_jobs: replayed journal entries first,
+    then the snapshot. Assignments are buffered until commit().
+    """
+
+    def __init__(self, store: "JournalHistoryStore"):
+        self._store = store
+
+    def get(self, key: DedupeKey, default: Any = None) -> Optional[Dict[str, Any]]:
+        found = self._store.get(key)
+        return default if found is None else found
+
+    def __getitem__(self, key: DedupeKey) -> Dict[str, Any]:
+        found = self._store.get(key)
+        if found is None:
+            raise KeyError(key)
+        return found
+
+    def __contains__(self, key: DedupeKey) -> bool:
+        return self._store.get(key) is not None
+
+    def __setitem__(self, key: DedupeKey, job: Dict[str, Any]) -> None:
+        self._store.put(job)
+
+    def __delitem__(self, key: DedupeKey) -> None:
+        self._store.remove(key)
+
+
+class JournalHistoryStore:
+    def __init__(self, directory: Path = DEFAULT_JOURNAL_DIR, compact_bytes: int = DEFAULT_COMPACT_BYTES):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.journal_path = self.directory / "journal.jsonl"
+        self.compact_bytes = compact_bytes
+
+        self._lock = threading.RLock()
+        self._compactor: Optional[threading.Thread] = None
+        self._snapshot = _Snapshot(self._latest_snapshot())
+        self._seq = self._snapshot.last_seq
+        self._count = self._snapshot.count
+
+        # Replayed journal state: key -> job, or None for a removal
+        self._overlay: Dict[DedupeKey, Optional[Dict[str, Any]]] = {}
+        # This run's changes, not yet appended
+        self._pending: Dict[DedupeKey, Optional[Dict[str, Any]]] = {}
+        self._replay()
+
+        self.index = _JournalIndex(self)
+
+    def _snapshot_paths(self) -> List[Path]:
+        return sorted(self.directory.glob("snapshot-*.bin"))
+
+    def _latest_snapshot(self) -> Path:
+        paths = self._snapshot_paths()
+        return paths[-1] if paths else self.directory / "snapshot-000000000000.bin"
+
+    # ----- replay ---------------------------------------------------------
+
+    def _replay(self) -> None:
+        if not self.journal_path.exists():
+            return
+        with open(self.journal_path, "rb") as f:
+            data = f.read()
+
+        good = 0
+        for line in data.splitlines(keepends=True):
+            if not line.endswith(b"\n"):
+                break  # torn write from a crash: dropped
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            good += len(line)
+            if record["seq"] <= self._snapshot.last_seq:
+                continue  # already compacted into the snapshot
+            self._apply(record)
+            self._seq = record["seq"]
+
+        if good < len(data):
+            with open(self.journal_path, "r+b") as f:
+                f.truncate(good)
+                os.fsync(f.fileno())
+
+    def _apply(self, record: Dict[str, Any]) -> None:
+        for job in record.get("put", ()):
+            key = dedupe_key(job)
+            if self._lookup(key) is None:
+                self._count += 1
+            self._overlay[key] = job
+        for raw in record.get("del", ()):
+            key = tuple(raw)
+            if self._lookup(key) is not None:
+                self._count -= 1
+            self._overlay[key] = None
+
+    # ----- reads ----------------------------------------------------------
+
+    def _lookup(self, key: DedupeKey) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if key in self._overlay:
+                return self._overlay[key]
+            return self._snapshot.get(key)
+
+    def get(self, key: DedupeKey) -> Optional[Dict[str, Any]]:
+        if key in self._pending:
+            return self._pending[key]
+        return self._lookup(key)
+
+    def __len__(self) -> int:
+        n = self._count
+        for key, job in self._pending.items():
+            existed = self._lookup(key) is not None
+            n += (job is not None) - existed
+        return n
+
+    def jobs(self) -> Iterator[Dict[str, Any]]:
+        with self._lock:
+            snapshot = self._snapshot
+            changed = {**self._overlay, **self._pending}
+        for job in snapshot:
+            if dedupe_key(job) not in changed:
+                yield job
+        for job in changed.values():
+            if job is not None:
+                yield job
+
+    # ----- writes ---------------------------------------------------------
+
+    def put(self, job: Dict[str, Any]) -> None:
+        self._pending[dedupe_key(job)] = job
+
+    def remove(self, key: DedupeKey) -> None:
+        self._pending[tuple(key)] = None
+
+    def import_jobs(self, jobs: Iterable[Dict[str, Any]]) -> int:
+        """
+        Bulk load (e.g. from the old JSON history), compacted straight
+        into a snapshot.
+        """
+        n = 0
+        for job in jobs:
+            self.put(job)
+            n += 1
+        self.commit(compact=False)
+        self.wait()
+        self.compact()
+        return n
+
+    def commit(self, compact: bool = True) -> None:
+        """
+        Append this run's changes as one journal record (fsync'd), then
+        start background compaction if the journal is over the threshold.
+        """
+        if self._pending:
+            record = {
+                "seq": 0,
+                "ts": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "put": [as_dict(j) for j in self._pending.values() if j is not None],
+                "del": [list(k) for k, j in self._pending.items() if j is None],
+            }
+            with self._lock:
+                record["seq"] = self._seq + 1
+                line = json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n"
+                fd = os.open(self.journal_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    os.write(fd, line)
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+                self._seq += 1
+                self._apply(record)
+            self._pending.clear()
+
+        if compact and self.journal_path.exists() and self.journal_path.stat().st_size > self.compact_bytes:
+            self.compact_in_background()
+
+    def discard(self) -> None:
+        """
+        Drop this run's changes without appending them.
+        """
+        self._pending.clear()
+
+    # ----- compaction -----------------------------------------------------
+
+    def compact(self) -> None:
+        """
+        Fold the journal into a new snapshot. Only the final swap holds
+        the lock, so runs can keep reading and committing meanwhile.
+        """
+        with self._lock:
+            seq = self._seq
+            absorbed = dict(self._overlay)
+            snapshot = self._snapshot
+        if seq == snapshot.last_seq:
+            return
+
+        base = (j for j in snapshot if dedupe_key(j) not in absorbed)
+        live = [j for j in absorbed.values() if j is not None]
+        path = self.directory / f"snapshot-{seq:012d}.bin"
+        write_snapshot(path, _chain(base, live), seq)
+
+        with self._lock:
+            self._snapshot = _Snapshot(path)
+            for key, job in absorbed.items():
+                if key in self._overlay and self._overlay[key] is job:
+                    del self._overlay[key]
+            self._rewrite_journal(after=seq)
+
+        # Old snapshots may still be mapped by a reader (or locked on Windows)
+        for old in self._snapshot_paths():
+            if old != path:
+                try:
+                    old.unlink()
+                except OSError:
+                    pass
+
+    def _rewrite_journal(self, after: int) -> None:
+        """
+        Drop journal records with seq <= `after` (caller holds the lock).
+        """
+        if not self.journal_path.exists():
+            return
+        with open(self.journal_path, "rb") as f:
+            keep = [line for line in f if json.loads(line)["seq"] > after]
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.writelines(keep)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.journal_path)
+        _fsync_dir(self.directory)
+
+    def compact_in_background(self) -> None:
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        self._compactor = threading.Thread(target=self.compact, name="history-compactor", daemon=True)
+        self._compactor.start()
+
+    def wait(self) -> None:
+        """
+        Block until a running background compaction finishes.
+        """
+        if self._compactor is not None:
+            self._compactor.join()
+            self._compactor = None
+
+    def close(self) -> None:
+        self.wait()
+
+
+def _chain(*iterables: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    for it in iterables:
+        yield from it
@@ -0,0 +1,59 @@
+# storage/migrate.py
+
+"""
+One-shot migration of JSON job history into the SQLite job store.
+
+Accepts both history/job_history.json (a plain list, written by
+run_agent) and the {"jobs": [...]} format of output/history_tracker.py.
+
+Usage (from the repo root):
+    python -m storage.migrate [--json history/job_history.json] [--db history/jobs.db]
+"""
+
+from __future__ import annotations
+import argparse
+import logging
+import sys
+from pathlib import Path
+from typing import List
+
+from storage.history import DEFAULT_JSON_PATH, DEFAULT_SQLITE_PATH, load_json_history
+from storage.sqlite_store import SqliteJobStore
+from utils.logger import init_logger
+
+logger = logging.getLogger("jobsearch_agent")
+
+
+def migrate_json_to_sqlite(json_path: Path, db_path: Path) -> int:
+    """
+    Upsert every job from `json_path` into the store at `db_path`.
+    Safe to re-run: jobs are keyed by their dedupe key.
+    Returns the number of jobs read.
+    """
+    jobs = load_json_history(Path(json_path))
+    store = SqliteJobStore(Path(db_path))
+    try:
+        return store.import_jobs(jobs)
+    finally:
+        store.close()
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--json", type=Path, action="append", help="JSON history file (repeatable)")
+    ap.add_argument("--db", type=Path, default=DEFAULT_SQLITE_PATH)
+    args = ap.parse_args(argv)
+    init_logger()
+
+    for path in args.json or [DEFAULT_JSON_PATH]:
+        if not path.exists():
+            logger.warning(f"[Migrate] {path} not found — skipping.")
+            continue
+        n = migrate_json_to_sqlite(path, args.db)
+        logger.info(f"[Migrate] {path}: {n} jobs → {args.db}", extra={"jobs": n})
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
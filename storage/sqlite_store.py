@@ -0,0 +1,200 @@
+# storage/sqlite_store.py
+
+"""
+Indexed SQLite job store (WAL mode).
+
+One row per tracked job, keyed by the processor.dedupe key, with an index
+on the canonical URL and first_seen/last_seen timestamps. Dedupe looks
+jobs up by key instead of loading history into memory. All of a run's
+writes are buffered and applied as one batched upsert in one transaction
+on commit(), so a crash mid-run leaves the previous state intact.
+"""
+
+from __future__ import annotations
+import json
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from processor.dedupe import DedupeKey, dedupe_key
+from processor.job import as_dict, canonical_url
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id            INTEGER PRIMARY KEY,
+    dedupe_key    TEXT NOT NULL UNIQUE,
+    canonical_url TEXT,
+    data          TEXT NOT NULL,
+    first_seen    TEXT NOT NULL,
+    last_seen     TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_canonical_url ON jobs (canonical_url);
+CREATE INDEX IF NOT EXISTS idx_jobs_last_seen ON jobs (last_seen);
+"""
+
+_UPSERT = """
+INSERT INTO jobs (dedupe_key, canonical_url, data, first_seen, last_seen)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (dedupe_key) DO UPDATE SET
+    canonical_url = excluded.canonical_url,
+    data          = excluded.data,
+    last_seen     = excluded.last_seen
+"""
+
+_KEY_SEP = "\x1f"
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _key_str(key: DedupeKey) -> str:
+    return _KEY_SEP.join(key)
+
+
+class _StoreIndex:
+    """
+    Mapping view over the store for iter_dedupe_jobs: get() is an indexed
+    lookup, assignment is buffered until SqliteJobStore.commit().
+    Every key looked up counts as "seen this run" for last_seen.
+    """
+
+    def __init__(self, store: "SqliteJobStore"):
+        self._store = store
+        self.pending: Dict[str, Dict[str, Any]] = {}
+        self.seen: set = set()
+
+    def get(self, key: DedupeKey, default: Any = None) -> Optional[Dict[str, Any]]:
+        k = _key_str(key)
+        self.seen.add(k)
+        if k in self.pending:
+            return self.pending[k]
+        found = self._store.get(k)
+        return default if found is None else found
+
+    def __getitem__(self, key: DedupeKey) -> Dict[str, Any]:
+        found = self.get(key)
+        if found is None:
+            raise KeyError(key)
+        return found
+
+    def __contains__(self, key: DedupeKey) -> bool:
+        return self.get(key) is not None
+
+    def __setitem__(self, key: DedupeKey, job: Dict[str, Any]) -> None:
+        self.pending[_key_str(key)] = job
+
+
+class SqliteJobStore:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._lock = threading.Lock()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self.index = _StoreIndex(self)
+
+    # ----- reads ----------------------------------------------------------
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM jobs WHERE dedupe_key = ?", (key,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def find_by_url(self, url: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM jobs WHERE canonical_url = ? LIMIT 1", (canonical_url(url),)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def __len__(self) -> int:
+        with self._lock:
+            (n,) = self._conn.execute("SELECT COUNT(*) FROM jobs").fetchone()
+        return n + sum(1 for k in self.index.pending if self.get(k) is None)
+
+    def jobs(self) -> Iterator[Dict[str, Any]]:
+        cur = self._conn.cursor()
+        cur.execute("SELECT data FROM jobs ORDER BY id")
+        for (data,) in cur:
+            yield json.loads(data)
+
+    def timestamps(self, key: DedupeKey) -> Optional[Tuple[str, str]]:
+        """
+        (first_seen, last_seen) for a job, or None if it isn't tracked.
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT first_seen, last_seen FROM jobs WHERE dedupe_key = ?", (_key_str(key),)
+            ).fetchone()
+
+    # ----- writes ---------------------------------------------------------
+
+    def upsert_many(self, jobs: Iterable[Dict[str, Any]], seen_at: Optional[str] = None) -> int:
+        """
+        Insert or update jobs in one transaction. first_seen is kept for
+        existing rows; last_seen is set to `seen_at` (default: now).
+        """
+        seen_at = seen_at or _now()
+        rows = [
+            (
+                _key_str(dedupe_key(job)),
+                canonical_url(job.get("url", "")),
+                json.dumps(as_dict(job)),
+                seen_at,
+                seen_at,
+            )
+            for job in jobs
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(_UPSERT, rows)
+        return len(rows)
+
+    def import_jobs(self, jobs: Iterable[Dict[str, Any]]) -> int:
+        """
+        One-shot bulk load (e.g. from the old JSON history).
+        """
+        return self.upsert_many(jobs)
+
+    def commit(self) -> None:
+        """
+        Apply this run's buffered upserts and last_seen bumps atomically.
+        """
+        seen_at = _now()
+        pending = self.index.pending
+        rows = [
+            (k, canonical_url(job.get("url", "")), json.dumps(as_dict(job)), seen_at, seen_at)
+            for k, job in pending.items()
+        ]
+        touched = [(seen_at, k) for k in self.index.seen if k not in pending]
+
+        with self._lock, self._conn:
+            self._conn.executemany(_UPSERT, rows)
+            self._conn.executemany("UPDATE jobs SET last_seen = ? WHERE dedupe_key = ?", touched)
+
+        pending.clear()
+        self.index.seen.clear()
+
+    def discard(self) -> None:
+        """
+        Drop the buffered upserts and last_seen bumps of a failed run.
+        """
+        self.index.pending.clear()
+        self.index.seen.clear()
+
+    def compact(self) -> None:
+        """
+        Fold the WAL into the database and rebuild it without free pages.
+        """
+        with self._lock:
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._conn.execute("VACUUM")
+
+    def close(self) -> None:
+        self._conn.close()
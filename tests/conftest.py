@@ -0,0 +1,7 @@
+# tests/conftest.py
+
+import sys
+from pathlib import Path
+
+# Tests import the agent's packages from the repo root, as run_agent.py does
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
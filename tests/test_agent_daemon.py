@@ -0,0 +1,77 @@
+# tests/test_agent_daemon.py
+
+import json
+import logging
+import os
+
+import pytest
+
+import agent_daemon
+from agent_daemon import AgentDaemon
+from processor.dedupe import iter_dedupe_jobs
+from processor.near_dupes import iter_tag_clusters
+from run_agent import NEAR_DUPES_PATH
+from storage.history import open_history
+from utils.logger import LOGGER_NAME, stop_logging
+
+JOB = {"title": "Data Engineer", "company": "Acme", "location": "Remote", "url": "https://example.com/jobs/1"}
+
+
+@pytest.fixture
+def write_config(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / "config" / "config.json"
+    path.parent.mkdir()
+
+    def write(config):
+        mtime = path.stat().st_mtime if path.exists() else 0
+        path.write_text(json.dumps(config))
+        os.utime(path, (mtime + 10, mtime + 10))
+        return path
+
+    yield write
+    stop_logging()
+    logging.getLogger(LOGGER_NAME).handlers.clear()
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "journal", "json"])
+def test_failed_cycle_is_discarded(write_config, monkeypatch, backend):
+    config = {"scrapers": {}, "history": {"backend": backend}}
+    daemon = AgentDaemon(write_config(config))
+
+    def failing_cycle(config, store, near_dupes, scrapers, **kwargs):
+        assert len(list(iter_dedupe_jobs(iter_tag_clusters([dict(JOB)], near_dupes), store.index))) == 1
+        raise RuntimeError("digest failed")
+
+    monkeypatch.setattr(agent_daemon, "run_cycle", failing_cycle)
+    daemon.scrapers = {"fake": None}
+    daemon.next_due = {"fake": 0.0}
+    daemon.run_once()
+
+    # Nothing of the failed cycle survives in memory ...
+    assert len(daemon.store) == 0
+    assert len(daemon.near_dupes) == 0
+    assert daemon.near_dupes.query(JOB) is None
+
+    # ... or reaches disk with a later commit
+    daemon.store.commit()
+    daemon.near_dupes.save(NEAR_DUPES_PATH)
+    daemon.store.close()
+    store = open_history(config)
+    assert len(store) == 0
+    store.close()
+    assert len(list(iter_dedupe_jobs(iter_tag_clusters([dict(JOB)], daemon.near_dupes), {}))) == 1
+
+
+def test_logging_changes_apply_on_reload(write_config):
+    config = {"scrapers": {}, "history": {"backend": "json"}, "logging": {"dir": "logs"}}
+    daemon = AgentDaemon(write_config(config))
+
+    write_config({**config, "logging": {"dir": "other-logs", "level": "WARNING"}})
+    assert daemon.reload_if_changed()
+
+    logger = logging.getLogger(LOGGER_NAME)
+    assert logger.level == logging.WARNING
+    logger.warning("after reload")
+    stop_logging()
+    assert "after reload" in (daemon.config_path.parent.parent / "other-logs" / "agent.log").read_text()
@@ -0,0 +1,18 @@
+# tests/test_card_parsing.py
+
+import pytest
+
+from benchmarks.bench_card_parsing import FIXTURES, _legacy_parse_cards
+from scrapers.linkedin_scraper import _parse_cards
+from utils.html_backend import available_backends, get_backend
+
+PAGES = sorted(FIXTURES.glob("linkedin_*.html"))
+
+
+@pytest.mark.parametrize("backend", available_backends())
+@pytest.mark.parametrize("page", PAGES, ids=lambda p: p.stem)
+def test_backend_matches_legacy_parser(backend, page):
+    html = page.read_text(encoding="utf-8")
+    reference = _legacy_parse_cards(html)
+    assert reference
+    assert [dict(job) for job in _parse_cards(html, get_backend(backend))] == reference
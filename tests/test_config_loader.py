@@ -0,0 +1,41 @@
+# tests/test_config_loader.py
+
+import json
+
+import pytest
+
+from processor.filters import filter_jobs
+from utils.config_loader import ConfigError, RuntimeConfig, load_config
+
+JOBS = [
+    {"title": "Data Engineer", "location": "Remote", "days_since_posted": 1},
+    {"title": "Data Engineer", "location": "Berlin", "days_since_posted": 1},
+    {"title": "Designer", "location": "Remote", "days_since_posted": 1},
+]
+
+
+def test_partial_dict_is_not_schema_checked():
+    config = {
+        "scrapers": {"linkedin": {"keywords": ["engineer"], "location_keywords": ["remote"]}},
+        "notes": "not a known section",
+    }
+
+    assert filter_jobs(JOBS, config) == JOBS[:1]
+
+
+def test_plain_dict_is_built_once():
+    config = {"scrapers": {"linkedin": {"keywords": ["engineer"]}}}
+
+    rc = RuntimeConfig.of(config)
+
+    assert RuntimeConfig.of(config) is rc
+    assert RuntimeConfig.of(dict(config)) is not rc
+    assert RuntimeConfig.of(rc) is rc
+
+
+def test_config_file_is_still_validated(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"scrapers": {"linkedin": {"keyword": ["engineer"]}}}))
+
+    with pytest.raises(ConfigError, match="did you mean"):
+        load_config(path)
@@ -0,0 +1,24 @@
+# tests/test_digest_builder.py
+
+from output.digest_builder import LineCache, build_digest
+
+JOBS = [
+    {"title": f"Engineer {i}", "company": "Acme", "location": "Remote", "url": f"https://example.com/jobs/{i}", "job_id": str(i)}
+    for i in range(3)
+]
+
+
+def build(tmp_path, name, cache=None):
+    paths = [tmp_path / f"{name}.md", tmp_path / f"{name}.html", tmp_path / f"{name}.json"]
+    build_digest(JOBS, JOBS, len(JOBS), paths[0], paths[1:], cache=cache, config_version="v1")
+    return [p.read_text() for p in paths]
+
+
+def test_cached_lines_match_a_build_without_cache(tmp_path):
+    cache = LineCache()
+    expected = build(tmp_path, "plain")
+
+    assert build(tmp_path, "cold", cache) == expected
+    assert (cache.misses, cache.hits) == (6, 0)
+    assert build(tmp_path, "warm", cache) == expected
+    assert (cache.misses, cache.hits) == (0, 6)
@@ -0,0 +1,236 @@
+# tests/test_fetcher.py
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import storage.history
+from scrapers.fetcher import SessionPool, budget_settings, keep_sessions_warm
+from scrapers.incremental import IncrementalState, WarmStates, keep_states_warm
+from scrapers.linkedin_scraper import canonical_job_key, scrape_linkedin, stream_linkedin
+
+CARD = (
+    '<div class="base-card">'
+    '<a class="base-card__full-link" href="https://www.linkedin.com/jobs/view/engineer-at-acme-{n}"></a>'
+    '<h3 class="base-search-card__title">Engineer {n}</h3>'
+    '<h4 class="base-search-card__subtitle">Acme</h4>'
+    '<span class="job-search-card__location">Remote</span>'
+    "<time>1 day ago</time></div>"
+)
+PAGE = ("<html><body>" + "".join(CARD.format(n=3800000000 + i) for i in range(5)) + "</body></html>").encode()
+
+
+class FakeLinkedIn(BaseHTTPRequestHandler):
+    """
+    Search endpoint that answers with `script` — (status, headers) pairs
+    consumed one per request — and then with a results page, or with
+    `fallback` forever when that is set.
+    """
+
+    script = []
+    fallback = None
+    hits = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        FakeLinkedIn.hits.append(time.monotonic())
+        step = self.script.pop(0) if self.script else self.fallback
+        if step is not None:
+            status, headers = step
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(PAGE)))
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+
+@pytest.fixture
+def server():
+    FakeLinkedIn.script = []
+    FakeLinkedIn.fallback = None
+    FakeLinkedIn.hits = []
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), FakeLinkedIn)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{srv.server_address[1]}/jobs/search/"
+    srv.shutdown()
+    srv.server_close()
+
+
+@pytest.fixture
+def pool():
+    pool = SessionPool()
+    keep_sessions_warm(pool)
+    yield pool
+    keep_sessions_warm(None)
+    pool.close()
+
+
+def linkedin_config(base_url, **overrides):
+    li_cfg = {
+        "base_url": base_url,
+        "keywords": ["engineer"],
+        "max_pages": 1,
+        "query_workers": 1,
+        "min_request_interval": 0.1,
+        "request_jitter": 0,
+        "backoff_base": 0.01,
+    }
+    li_cfg.update(overrides)
+    return {"scrapers": {"linkedin": li_cfg}, "http_cache": {"enabled": False}}
+
+
+def budget_for(pool, config):
+    li_cfg = config["scrapers"]["linkedin"]
+    return pool.budget("linkedin", li_cfg["base_url"], budget_settings(li_cfg))
+
+
+def test_429_waits_for_retry_after_and_slows_the_host(server, pool):
+    FakeLinkedIn.script = [(429, {"Retry-After": "1"})]
+    config = linkedin_config(server)
+
+    jobs = scrape_linkedin(config)
+
+    assert len(jobs) == 5
+    assert len(FakeLinkedIn.hits) == 2
+    assert FakeLinkedIn.hits[1] - FakeLinkedIn.hits[0] >= 0.95
+    budget = budget_for(pool, config)
+    assert (budget.throttled, budget.retries, budget.circuit_opens) == (1, 1, 0)
+    assert budget.rate < budget.max_rate
+
+
+def test_learned_rate_survives_the_next_cycle(server, pool):
+    FakeLinkedIn.script = [(429, {"Retry-After": "0"})]
+    config = linkedin_config(server)
+    scrape_linkedin(config)
+    budget = budget_for(pool, config)
+    slowed = budget.rate
+
+    scrape_linkedin(config)
+
+    assert budget_for(pool, config) is budget
+    assert slowed <= budget.rate < budget.max_rate
+    # Counters are per pass
+    assert (budget.requests, budget.throttled) == (1, 0)
+
+
+def test_repeated_503s_open_the_circuit(server, pool):
+    FakeLinkedIn.fallback = (503, {})
+    config = linkedin_config(server, keywords=["engineer", "designer"], circuit_failures=2, circuit_cooldown=60)
+
+    jobs = scrape_linkedin(config)
+
+    # Two failures open the circuit: the third attempt and the second
+    # search fail fast without reaching the server
+    assert jobs == []
+    assert len(FakeLinkedIn.hits) == 2
+    budget = budget_for(pool, config)
+    assert (budget.errors, budget.circuit_opens) == (2, 1)
+    assert budget.rate < budget.max_rate
+
+    # Still open in the next cycle, even though the host has recovered
+    FakeLinkedIn.fallback = None
+    assert scrape_linkedin(config) == []
+    assert len(FakeLinkedIn.hits) == 2
+
+
+def test_throttled_trial_does_not_lock_the_host_out(server, pool):
+    FakeLinkedIn.fallback = (503, {})
+    config = linkedin_config(server, circuit_failures=2, circuit_cooldown=0.5)
+    assert scrape_linkedin(config) == []
+    assert budget_for(pool, config).circuit_opens == 1
+
+    # After the cooldown the trial request is throttled; its retry closes
+    # the circuit again
+    time.sleep(0.6)
+    FakeLinkedIn.fallback = None
+    FakeLinkedIn.script = [(429, {"Retry-After": "0"})]
+    assert len(scrape_linkedin(config)) == 5
+    assert len(scrape_linkedin(config)) == 5
+    assert len(FakeLinkedIn.hits) == 2 + 2 + 1
+    assert budget_for(pool, config).circuit_opens == 0
+
+
+def drain(pages):
+    """
+    (jobs, returned state) of a stream_linkedin() generator.
+    """
+    jobs = []
+    with pytest.raises(StopIteration) as done:
+        while True:
+            jobs.extend(next(pages))
+    return jobs, done.value.value
+
+
+def test_incremental_state_is_returned_not_saved(server, tmp_path):
+    state_path = tmp_path / "incremental.json"
+    config = linkedin_config(server, incremental=True, incremental_state=str(state_path))
+    config["history"] = {"backend": "json", "path": str(tmp_path / "history.json")}
+
+    jobs, state = drain(stream_linkedin(config))
+    assert len(jobs) == 5 and len(state.known) == 5
+    assert not state_path.exists()
+    state.save()
+    assert state_path.exists()
+
+
+class FakeHistory:
+    def __init__(self, jobs):
+        self._jobs = jobs
+
+    def jobs(self):
+        return iter(self._jobs)
+
+
+@pytest.fixture
+def warm(monkeypatch):
+    def no_second_store(config):
+        raise AssertionError("opened a second history store")
+
+    monkeypatch.setattr(storage.history, "open_history", no_second_store)
+    known = {"url": "https://www.linkedin.com/jobs/view/old-job-at-acme-3700000000"}
+    states = WarmStates(FakeHistory([known]))
+    keep_states_warm(states)
+    yield states, canonical_job_key(known)
+    keep_states_warm(None)
+
+
+def test_warm_state_is_seeded_from_the_open_store_and_kept(server, tmp_path, monkeypatch, warm):
+    states, known_key = warm
+    state_path = tmp_path / "incremental.json"
+    config = linkedin_config(server, incremental=True, incremental_state=str(state_path))
+
+    jobs, state = drain(stream_linkedin(config))
+    assert known_key in state.known and len(state.known) == 6
+    state.save()
+
+    def no_reload(path):
+        raise AssertionError("reloaded the state file")
+
+    monkeypatch.setattr(IncrementalState, "load", no_reload)
+    _, again = drain(stream_linkedin(config))
+    assert again is state
+
+
+def test_unsaved_or_reset_warm_state_is_reloaded(server, tmp_path, warm):
+    state_path = tmp_path / "incremental.json"
+    config = linkedin_config(server, incremental=True, incremental_state=str(state_path))
+    _, first = drain(stream_linkedin(config))
+
+    # Never saved (the run wasn't committed): the next run starts over
+    _, second = drain(stream_linkedin(config))
+    assert second is not first
+    second.save()
+
+    # Reset on disk (python -m scrapers.incremental reset) behind our back
+    state_path.write_text("{}")
+    _, third = drain(stream_linkedin(config))
+    assert third is not second
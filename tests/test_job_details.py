@@ -0,0 +1,59 @@
+# tests/test_job_details.py
+
+from processor.dedupe import dedupe_key
+from scrapers.job_details import DescriptionCache, EnrichStats, extract_description, iter_enrich_jobs
+from utils.html_backend import available_backends
+from utils.html_utils import find_first, safe_soup
+
+PAGE = """
+<html><body>
+  <div class="show-more-less-html__markup">   </div>
+  <div class="description__text"><p>Build</p><p>robots.</p></div>
+</body></html>
+"""
+
+
+def test_find_first_skips_empty_containers():
+    for backend in available_backends():
+        soup = safe_soup(PAGE, backend)
+        selectors = ["div.show-more-less-html__markup", "div.description__text"]
+        assert find_first(soup, selectors, backend, separator=" ") == "Build robots.", backend
+
+
+def test_extract_description_uses_any_backend():
+    assert extract_description(PAGE) == "Build robots."
+    for backend in available_backends():
+        assert extract_description(PAGE, backend) == "Build robots."
+    assert extract_description("<html><body><p>nothing</p></body></html>") == ""
+
+
+def _config(tmp_path):
+    return {
+        "enrichment": {
+            "cache_dir": str(tmp_path / "descriptions"),
+            # Nothing listens here: any fetch would fail
+            "detail_url": "http://127.0.0.1:9/{job_id}",
+            "min_request_interval": 0,
+            "request_jitter": 0,
+            "max_retries": 0,
+        }
+    }
+
+
+def test_known_jobs_reuse_descriptions_without_fetching(tmp_path):
+    config = _config(tmp_path)
+    DescriptionCache(tmp_path / "descriptions").put("1", "cached text")
+
+    cached = {"job_id": "1", "title": "Engineer", "company": "Acme", "location": "Remote"}
+    stored = {"job_id": "2", "title": "Analyst", "company": "Acme", "location": "Remote"}
+    history = {
+        dedupe_key(cached): dict(cached),
+        dedupe_key(stored): {**stored, "description": "stored text"},
+    }
+
+    stats = EnrichStats()
+    jobs = list(iter_enrich_jobs([dict(cached), dict(stored)], config, history, stats))
+
+    assert [j.get("description") for j in jobs] == ["cached text", "stored text"]
+    assert stats.known == 2
+    assert stats.fetched == stats.failed == 0
@@ -0,0 +1,105 @@
+# tests/test_mailer.py
+
+import smtplib
+
+import pytest
+
+from emailer.mailer import MailError, MailSettings, SMTPPool
+
+SETTINGS = {
+    "sender": "agent@example.com",
+    "recipients": ["me@example.com"],
+    "use_tls": False,
+    "max_retries": 3,
+    "retry_backoff_seconds": 0,
+}
+
+
+class FakeSMTP:
+    """
+    Stand-in for smtplib.SMTP. `failures` is shared by every connection:
+    each entry is consumed by the step it names ("connect", "login", "send")
+    and raised there.
+    """
+
+    def __init__(self, failures, sent, connects):
+        self.failures = failures
+        self.sent = sent
+        connects.append(self)
+        self._fail("connect")
+
+    def _fail(self, step):
+        if self.failures and self.failures[0][0] == step:
+            raise self.failures.pop(0)[1]
+
+    def starttls(self):
+        pass
+
+    def login(self, user, password):
+        self._fail("login")
+
+    def send_message(self, msg):
+        self._fail("send")
+        self.sent.append(msg)
+
+    def rset(self):
+        pass
+
+    def noop(self):
+        return (250, b"ok")
+
+    def quit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def make_pool(failures, **overrides):
+    sent, connects = [], []
+
+    def factory(host, port, timeout=None):
+        return FakeSMTP(failures, sent, connects)
+
+    settings = MailSettings({**SETTINGS, **overrides}, password="secret")
+    return SMTPPool(settings, smtp_factory=factory), sent, connects
+
+
+def message(pool):
+    return pool.settings.message(["me@example.com"], "digest")
+
+
+def test_transient_connect_and_login_failures_are_retried():
+    failures = [
+        ("connect", smtplib.SMTPConnectError(421, b"try again later")),
+        ("login", smtplib.SMTPAuthenticationError(454, b"temporary auth failure")),
+    ]
+    pool, sent, connects = make_pool(failures)
+    with pool:
+        pool.send(message(pool))
+    assert len(sent) == 1
+    assert len(connects) == 3
+
+
+def test_transient_send_failure_retries_on_same_connection():
+    pool, sent, connects = make_pool([("send", smtplib.SMTPDataError(451, b"busy"))])
+    with pool:
+        pool.send(message(pool))
+    assert len(sent) == 1
+    assert len(connects) == 1
+
+
+def test_permanent_login_failure_is_not_retried():
+    pool, sent, connects = make_pool([("login", smtplib.SMTPAuthenticationError(535, b"bad credentials"))])
+    with pool, pytest.raises(smtplib.SMTPAuthenticationError):
+        pool.send(message(pool))
+    assert len(connects) == 1
+
+
+def test_gives_up_after_max_retries():
+    failures = [("connect", smtplib.SMTPConnectError(421, b"down"))] * 3
+    pool, sent, connects = make_pool(list(failures), max_retries=2)
+    with pool, pytest.raises(MailError):
+        pool.send(message(pool))
+    assert len(connects) == 3
+    assert not sent
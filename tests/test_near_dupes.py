@@ -0,0 +1,80 @@
+# tests/test_near_dupes.py
+
+import pytest
+
+from processor.dedupe import iter_dedupe_jobs
+from processor.near_dupes import NearDupIndex, iter_tag_clusters
+
+ACME_SF = {"company": "Acme", "location": "San Francisco, CA"}
+
+
+@pytest.mark.parametrize(
+    "title",
+    [
+        "Senior Software Engineer",
+        "Staff Software Engineer",
+        "Principal Software Engineer",
+        "Software Engineer Intern",
+        "Software Engineer II",
+    ],
+)
+def test_other_levels_are_not_reposts(title):
+    index = NearDupIndex()
+    index.assign({**ACME_SF, "title": "Software Engineer"})
+    assert index.query({**ACME_SF, "title": title}) is None
+
+
+def test_reworded_repost_matches():
+    index = NearDupIndex()
+    cid, existing = index.assign({**ACME_SF, "title": "Sr. Software Engineer II"})
+    assert not existing
+    assert index.assign({"company": "Acme, Inc.", "location": "San Francisco, CA", "title": "Senior Software Engineer 2"}) == (cid, True)
+
+
+def test_location_alone_does_not_match():
+    index = NearDupIndex()
+    index.assign({**ACME_SF, "title": "Data Analyst"})
+    assert index.query({**ACME_SF, "title": "Data Scientist"}) is None
+
+
+def test_different_levels_all_reach_new_jobs():
+    titles = ["Software Engineer", "Senior Software Engineer", "Software Engineer Intern", "Software Engineer II"]
+    jobs = [{**ACME_SF, "title": t, "url": f"https://example.com/{i}"} for i, t in enumerate(titles)]
+    new = list(iter_dedupe_jobs(iter_tag_clusters(jobs, NearDupIndex()), {}))
+    assert [j["title"] for j in new] == titles
+
+
+def test_save_appends_and_discard_forgets(tmp_path):
+    path = tmp_path / "near_dupes.jsonl"
+    index = NearDupIndex()
+    index.assign({**ACME_SF, "title": "Software Engineer"})
+    index.save(path)
+    lines = path.read_text().count("\n")
+
+    index = NearDupIndex.load(path)
+    index.assign({**ACME_SF, "title": "Data Analyst"})
+    index.save(path)
+    assert path.read_text().count("\n") == lines + 1
+
+    index.assign({**ACME_SF, "title": "Product Manager"})
+    index.discard()
+    assert index.query({**ACME_SF, "title": "Product Manager"}) is None
+    index.save(path)
+
+    reloaded = NearDupIndex.load(path)
+    assert len(reloaded) == 2
+    assert reloaded.query({**ACME_SF, "title": "Data Analyst"}) is not None
+
+
+def test_load_skips_torn_line(tmp_path):
+    path = tmp_path / "near_dupes.jsonl"
+    index = NearDupIndex()
+    index.assign({**ACME_SF, "title": "Software Engineer"})
+    index.save(path)
+    with path.open("a") as f:
+        f.write('["c123", "acme|')
+
+    index = NearDupIndex.load(path)
+    index.assign({**ACME_SF, "title": "Data Analyst"})
+    index.save(path)
+    assert len(NearDupIndex.load(path)) == 2
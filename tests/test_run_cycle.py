@@ -0,0 +1,108 @@
+# tests/test_run_cycle.py
+
+import argparse
+import json
+import time
+
+import pytest
+
+from emailer import outbox
+from emailer.mailer import SMTPPool
+from run_agent import cmd_run, run_cycle
+from scrapers.registry import Scraper
+from storage.history import JsonHistoryStore
+
+JOBS = [{"title": "Data Engineer", "company": "Acme", "location": "Remote", "url": "https://example.com/jobs/1"}]
+
+
+class FakeState:
+    def __init__(self, events):
+        self.events = events
+
+    def save(self):
+        self.events.append("state saved")
+
+
+@pytest.fixture
+def cycle(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    events = []
+
+    def stream(config):
+        yield [dict(j) for j in JOBS]
+        return FakeState(events)
+
+    store = JsonHistoryStore(tmp_path / "history.json")
+    commit = store.commit
+
+    def recorded_commit():
+        commit()
+        events.append("history committed")
+
+    store.commit = recorded_commit
+    config = {"scrapers": {"fake": {}}}
+    scrapers = {"fake": Scraper("fake", lambda config: [], stream)}
+    return events, lambda: run_cycle(config, store, None, scrapers)
+
+
+def test_source_state_is_saved_after_history(cycle):
+    events, run = cycle
+    run()
+    assert events == ["history committed", "state saved"]
+
+
+def test_failed_cycle_keeps_source_state(cycle, monkeypatch):
+    events, run = cycle
+    monkeypatch.setattr("run_agent.write_digest", lambda *args: 1 / 0)
+    with pytest.raises(ZeroDivisionError):
+        run()
+    assert events == []
+
+
+class FakeSMTP:
+    sent = []
+
+    def __init__(self, host, port, timeout=None):
+        pass
+
+    def send_message(self, msg):
+        time.sleep(0.05)
+        FakeSMTP.sent.append(msg)
+
+    def noop(self):
+        return (250, b"ok")
+
+    def quit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_cold_run_metrics_include_digest_delivery(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(outbox, "SMTPPool", lambda settings: SMTPPool(settings, smtp_factory=FakeSMTP))
+    FakeSMTP.sent = []
+    config = {
+        "scrapers": {},
+        "history": {"backend": "json"},
+        "email_notifications": {
+            "enabled": True,
+            "sender": "agent@example.com",
+            "recipients": ["me@example.com"],
+            "use_tls": False,
+            "auth": False,
+            "outbox": {"flush_seconds": 5},
+        },
+    }
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps(config))
+
+    assert cmd_run(argparse.Namespace(config=path)) == 0
+
+    assert len(FakeSMTP.sent) == 1
+    record = json.loads((tmp_path / "logs" / "metrics.jsonl").read_text().splitlines()[-1])
+    assert record["mode"] == "cold"
+    assert record["counters"]["emails_sent"] == 1
+    assert record["counters"]["outbox_depth"] == 0
+    assert record["histograms"]["email_delivery_ms"]["count"] == 1
@@ -0,0 +1,22 @@
+# tests/test_scoring.py
+
+from processor.relevance_classifier import classify_jobs, iter_classify_jobs
+
+CONFIG = {
+    "search_filters": {
+        "ml_research": {"keywords": ["machine learning"], "label": "research"},
+        "robotics_research": {"keywords": ["robotics"], "label": "research", "weight": 2.0},
+        "manufacturing_engineering": {"keywords": ["manufacturing"]},
+    },
+    "ranking": {"field_weights": {"title": 1.0, "company": 0.0, "description": 0.0}},
+}
+
+JOB = {"title": "Machine Learning Engineer, Robotics Manufacturing"}
+
+
+def test_categories_sharing_a_label_keep_their_own_scores():
+    for job in (next(iter_classify_jobs([dict(JOB)], CONFIG)), classify_jobs([dict(JOB)], CONFIG)[0]):
+        assert job["scores"] == {"ml_research": 1.0, "robotics_research": 2.0, "manufacturing_engineering": 1.0}
+        assert job["ranking"] == ["research", "manufacturing"]
+        assert job["role_type"] == "research"
+        assert job["relevance"] == 2.0
@@ -1,21 +1,437 @@
 # utils/config_loader.py
 
+"""
+The one place config/config.json is read.
+
+load_config() parses and validates the file once and caches the result
+against the file's mtime and size: every later call (run_agent, the
+daemon's reload check, any subcommand) gets the same object back for free
+until the file changes.
+
+What it returns is a RuntimeConfig: a read-only mapping over the parsed
+JSON (so config["scrapers"], config.get("digest", {}) work as before)
+that also carries what the stages would otherwise re-derive on every
+call:
+
+  - keywords / location_keywords   the filter keywords, lowercased and
+                                   deduplicated; title_matcher and
+                                   location_matcher compiled from them
+  - categories                     search_filters, normalized into
+                                   (keyword, weight) pairs per category
+  - max_post_age_days, top_n       parsed limits
+  - enabled_scrapers               names of the enabled scraper sections
+  - version, section_hash()        content hashes, for keying caches
+
+The schema check rejects unknown keys (with a "did you mean" hint) and
+values of the wrong type, so a typo such as "keyword" fails loudly
+instead of quietly filtering on an empty keyword list. Keys starting
+with "_" are ignored (use them for comments).
+
+A RuntimeConfig is hashable and compares by version. Caches that depend
+on part of the config should key on section_hash() of those sections, so
+that e.g. an email change doesn't recompile the relevance scorer.
+"""
+
 from __future__ import annotations
+import hashlib
 import json
+import threading
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Iterator, List, Mapping, NamedTuple, Optional, Tuple, Union
+
+from processor.tags import KeywordMatcher, compile_matcher, normalize_keywords
+
+CONFIG_PATH = Path("config/config.json")
+
+DEFAULT_TOP_N = 3
+
+# Scraper whose keywords double as the filter keywords (processor/filters.py)
+FILTER_SOURCE = "linkedin"
+
+# Known keys per section, with the types their values must have. A float
+# entry accepts any number; "a.b" entries describe nested objects.
+_SCHEMA: Dict[str, Dict[str, Tuple[type, ...]]] = {
+    "": {
+        "scrapers": (dict,),
+        "http_cache": (dict,),
+        "search_filters": (dict,),
+        "ranking": (dict,),
+        "filters": (dict,),
+        "enrichment": (dict,),
+        "batch": (dict,),
+        "digest": (dict,),
+        "logging": (dict,),
+        "daemon": (dict,),
+        "history": (dict,),
+        "dedupe": (dict,),
+        "email_notifications": (dict,),
+        "email_settings": (dict,),
+    },
+    "filters": {"max_post_age_days": (float,), "word_boundaries": (bool,)},
+    "ranking": {"field_weights": (dict,), "top_n": (int,)},
+    "http_cache": {"enabled": (bool,), "dir": (str,), "ttl_hours": (float,), "max_mb": (float,)},
+    "enrichment": {
+        "enabled": (bool,),
+        "workers": (int,),
+        "max_fetches": (int,),
+        "max_mb": (float,),
+        "request_timeout": (float,),
+        "cache_dir": (str,),
+        "detail_url": (str,),
+        "parser": (str,),
+        "max_in_flight": (int,),
+        "min_request_interval": (float,),
+        "request_jitter": (float,),
+        "max_retries": (int,),
+        "backoff_base": (float,),
+        "backoff_max": (float,),
+        "circuit_failures": (int,),
+        "circuit_cooldown": (float,),
+    },
+    "batch": {"enabled": (bool,), "workers": (int,), "chunk_size": (int,), "min_jobs": (int,)},
+    "digest": {"extra_outputs": (list,)},
+    "logging": {"level": (str,), "dir": (str,), "max_mb": (float,), "backups": (int,), "console": (str,)},
+    "daemon": {"interval_minutes": (float,), "reload_check_seconds": (float,)},
+    "history": {"backend": (str,), "path": (str,), "compact_after_mb": (float,), "migrate_from": (str,)},
+    "dedupe": {"near_duplicates": (dict,)},
+    "dedupe.near_duplicates": {"enabled": (bool,), "threshold": (float,), "num_perm": (int,), "bands": (int,)},
+    "email_notifications": {
+        "enabled": (bool,),
+        "sender": (str,),
+        "recipients": (list,),
+        "smtp_host": (str,),
+        "smtp_port": (int,),
+        "use_tls": (bool,),
+        "auth": (bool,),
+        "username": (str,),
+        "pool_size": (int,),
+        "max_retries": (int,),
+        "retry_backoff_seconds": (float,),
+        "timeout_seconds": (float,),
+        "subject_template": (str,),
+        "outbox": (dict,),
+    },
+    "email_notifications.outbox": {
+        "enabled": (bool,),
+        "path": (str,),
+        "retry_base_seconds": (float,),
+        "retry_max_seconds": (float,),
+        "flush_seconds": (float,),
+    },
+}
+_SCHEMA["email_settings"] = _SCHEMA["email_notifications"]
+_SCHEMA["email_settings.outbox"] = _SCHEMA["email_notifications.outbox"]
+
+# Keys of one search_filters category
+_CATEGORY_SCHEMA: Dict[str, Tuple[type, ...]] = {"keywords": (list, dict), "weight": (float,), "label": (str,)}
+
+# Scraper sections are open-ended (each scraper reads its own settings),
+# so only these shared keys are type-checked, and an unknown key is only
+# an error when it looks like a misspelling of one of them.
+_SCRAPER_SCHEMA: Dict[str, Tuple[type, ...]] = {
+    "enabled": (bool,),
+    "keywords": (list,),
+    "location_keywords": (list,),
+    "timeout_seconds": (float,),
+    "interval_minutes": (float,),
+    "max_pages": (int,),
+    "query_workers": (int,),
+    "workers": (int,),
+    "max_in_flight": (int,),
+    "min_request_interval": (float,),
+    "request_jitter": (float,),
+    "max_retries": (int,),
+    "backoff_base": (float,),
+    "backoff_max": (float,),
+    "circuit_failures": (int,),
+    "circuit_cooldown": (float,),
+    "request_timeout": (float,),
+    "parser": (str,),
+    "incremental": (bool,),
+    "incremental_state": (str,),
+    "base_url": (str,),
+}
+
+_TYPE_NAMES = {bool: "true/false", int: "an integer", float: "a number", str: "a string", list: "a list", dict: "an object"}
+
+
+class ConfigError(RuntimeError):
+    pass
+
+
+class Category(NamedTuple):
+    """
+    One search_filters category: normalized keyword -> weight (already
+    multiplied by the category's "weight"), in first-seen order.
+    """
+
+    name: str
+    label: Optional[str]
+    weights: Tuple[Tuple[str, float], ...]
+
+
+def _is_type(value: Any, types: Tuple[type, ...]) -> bool:
+    for t in types:
+        if t is float:
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                return True
+        elif t is int:
+            if isinstance(value, int) and not isinstance(value, bool):
+                return True
+        elif isinstance(value, t):
+            return True
+    return False
+
+
+def _expected(types: Tuple[type, ...]) -> str:
+    return " or ".join(_TYPE_NAMES[t] for t in types)
+
+
+def _hint(key: str, known: Mapping[str, Any], cutoff: float = 0.6) -> str:
+    import difflib  # only needed once a key is unknown
+
+    close = difflib.get_close_matches(key, list(known), n=1, cutoff=cutoff)
+    return f" (did you mean \"{close[0]}\"?)" if close else ""
+
+
+def _check_keys(
+    obj: Dict[str, Any],
+    where: str,
+    schema: Mapping[str, Tuple[type, ...]],
+    errors: List[str],
+    open_ended: bool = False,
+) -> None:
+    """
+    Append an error for each unknown key and each value of the wrong type.
+    With open_ended, unknown keys are allowed unless they look misspelled.
+    """
+    prefix = f"{where}." if where else ""
+    for key, value in obj.items():
+        if key.startswith("_"):
+            continue
+        types = schema.get(key)
+        if types is None:
+            hint = _hint(key, schema, 0.85 if open_ended else 0.6)
+            if not open_ended or hint:
+                errors.append(f"unknown key \"{prefix}{key}\"{hint}")
+        elif not _is_type(value, types):
+            errors.append(f"\"{prefix}{key}\" must be {_expected(types)}")
+
+
+def _check_strings(values: Any, where: str, errors: List[str]) -> None:
+    if isinstance(values, list) and not all(isinstance(v, str) for v in values):
+        errors.append(f"\"{where}\" must be a list of strings")
+
+
+def validate_config(config: Any, path: Union[str, Path] = CONFIG_PATH) -> Dict[str, Any]:
+    """
+    Check `config` against the schema: known sections and keys, value
+    types, keyword lists of strings. Raises ConfigError listing every
+    problem found.
+    """
+    if not isinstance(config, dict):
+        raise ConfigError(f"{path}: expected a JSON object at the top level")
 
+    errors: List[str] = []
+    _check_keys(config, "", _SCHEMA[""], errors)
+    for where, schema in _SCHEMA.items():
+        section = _lookup(config, where)
+        if where and isinstance(section, dict):
+            _check_keys(section, where, schema, errors)
 
-def load_config(path: str) -> Dict[str, Any]:
+    for name, settings in _section(config, "scrapers").items():
+        if not isinstance(settings, dict):
+            errors.append(f"\"scrapers.{name}\" must be an object")
+            continue
+        _check_keys(settings, f"scrapers.{name}", _SCRAPER_SCHEMA, errors, open_ended=True)
+        for key in ("keywords", "location_keywords"):
+            _check_strings(settings.get(key), f"scrapers.{name}.{key}", errors)
+
+    for name, settings in _section(config, "search_filters").items():
+        if name.startswith("_"):
+            continue
+        if not isinstance(settings, dict):
+            errors.append(f"\"search_filters.{name}\" must be an object")
+            continue
+        _check_keys(settings, f"search_filters.{name}", _CATEGORY_SCHEMA, errors)
+        keywords = settings.get("keywords")
+        if isinstance(keywords, dict):
+            if not all(_is_type(w, (float,)) for w in keywords.values()):
+                errors.append(f"\"search_filters.{name}.keywords\" weights must be numbers")
+        else:
+            _check_strings(keywords, f"search_filters.{name}.keywords", errors)
+
+    weights = _section(config, "ranking").get("field_weights", {})
+    if isinstance(weights, dict) and not all(_is_type(w, (float,)) for w in weights.values()):
+        errors.append("\"ranking.field_weights\" values must be numbers")
+
+    if errors:
+        raise ConfigError(f"{path}: " + "; ".join(errors))
+    return config
+
+
+def _lookup(config: Dict[str, Any], where: str) -> Any:
+    """
+    The value at dotted path `where`, or None if any level is missing.
+    """
+    value: Any = config
+    for part in where.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _section(config: Mapping[str, Any], name: str) -> Dict[str, Any]:
+    section = config.get(name)
+    return section if isinstance(section, dict) else {}
+
+
+def _digest(value: Any) -> str:
+    blob = json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()[:16]
+
+
+class RuntimeConfig(Mapping[str, Any]):
+    """
+    A validated config plus its precompiled artifacts (see module doc).
+    Built once per config version; treat it, and the sections it hands
+    out, as read-only.
+    """
+
+    def __init__(self, raw: Dict[str, Any], path: Union[str, Path] = CONFIG_PATH, strict: bool = True):
+        self._raw = validate_config(raw, path) if strict else raw
+        self.path = Path(path)
+        self.version = _digest(raw)
+        self._hashes: Dict[Tuple[str, ...], str] = {}
+
+        filters = _section(raw, "filters")
+        self.word_boundaries = bool(filters.get("word_boundaries", False))
+        self.max_post_age_days: Optional[float] = filters.get("max_post_age_days")
+
+        source = _section(raw, "scrapers").get(FILTER_SOURCE, {})
+        self.keywords = normalize_keywords(source.get("keywords", ()))
+        self.location_keywords = normalize_keywords(source.get("location_keywords", ()))
+        self.title_matcher: KeywordMatcher = compile_matcher(self.keywords, self.word_boundaries)
+        self.location_matcher: KeywordMatcher = compile_matcher(self.location_keywords, self.word_boundaries)
+
+        self.top_n = int(_section(raw, "ranking").get("top_n", DEFAULT_TOP_N))
+        self.categories = tuple(
+            self._category(name, settings)
+            for name, settings in _section(raw, "search_filters").items()
+            if isinstance(settings, dict) and not name.startswith("_")
+        )
+
+        self.enabled_scrapers = tuple(
+            name
+            for name, settings in _section(raw, "scrapers").items()
+            if isinstance(settings, dict) and settings.get("enabled", True)
+        )
+
+    @staticmethod
+    def _category(name: str, settings: Dict[str, Any]) -> Category:
+        multiplier = float(settings.get("weight", 1.0))
+        raw = settings.get("keywords", [])
+        pairs = raw.items() if isinstance(raw, dict) else ((kw, 1.0) for kw in raw)
+        weights: Dict[str, float] = {}
+        for kw, w in pairs:
+            for norm in normalize_keywords([kw]):
+                weights[norm] = float(w) * multiplier
+        return Category(name, settings.get("label"), tuple(weights.items()))
+
+    @classmethod
+    def of(cls, config: Mapping[str, Any]) -> "RuntimeConfig":
+        """
+        `config` itself if it already is a RuntimeConfig, else one built
+        from the plain dict (e.g. in benchmarks and tools). Such dicts are
+        often partial, so they are not schema-checked, and the result is
+        remembered per dict object: every stage handed the same dict
+        shares one build. Don't mutate a dict after passing it in.
+        """
+        if isinstance(config, RuntimeConfig):
+            return config
+        with _lock:
+            hit = _adopted.get(id(config))
+        if hit is not None and hit[0] is config:
+            return hit[1]
+        rc = cls(dict(config), strict=False)
+        with _lock:
+            if len(_adopted) >= 8:
+                _adopted.clear()
+            # Holding on to `config` keeps its id from being reused
+            _adopted[id(config)] = (config, rc)
+        return rc
+
+    def section_hash(self, *names: str) -> str:
+        """
+        Content hash of the named top-level sections (missing ones count
+        as absent): unchanged as long as those sections are.
+        """
+        digest = self._hashes.get(names)
+        if digest is None:
+            digest = self._hashes[names] = _digest([self._raw.get(n) for n in names])
+        return digest
+
+    # ----- mapping over the raw config -------------------------------------
+
+    def __getitem__(self, key: str) -> Any:
+        return self._raw[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._raw)
+
+    def __len__(self) -> int:
+        return len(self._raw)
+
+    def __hash__(self) -> int:
+        return hash(self.version)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, RuntimeConfig):
+            return self.version == other.version
+        if isinstance(other, Mapping):
+            return self._raw == dict(other)
+        return NotImplemented
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # Pickled as the raw dict (e.g. for batch workers); rebuilt there
+        # without checking it again
+        return (RuntimeConfig, (self._raw, str(self.path), False))
+
+    def __repr__(self) -> str:
+        return f"<RuntimeConfig {self.path} version={self.version}>"
+
+
+_cache: Dict[Path, Tuple[int, int, RuntimeConfig]] = {}
+_adopted: Dict[int, Tuple[Mapping[str, Any], RuntimeConfig]] = {}
+_lock = threading.Lock()
+
+
+def load_config(path: Union[str, Path] = CONFIG_PATH) -> RuntimeConfig:
     """
-    Loads config.json into a Python dict.
+    Loads config.json into a RuntimeConfig (cached until the file changes).
+    Raises ConfigError if it is missing, not valid JSON or fails validation.
     """
     p = Path(path)
-    if not p.exists():
-        raise FileNotFoundError(f"Config file not found: {path}")
+    try:
+        st = p.stat()
+    except FileNotFoundError:
+        raise ConfigError(f"Missing {path}")
+
+    key = p.resolve()
+    with _lock:
+        cached = _cache.get(key)
+        if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+            return cached[2]
 
     try:
         with p.open("r", encoding="utf-8") as f:
-            return json.load(f)
+            config = RuntimeConfig(json.load(f), path)
     except json.JSONDecodeError as e:
-        raise ValueError(f"Invalid JSON in {path}: {e}")
+        raise ConfigError(f"Invalid JSON in {path}: {e}")
+    except FileNotFoundError:
+        raise ConfigError(f"Missing {path}")
+
+    with _lock:
+        _cache[key] = (st.st_mtime_ns, st.st_size, config)
+    return config
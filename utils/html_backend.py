@@ -0,0 +1,203 @@
+# utils/html_backend.py
+
+"""
+Pluggable HTML parser backends.
+
+Every backend exposes the same small node API so scrapers and
+utils/html_utils.py don't care which parser built the tree:
+
+    parse(html)                -> root node
+    find_all(node, tag, cls)   -> descendants <tag class="... cls ...">
+    select_one(node, css)      -> first CSS match or None
+    iter_elements(node)        -> (tag, classes, element) for node + descendants
+    text(node, separator="")   -> stripped text, same as bs4 get_text(separator, strip=True)
+    attr(node, name)           -> attribute value or ""
+
+Available backends, fastest first:
+    selectolax  (pip install selectolax)
+    lxml        (pip install lxml cssselect)
+    bs4         (always available; uses lxml's tree builder when installed)
+"""
+
+from __future__ import annotations
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+_PREFERENCE = ("selectolax", "lxml", "bs4")
+
+# bs4's get_text() skips the contents of these; the other backends match it.
+_NON_TEXT_TAGS = frozenset({"script", "style", "template"})
+
+
+class Bs4Backend:
+    name = "bs4"
+
+    def __init__(self):
+        from bs4 import BeautifulSoup
+
+        self._soup_cls = BeautifulSoup
+        self.features = "lxml" if _importable("lxml") else "html.parser"
+
+    def parse(self, html: str) -> Any:
+        return self._soup_cls(html, self.features)
+
+    def find_all(self, node: Any, tag: str, cls: str) -> List[Any]:
+        return node.find_all(tag, class_=cls)
+
+    def select_one(self, node: Any, css: str) -> Optional[Any]:
+        return node.select_one(css)
+
+    def iter_elements(self, node: Any) -> Iterator[Tuple[str, List[str], Any]]:
+        yield node.name, node.get("class") or [], node
+        for el in node.find_all(True):
+            yield el.name, el.get("class") or [], el
+
+    def text(self, node: Any, separator: str = "") -> str:
+        return node.get_text(separator, strip=True)
+
+    def attr(self, node: Any, name: str) -> str:
+        value = node.get(name, "")
+        if isinstance(value, list):
+            value = " ".join(value)
+        return value or ""
+
+
+class LxmlBackend:
+    name = "lxml"
+
+    def __init__(self):
+        import lxml.html
+        from lxml.cssselect import CSSSelector
+
+        self._html = lxml.html
+        self._parser = lxml.html.HTMLParser(encoding="utf-8")
+        self._css_cls = CSSSelector
+        self._css_cache: Dict[str, Any] = {}
+
+    def parse(self, html: str) -> Any:
+        return self._html.document_fromstring(html.encode("utf-8"), parser=self._parser)
+
+    def _css(self, css: str) -> Any:
+        sel = self._css_cache.get(css)
+        if sel is None:
+            sel = self._css_cache[css] = self._css_cls(css)
+        return sel
+
+    def find_all(self, node: Any, tag: str, cls: str) -> List[Any]:
+        return self._css(f"{tag}.{cls}")(node)
+
+    def select_one(self, node: Any, css: str) -> Optional[Any]:
+        found = self._css(css)(node)
+        return found[0] if found else None
+
+    def iter_elements(self, node: Any) -> Iterator[Tuple[str, List[str], Any]]:
+        for el in node.iter():
+            if isinstance(el.tag, str):
+                yield el.tag, (el.get("class") or "").split(), el
+
+    def text(self, node: Any, separator: str = "") -> str:
+        parts: List[str] = []
+        self._collect_text(node, parts, top=True)
+        return separator.join(p for p in parts if p)
+
+    def _collect_text(self, el: Any, parts: List[str], top: bool) -> None:
+        if isinstance(el.tag, str) and el.tag not in _NON_TEXT_TAGS:
+            if el.text:
+                parts.append(el.text.strip())
+            for child in el:
+                self._collect_text(child, parts, top=False)
+        if not top and el.tail:
+            parts.append(el.tail.strip())
+
+    def attr(self, node: Any, name: str) -> str:
+        return node.get(name) or ""
+
+
+class SelectolaxBackend:
+    name = "selectolax"
+
+    def __init__(self):
+        from selectolax.lexbor import LexborHTMLParser
+
+        self._parser_cls = LexborHTMLParser
+
+    def parse(self, html: str) -> Any:
+        return self._parser_cls(html).root
+
+    def find_all(self, node: Any, tag: str, cls: str) -> List[Any]:
+        return node.css(f"{tag}.{cls}")
+
+    def select_one(self, node: Any, css: str) -> Optional[Any]:
+        return node.css_first(css)
+
+    def iter_elements(self, node: Any) -> Iterator[Tuple[str, List[str], Any]]:
+        for el in node.traverse(include_text=False):
+            if el.tag.startswith("-"):
+                continue  # comments, doctype
+            yield el.tag, (el.attributes.get("class") or "").split(), el
+
+    def text(self, node: Any, separator: str = "") -> str:
+        if node.css_first("script, style, template") is None:
+            return node.text(deep=True, separator=separator, strip=True)
+        parts = []
+        for el in node.traverse(include_text=True):
+            if el.tag == "-text" and el.parent.tag not in _NON_TEXT_TAGS:
+                parts.append(el.text_content.strip())
+        return separator.join(p for p in parts if p)
+
+    def attr(self, node: Any, name: str) -> str:
+        return node.attributes.get(name) or ""
+
+
+_BACKEND_CLASSES = {
+    "bs4": Bs4Backend,
+    "lxml": LxmlBackend,
+    "selectolax": SelectolaxBackend,
+}
+
+_instances: Dict[str, Any] = {}
+
+
+def _importable(module: str) -> bool:
+    try:
+        __import__(module)
+        return True
+    except ImportError:
+        return False
+
+
+def available_backends() -> List[str]:
+    """
+    Names of the backends usable in this environment, fastest first.
+    """
+    names = []
+    for name in _PREFERENCE:
+        try:
+            get_backend(name)
+            names.append(name)
+        except ImportError:
+            continue
+    return names
+
+
+def get_backend(name: Optional[str] = None) -> Any:
+    """
+    Return a (cached) backend instance.
+
+    name=None or "auto" picks the fastest installed backend.
+    Raises ImportError if a specifically requested backend isn't installed,
+    and ValueError for unknown names.
+    """
+    if name in (None, "", "auto"):
+        for candidate in _PREFERENCE:
+            try:
+                return get_backend(candidate)
+            except ImportError:
+                continue
+
+    if name not in _BACKEND_CLASSES:
+        raise ValueError(f"Unknown HTML backend: {name!r}")
+
+    backend = _instances.get(name)
+    if backend is None:
+        backend = _instances[name] = _BACKEND_CLASSES[name]()
+    return backend
@@ -1,8 +1,9 @@
 # utils/html_utils.py
 
 from __future__ import annotations
-from typing import Optional
-from bs4 import BeautifulSoup
+from typing import Any, Optional
+
+from utils.html_backend import get_backend
 
 
 def extract_text_safe(html_fragment: str) -> str:
@@ -13,7 +14,7 @@ def extract_text_safe(html_fragment: str) -> str:
     if not html_fragment:
         return ""
     try:
-        soup = BeautifulSoup(html_fragment, "html.parser")
+        soup = get_backend("bs4").parse(html_fragment)
         return soup.get_text(" ", strip=True)
     except Exception:
         return ""
@@ -26,31 +27,41 @@ def strip_tags(html: str) -> str:
     return extract_text_safe(html)
 
 
-def safe_soup(html: str) -> Optional[BeautifulSoup]:
+def safe_soup(html: str, backend: str = "bs4") -> Optional[Any]:
     """
-    Safely create a BeautifulSoup object without breaking the scraper.
+    Safely parse HTML without breaking the scraper.
+    Returns a BeautifulSoup object by default, or the root node of another
+    utils.html_backend backend ("lxml", "selectolax", "auto").
     Returns None on failure.
     """
     if not html:
         return None
 
     try:
-        return BeautifulSoup(html, "html.parser")
+        return get_backend(backend).parse(html)
+    except ImportError:
+        raise
     except Exception:
         return None
 
 
-def find_first(soup: BeautifulSoup, selectors: list) -> Optional[str]:
+def find_first(soup: Any, selectors: list, backend: str = "bs4", separator: str = "") -> Optional[str]:
     """
-    Try multiple CSS selectors and return the first match's text.
+    Try multiple CSS selectors and return the first non-empty match's text
+    (an empty container falls through to the next selector).
     This is extremely useful for messy websites with inconsistent markup.
+    `backend` must name the backend that built `soup`. Pass separator=" "
+    to keep words in separate elements apart (e.g. multi-paragraph text).
     """
     if soup is None:
         return None
 
+    be = get_backend(backend)
     for sel in selectors:
-        tag = soup.select_one(sel)
-        if tag:
-            return tag.get_text(strip=True)
+        tag = be.select_one(soup, sel)
+        if tag is not None:
+            text = be.text(tag, separator)
+            if text:
+                return text
 
     return None
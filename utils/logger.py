@@ -1,39 +1,135 @@
 # utils/logger.py
 
+"""
+Logging for the agent: every module logs to "jobsearch_agent", and
+init_logger() routes that logger through a queue.
+
+A log call only appends the record to an in-memory queue (QueueHandler);
+a QueueListener thread does the formatting and the file/console writes.
+Scraper threads, the outbox worker and the daemon therefore never contend
+on a file lock or interleave partial lines.
+
+  - logs/agent.log       one JSON object per line, rotated by size
+                         (agent.log.1 ... agent.log.<backups>)
+  - console              the familiar "time - LEVEL - message" lines
+
+Structured fields are passed with `extra` and land as JSON keys:
+
+    logger.info("Filtered 120 jobs", extra={"stage": "filter", "jobs": 120})
+
+    "logging": {
+        "level": "INFO",
+        "dir": "logs",
+        "max_mb": 5,           # rotate agent.log at this size
+        "backups": 5,          # rotated files kept
+        "console": "text"      # or "json"
+    }
+"""
+
 from __future__ import annotations
+import atexit
+import json
 import logging
-from datetime import datetime
+import logging.handlers
+import queue
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Any, Dict, Optional
+
+LOGGER_NAME = "jobsearch_agent"
+LOG_FILE = "agent.log"
+DEFAULT_MAX_MB = 5
+DEFAULT_BACKUPS = 5
+TEXT_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+# Attributes every LogRecord has; anything else came in through `extra`
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
 
 
-def init_logger() -> logging.Logger:
-    logs_dir = Path("logs")
-    logs_dir.mkdir(exist_ok=True)
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per record: ts, level, msg, thread, any `extra`
+    fields (stage, source, jobs, seconds, ...), and exc for exceptions.
+    """
 
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M")
-    log_path = logs_dir / f"agent_{timestamp}.log"
+    def format(self, record: logging.LogRecord) -> str:
+        out: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+            "level": record.levelname,
+            "msg": record.getMessage(),
+            "thread": record.threadName,
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                out[key] = value
+        if record.exc_info:
+            out["exc"] = self.formatException(record.exc_info)
+        return json.dumps(out, ensure_ascii=False, default=str)
 
-    logger = logging.getLogger("jobsearch_agent")
-    logger.setLevel(logging.INFO)
 
-    # Clear previous handlers if reloading
-    if logger.hasHandlers():
-        logger.handlers.clear()
+class _Enqueue(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves formatting to the listener thread. (The
+    stock prepare() formats the message on the caller's thread.)
+    """
 
-    # File handler
-    fh = logging.FileHandler(log_path, encoding="utf-8")
-    fh.setLevel(logging.INFO)
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def stop_logging() -> None:
+    """
+    Flush queued records and stop the listener thread (also run at exit).
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def init_logger(settings: Optional[Dict[str, Any]] = None) -> logging.Logger:
+    """
+    (Re)configure the "jobsearch_agent" logger from a `logging` config
+    section (all keys optional) and return it.
+    """
+    global _listener
+    settings = settings or {}
+    level = getattr(logging, str(settings.get("level", "INFO")).upper(), logging.INFO)
+
+    logs_dir = Path(settings.get("dir", "logs"))
+    logs_dir.mkdir(parents=True, exist_ok=True)
+
+    fh = logging.handlers.RotatingFileHandler(
+        logs_dir / LOG_FILE,
+        maxBytes=int(float(settings.get("max_mb", DEFAULT_MAX_MB)) * 1024 * 1024),
+        backupCount=int(settings.get("backups", DEFAULT_BACKUPS)),
+        encoding="utf-8",
+    )
+    fh.setFormatter(JsonFormatter())
 
-    # Console handler
     ch = logging.StreamHandler()
-    ch.setLevel(logging.INFO)
+    ch.setFormatter(JsonFormatter() if settings.get("console") == "json" else logging.Formatter(TEXT_FORMAT))
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, fh, ch)
+    listener.start()
 
-    # Formatting
-    fmt = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
-    fh.setFormatter(fmt)
-    ch.setFormatter(fmt)
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.setLevel(level)
+    logger.propagate = False
 
-    logger.addHandler(fh)
-    logger.addHandler(ch)
+    # Clear previous handlers if reloading (the old listener drains its
+    # queue once the new handler is in place, so nothing is dropped)
+    logger.handlers.clear()
+    logger.addHandler(_Enqueue(log_queue))
+    stop_logging()
+    _listener = listener
 
     return logger
+
+
+atexit.register(stop_logging)
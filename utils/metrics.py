@@ -0,0 +1,259 @@
+# utils/metrics.py
+
+"""
+Lightweight run instrumentation: stage timers, counters and latency
+histograms, written as one JSON line per run to logs/metrics.jsonl.
+
+    metrics = begin_run("cold")
+    with metrics.stage("digest"):
+        build_digest(...)
+    metrics.incr("bytes_downloaded", len(resp.content))
+    metrics.observe("request_ms", elapsed * 1000)
+    metrics.write()
+
+Code deep in the scrapers reaches the active run through current(), so
+nothing has to be threaded through their signatures. Everything is
+thread-safe; updates cost a lock and a few additions.
+
+Stage times are exclusive: when streaming stages are chained with timed(),
+the time a stage spends waiting on the stage before it is charged to that
+upstream stage, not to both. Worker-thread work (fetching, parsing) is
+summed across threads, so it can exceed wall time.
+"""
+
+from __future__ import annotations
+import bisect
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, TypeVar
+
+if TYPE_CHECKING:
+    import cProfile
+
+T = TypeVar("T")
+
+logger = logging.getLogger("jobsearch_agent")
+
+DEFAULT_METRICS_PATH = Path("logs/metrics.jsonl")
+PROFILE_DIR = Path("logs")
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram with count/sum/min/max and bucket-estimated
+    percentiles.
+    """
+
+    def __init__(self, bounds: Iterable[float] = LATENCY_BUCKETS_MS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Upper bound of the bucket holding the q-th quantile (the max for
+        the open bucket).
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return self.bounds[i] if i < len(self.bounds) else self.max
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": round(self.total, 3),
+            "min": self.min,
+            "max": self.max,
+            "p50": self.percentile(0.5),
+            "p90": self.percentile(0.9),
+            "p99": self.percentile(0.99),
+            "buckets": {
+                **{f"le_{b}": n for b, n in zip(self.bounds, self.counts)},
+                "inf": self.counts[-1],
+            },
+        }
+
+
+class RunMetrics:
+    """
+    Everything measured during one run (a cold start or a daemon cycle).
+    """
+
+    def __init__(self, mode: str = "cold"):
+        self.mode = mode
+        self.started_at = datetime.now(timezone.utc)
+        self._start = time.perf_counter()
+        self._end: Optional[float] = None
+        self.stages: Dict[str, float] = {}
+        self.counters: Dict[str, float] = {}
+        self.histograms: Dict[str, Histogram] = {}
+        self.info: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    # ----- recording ------------------------------------------------------
+
+    def add_time(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def incr(self, name: str, n: float = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def observe(self, name: str, value: float) -> None:
+        with self._lock:
+            hist = self.histograms.get(name)
+            if hist is None:
+                hist = self.histograms[name] = Histogram()
+            hist.observe(value)
+
+    def _frames(self) -> List[float]:
+        frames = getattr(self._local, "frames", None)
+        if frames is None:
+            frames = self._local.frames = []
+        return frames
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Time a block as stage `name`, excluding time spent in stages
+        nested inside it on the same thread.
+        """
+        frames = self._frames()
+        frames.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = frames.pop()
+            if frames:
+                frames[-1] += elapsed
+            self.add_time(name, elapsed - nested)
+
+    def stop(self) -> None:
+        """
+        Freeze the run's duration. Counters and histograms still accept
+        updates (e.g. mail delivered after the run's work) until write().
+        """
+        if self._end is None:
+            self._end = time.perf_counter()
+
+    def _elapsed(self) -> float:
+        return (self._end if self._end is not None else time.perf_counter()) - self._start
+
+    # ----- output ---------------------------------------------------------
+
+    def record(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "ts": self.started_at.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "mode": self.mode,
+                "seconds": round(self._elapsed(), 3),
+                "stages": {k: round(v, 4) for k, v in self.stages.items()},
+                "counters": dict(self.counters),
+                "histograms": {k: h.to_dict() for k, h in self.histograms.items()},
+                **self.info,
+            }
+
+    def summary(self) -> str:
+        stages = ", ".join(f"{k}={v:.2f}s" for k, v in sorted(self.stages.items(), key=lambda kv: -kv[1]))
+        return f"{self._elapsed():.1f}s total — {stages}"
+
+    def write(self, path: Path = DEFAULT_METRICS_PATH) -> None:
+        """
+        Append this run's record as one JSON line.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(self.record(), separators=(",", ":")) + "\n")
+
+
+_current = RunMetrics("idle")
+
+
+def begin_run(mode: str = "cold") -> RunMetrics:
+    """
+    Start a new run's metrics and make them the ones current() returns.
+    """
+    global _current
+    _current = RunMetrics(mode)
+    return _current
+
+
+def current() -> RunMetrics:
+    return _current
+
+
+def timed(items: Iterable[T], name: str, metrics: Optional[RunMetrics] = None) -> Iterator[T]:
+    """
+    Pass a streaming stage's output through, charging the time spent
+    producing each item to stage `name` (see RunMetrics.stage()).
+    """
+    metrics = metrics or current()
+    it = iter(items)
+    while True:
+        with metrics.stage(name):
+            try:
+                item = next(it)
+            except StopIteration:
+                return
+        yield item
+
+
+@contextmanager
+def profiled(directory: Path = PROFILE_DIR, top: int = 40) -> Iterator[cProfile.Profile]:
+    """
+    Run the block under cProfile, then write profile_<time>.prof (for
+    pstats/snakeviz) and profile_<time>.txt (the `top` functions by
+    cumulative time) to `directory`.
+
+    cProfile only sees the calling thread: time spent in scraper and fetch
+    worker threads shows up here as waiting, and in the run's metrics
+    (request_ms, parse) as work.
+    """
+    import cProfile
+    import io
+    import pstats
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    stem = directory / f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(f"{stem}.prof")
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(top)
+        Path(f"{stem}.txt").write_text(out.getvalue(), encoding="utf-8")
+        logger.info(f"Profile written → {stem}.prof, {stem}.txt")